@@ -12,6 +12,7 @@ import os
 import sys
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from functools import partial
 
@@ -28,6 +29,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger("main")
 
+# 通知在后台线程发送，避免网络请求阻塞任务本身；单线程保证开始/完成消息的先后顺序
+_notify_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notify")
+
+
+def _notify(send, *args):
+    """异步发送通知，通知失败只记录日志"""
+    def _safe_send():
+        try:
+            send(*args)
+        except Exception as e:
+            logger.warning(f"通知发送失败: {e}")
+    _notify_pool.submit(_safe_send)
+
 
 def cmd_run_once(args):
     notifier = get_notifier()
@@ -35,7 +49,7 @@ def cmd_run_once(args):
     
     try:
         # 发送启动通知
-        notifier.send_job_start(args.days_back, args.top_n)
+        _notify(notifier.send_job_start, args.days_back, args.top_n)
         
         job = DailyJob()
         stats = job.run(
@@ -60,19 +74,52 @@ def cmd_run_once(args):
             print(f"- email_stats: {stats['email_stats']}")
         
         # 发送完成通知
-        notifier.send_job_complete(stats, execution_time)
+        _notify(notifier.send_job_complete, stats, execution_time)
         
     except Exception as e:
         # 发送错误通知
         error_msg = f"{str(e)}\n\n{traceback.format_exc()}"
-        notifier.send_job_error(error_msg)
+        _notify(notifier.send_job_error, error_msg)
         logger.error(f"任务执行失败: {e}")
         raise
 
 
+JOBSTORE_URL = "sqlite:///data/jobs.db"
+_daily_job = None
+
+
+def scheduled_run(days_back, top_n, batch_size, only_new, send_email):
+    """定时任务入口（模块级函数，便于任务存储序列化）"""
+    global _daily_job
+    if _daily_job is None:
+        _daily_job = DailyJob()
+    notifier = get_notifier()
+
+    start_time = time.time()
+    try:
+        _notify(notifier.send_job_start, days_back, top_n)
+        
+        stats = _daily_job.run(
+            days_back=days_back,
+            top_n=top_n,
+            summary_batch_size=batch_size,
+            only_new=only_new,
+            send_email=send_email,
+            html_out=None
+        )
+        
+        execution_time = time.time() - start_time
+        _notify(notifier.send_job_complete, stats, execution_time)
+        
+    except Exception as e:
+        error_msg = f"{str(e)}\n\n{traceback.format_exc()}"
+        _notify(notifier.send_job_error, error_msg)
+        logger.error(f"定时任务执行失败: {e}")
+
+
 def cmd_schedule(args):
     try:
-        from apscheduler.schedulers.blocking import BlockingScheduler
+        from apscheduler.schedulers.background import BackgroundScheduler
         from apscheduler.triggers.cron import CronTrigger
         import pytz
     except Exception:
@@ -83,33 +130,20 @@ def cmd_schedule(args):
     hh, mm = args.time.split(":")
     hh, mm = int(hh), int(mm)
 
-    job = DailyJob()
-    notifier = get_notifier()
-    
-    def run_with_notification():
-        """带通知的运行函数"""
-        start_time = time.time()
-        try:
-            notifier.send_job_start(args.days_back, args.top_n)
-            
-            stats = job.run(
-                days_back=args.days_back,
-                top_n=args.top_n,
-                summary_batch_size=args.batch_size,
-                only_new=not args.include_all,
-                send_email=not args.no_email,
-                html_out=None
-            )
-            
-            execution_time = time.time() - start_time
-            notifier.send_job_complete(stats, execution_time)
-            
-        except Exception as e:
-            error_msg = f"{str(e)}\n\n{traceback.format_exc()}"
-            notifier.send_job_error(error_msg)
-            logger.error(f"定时任务执行失败: {e}")
-
-    scheduler = BlockingScheduler(timezone=tz)
+    jobstores = {}
+    try:
+        from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+        os.makedirs("data", exist_ok=True)
+        jobstores['default'] = SQLAlchemyJobStore(url=JOBSTORE_URL)
+    except ImportError:
+        logger.warning("未安装 SQLAlchemy，任务将保存在内存中: pip install sqlalchemy")
+
+    # 同一时刻只允许一个实例运行；错过的多次触发合并为一次，1小时内的延迟仍补跑
+    scheduler = BackgroundScheduler(
+        jobstores=jobstores,
+        timezone=tz,
+        job_defaults={'coalesce': True, 'max_instances': 1, 'misfire_grace_time': 3600}
+    )
     
     # 🆕 支持按天数间隔执行
     if args.interval_days > 1:
@@ -121,12 +155,26 @@ def cmd_schedule(args):
         trigger = CronTrigger(hour=hh, minute=mm, timezone=tz)
         print(f"🕒 已启动定时任务：每天 {args.time} ({args.tz}) 执行")
     
-    scheduler.add_job(run_with_notification, trigger, name="Arxiv Daily Job")
+    # 持久化的任务只能保存可导入的函数与参数；固定ID使重复启动时覆盖旧任务
+    scheduler.add_job(
+        scheduled_run, trigger,
+        id="arxiv_daily", name="Arxiv Daily Job", replace_existing=True,
+        kwargs={
+            'days_back': args.days_back,
+            'top_n': args.top_n,
+            'batch_size': args.batch_size,
+            'only_new': not args.include_all,
+            'send_email': not args.no_email,
+        }
+    )
 
     print("按 Ctrl+C 退出")
+    scheduler.start()
     try:
-        scheduler.start()
+        while True:
+            time.sleep(60)
     except (KeyboardInterrupt, SystemExit):
+        scheduler.shutdown()
         print("\n👋 已退出定时任务")
 
 
@@ -165,7 +213,11 @@ def main():
     if not args.command:
         parser.print_help()
         return
-    args.func(args)
+    try:
+        args.func(args)
+    finally:
+        # 等待已提交的通知发送完毕（钉钉请求自带10秒超时）
+        _notify_pool.shutdown(wait=True)
 
 
 if __name__ == "__main__":
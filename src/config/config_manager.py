@@ -4,19 +4,41 @@
 """
 
 import os
+import copy
 import yaml
 from dotenv import load_dotenv
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
 
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:  # 未编译libyaml时退回纯Python实现
+    from yaml import SafeLoader, SafeDumper
+
 logger = logging.getLogger(__name__)
 
+# YAML解析结果缓存: 路径 -> (mtime, 配置字典)
+_yaml_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def _read_yaml(path: str) -> Dict[str, Any]:
+    """读取YAML文件，文件未修改时直接返回缓存结果的副本"""
+    mtime = os.stat(path).st_mtime
+    cached = _yaml_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = (mtime, yaml.load(f, Loader=SafeLoader) or {})
+        _yaml_cache[path] = cached
+    # 合并环境变量会修改字典，返回副本避免污染缓存
+    return copy.deepcopy(cached[1])
+
 
 class ConfigManager:
     """配置管理器 - 统一管理所有配置项"""
     
     _instance = None
     _config = {}
+    _flat_cache: Dict[str, Any] = {}
     
     def __new__(cls):
         """单例模式"""
@@ -31,28 +53,41 @@ class ConfigManager:
     
     def _load_config(self):
         """加载所有配置"""
+        self._flat_cache = {}
+        
         # 1. 加载环境变量
         load_dotenv('.env')
         
         # 2. 加载YAML配置文件
         config_file = 'config.yaml'
         if os.path.exists(config_file):
-            with open(config_file, 'r', encoding='utf-8') as f:
-                yaml_config = yaml.safe_load(f) or {}
-                self._config = self._merge_configs(yaml_config)
+            self._config = self._merge_configs(_read_yaml(config_file))
         else:
             logger.warning(f"配置文件 {config_file} 不存在，使用环境变量配置")
             self._config = self._load_from_env()
         
+        self._bind_sections()
         self._validate_config()
         logger.info("配置加载完成")
     
+    _SECTIONS = ('arxiv', 'deepseek', 'email', 'scheduler', 'logging', 'storage')
+    
+    def _bind_sections(self):
+        """将各配置段的字典引用绑定为实例属性，供get_*_config直接返回"""
+        for section in self._SECTIONS:
+            setattr(self, section, self._config.get(section, {}))
+    
+    @staticmethod
+    def _split_env(name: str, sep: str, default: str = '') -> list:
+        """按分隔符拆分环境变量，丢弃空白项（未设置时得到空列表而非['']）"""
+        return [item for item in os.getenv(name, default).split(sep) if item.strip()]
+    
     def _load_from_env(self) -> Dict[str, Any]:
         """从环境变量加载配置"""
         return {
             'arxiv': {
-                'keywords': os.getenv('ARXIV_KEYWORDS', '').split('|'),
-                'categories': os.getenv('ARXIV_CATEGORIES', 'cs.CV,cs.AI,cs.LG').split(','),
+                'keywords': self._split_env('ARXIV_KEYWORDS', '|'),
+                'categories': self._split_env('ARXIV_CATEGORIES', ',', 'cs.CV,cs.AI,cs.LG'),
                 'max_results': int(os.getenv('ARXIV_MAX_RESULTS', 50)),
                 'sort_by': os.getenv('ARXIV_SORT_BY', 'submittedDate'),
             },
@@ -67,7 +102,7 @@ class ConfigManager:
                 'sender_password': os.getenv('SENDER_PASSWORD'),
                 'smtp_server': os.getenv('SMTP_SERVER'),
                 'smtp_port': int(os.getenv('SMTP_PORT', 587)),
-                'recipients': os.getenv('RECIPIENT_EMAILS', '').split('|'),
+                'recipients': self._split_env('RECIPIENT_EMAILS', '|'),
             },
             'scheduler': {
                 'execute_time': os.getenv('SCHEDULER_TIME', '09:00'),
@@ -110,7 +145,7 @@ class ConfigManager:
         
         # 检查arxiv关键词
         keywords = self.get('arxiv.keywords', [])
-        if not keywords or all(not k.strip() for k in keywords):
+        if not any(k and k.strip() for k in keywords):
             logger.warning("警告：未设置arxiv搜索关键词")
     
     def get(self, key_path: str, default: Any = None) -> Any:
@@ -125,15 +160,20 @@ class ConfigManager:
         Returns:
             配置值或默认值
         """
-        keys = key_path.split('.')
-        value = self._config
+        try:
+            return self._flat_cache[key_path]
+        except KeyError:
+            pass
         
+        value = self._config
         try:
-            for key in keys:
+            for key in key_path.split('.'):
                 value = value[key]
-            return value
         except (KeyError, TypeError):
             return default
+        
+        self._flat_cache[key_path] = value
+        return value
     
     def set(self, key_path: str, value: Any):
         """
@@ -153,35 +193,44 @@ class ConfigManager:
             config = config[key]
         
         config[keys[-1]] = value
+        
+        if keys[0] in self._SECTIONS:
+            setattr(self, keys[0], self._config[keys[0]])
+        
+        # 失效该路径本身、其子路径及上层路径的缓存
+        for cached in list(self._flat_cache):
+            if (cached == key_path or cached.startswith(key_path + '.')
+                    or key_path.startswith(cached + '.')):
+                del self._flat_cache[cached]
         logger.debug(f"配置已更新: {key_path} = {value}")
     
     def get_arxiv_config(self) -> Dict[str, Any]:
         """获取arxiv爬取配置"""
-        return self.get('arxiv', {})
+        return self.arxiv
     
     def get_deepseek_config(self) -> Dict[str, Any]:
         """获取DeepSeek API配置"""
-        return self.get('deepseek', {})
+        return self.deepseek
     
     def get_email_config(self) -> Dict[str, Any]:
         """获取邮件配置"""
-        return self.get('email', {})
+        return self.email
     
     def get_scheduler_config(self) -> Dict[str, Any]:
         """获取调度配置"""
-        return self.get('scheduler', {})
+        return self.scheduler
     
     def get_logging_config(self) -> Dict[str, Any]:
         """获取日志配置"""
-        return self.get('logging', {})
+        return self.logging
     
     def get_storage_config(self) -> Dict[str, Any]:
         """获取存储配置"""
-        return self.get('storage', {})
+        return self.storage
     
     def display_config(self):
         """打印配置信息（隐藏敏感信息）"""
-        config_copy = dict(self._config)
+        config_copy = copy.deepcopy(self._config)
         
         # 隐藏敏感信息
         if 'deepseek' in config_copy:
@@ -189,7 +238,7 @@ class ConfigManager:
         if 'email' in config_copy:
             config_copy['email']['sender_password'] = '***HIDDEN***'
         
-        logger.info(f"当前配置：\n{yaml.dump(config_copy, allow_unicode=True)}")
+        logger.info(f"当前配置：\n{yaml.dump(config_copy, Dumper=SafeDumper, allow_unicode=True)}")
 
 
 # 全局配置管理器实例
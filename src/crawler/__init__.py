@@ -3,5 +3,6 @@
 """
 
 from .arxiv_crawler import ArxivCrawler, Paper
+from .fetch_cache import cached_fetch_papers
 
-__all__ = ['ArxivCrawler', 'Paper']
+__all__ = ['ArxivCrawler', 'Paper', 'cached_fetch_papers']
@@ -4,16 +4,43 @@ arxiv论文爬取模块
 """
 
 import arxiv
+import asyncio
+import aiohttp
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, asdict
-import time
+import re
+import requests
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .oai_harvester import OAIHarvester
+
+try:
+    import orjson
+except ImportError:  # 未安装orjson时退回标准库
+    orjson = None
+    import json
 
 logger = logging.getLogger(__name__)
 
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+
+# arxiv API使用条款要求的请求间隔（秒）；异步路径的多个查询共用闸门时，单页查询也须遵守
+ARXIV_REQUEST_INTERVAL = 3
+
+# 排序方式映射
+_SORT_MAP = {
+    'submittedDate': arxiv.SortCriterion.SubmittedDate,
+    'relevance': arxiv.SortCriterion.Relevance,
+    'lastUpdatedDate': arxiv.SortCriterion.LastUpdatedDate,
+}
+
 
-@dataclass
+@dataclass(slots=True)
 class Paper:
     """论文数据结构"""
     paper_id: str              # arxiv ID
@@ -22,19 +49,109 @@ class Paper:
     summary: str               # 摘要
     published: str             # 发布日期
     updated: str               # 更新日期
-    categories: str            # 分类
+    categories: Tuple[str, ...]  # 分类
     pdf_url: str               # PDF链接
     arxiv_url: str             # arxiv链接
     fetch_time: str            # 获取时间
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
-        return asdict(self)
+        return {
+            'paper_id': self.paper_id,
+            'title': self.title,
+            'authors': list(self.authors),
+            'summary': self.summary,
+            'published': self.published,
+            'updated': self.updated,
+            'categories': self.categories,
+            'pdf_url': self.pdf_url,
+            'arxiv_url': self.arxiv_url,
+            'fetch_time': self.fetch_time,
+        }
+    
+    def to_json(self) -> bytes:
+        """序列化为UTF-8编码的JSON"""
+        if orjson is not None:
+            return orjson.dumps(self.to_dict())
+        return json.dumps(self.to_dict(), ensure_ascii=False).encode('utf-8')
+
+
+def _join_or(parts: Tuple[str, ...]) -> str:
+    """以OR连接查询片段，多于一项时加括号；为空时回退到cs.CV"""
+    if not parts:
+        return "cat:cs.CV"
+    query = " OR ".join(parts)
+    return f"({query})" if len(parts) > 1 else query
+
+
+def _join_and(kw_parts: Tuple[str, ...], cat_parts: Tuple[str, ...]) -> str:
+    """关键词与分类两组之间取AND，组内取OR"""
+    if kw_parts and cat_parts:
+        return f"({' OR '.join(kw_parts)}) AND ({' OR '.join(cat_parts)})"
+    return " OR ".join(kw_parts or cat_parts) or "cat:cs.CV"
+
+
+# 搜索模式 -> 查询构建函数(关键词片段, 分类片段)
+_QUERY_BUILDERS = {
+    'or': lambda kw, cat: _join_or(kw + cat),              # 宽松匹配
+    'and': _join_and,                                      # 严格匹配
+    'keyword_only': lambda kw, cat: _join_or(kw),          # 仅关键词
+    'category_only': lambda kw, cat: _join_or(cat),        # 仅分类
+}
+
+
+@lru_cache(maxsize=32)
+def _build_query(mode: str, keywords: Tuple[str, ...], categories: Tuple[str, ...]) -> str:
+    """
+    按搜索模式构建查询语句，相同输入直接复用缓存结果
+    
+    Args:
+        mode: 搜索模式，未知模式按'or'处理
+        keywords: 关键词
+        categories: 分类
+    
+    Returns:
+        查询语句
+    """
+    kw_parts = tuple(dict.fromkeys(f"all:{k}" for k in keywords if k.strip()))
+    cat_parts = tuple(dict.fromkeys(f"cat:{c}" for c in categories if c.strip()))
+    
+    query = _QUERY_BUILDERS.get(mode, _QUERY_BUILDERS['or'])(kw_parts, cat_parts)
+    logger.debug(f"{mode}查询: {query}")
+    return query
+
+
+def _make_client(page_size: int, delay_seconds: float) -> arxiv.Client:
+    """
+    创建arxiv客户端，替换其内部会话以复用连接并启用gzip
+    
+    Args:
+        page_size: 每页数量
+        delay_seconds: 翻页间隔（秒）
+    
+    Returns:
+        arxiv客户端
+    """
+    client = arxiv.Client(page_size=page_size, delay_seconds=delay_seconds, num_retries=3)
+    
+    session = requests.Session()
+    session.headers['Accept-Encoding'] = 'gzip'
+    # 仅对连接层错误重试，HTTP状态码重试仍交给arxiv客户端处理
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                          max_retries=Retry(total=3, backoff_factor=0.5, status=0))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    # arxiv 2.1.0 通过 _session 发起全部请求
+    client._session = session
+    
+    return client
 
 
 class ArxivCrawler:
     """arxiv爬虫 - 从arxiv获取论文"""
     
+    API_URL = 'http://export.arxiv.org/api/query'
+    
     def __init__(self, config: Dict[str, Any]):
         """
         初始化爬虫
@@ -47,14 +164,14 @@ class ArxivCrawler:
         self.categories = config.get('categories', [])
         self.max_results = config.get('max_results', 50)
         self.sort_by = config.get('sort_by', 'submittedDate')
+        self.fetch_mode = config.get('fetch_mode', 'api')  # api|oai
         self.search_mode = 'or'  # 默认使用OR逻辑
         
         # 初始化客户端
-        self.client = arxiv.Client(
-            page_size=min(self.max_results, 100),
-            delay_seconds=3,
-            num_retries=3
-        )
+        # 单页即可取完时翻页间隔无意义，仅在跨页时保留3秒间隔以遵守arxiv使用条款
+        page_size = min(self.max_results, 100)
+        self.delay_seconds = config.get('delay_seconds', 3 if self.max_results > page_size else 1)
+        self.client = _make_client(page_size, self.delay_seconds)
         
         logger.info(f"arxiv爬虫已初始化。关键词: {self.keywords}, 分类: {self.categories}")
     
@@ -80,151 +197,331 @@ class ArxivCrawler:
         Returns:
             查询语句
         """
-        mode = self.search_mode
+        return _build_query(self.search_mode, tuple(self.keywords), tuple(self.categories))
+    
+    def fetch_papers(self, days_back: int = 1) -> List[Paper]:
+        """
+        从arxiv获取论文
         
-        if mode == 'keyword_only':
-            return self._build_keyword_query()
-        elif mode == 'category_only':
-            return self._build_category_query()
-        elif mode == 'and':
-            return self._build_and_query()
-        else:  # 默认 'or'
-            return self._build_or_query()
-    
-    def _build_or_query(self) -> str:
-        """使用OR逻辑构建查询（宽松匹配）"""
-        query_parts = []
-        
-        for keyword in self.keywords:
-            if keyword.strip():
-                query_parts.append(f"all:{keyword}")
-        
-        for category in self.categories:
-            if category.strip():
-                query_parts.append(f"cat:{category}")
-        
-        if not query_parts:
-            query_parts.append("cat:cs.CV")
-        
-        query = " OR ".join(query_parts)
-        if len(query_parts) > 1:
-            query = f"({query})"
-        
-        logger.debug(f"OR查询: {query}")
-        return query
-    
-    def _build_and_query(self) -> str:
-        """使用AND逻辑构建查询（严格匹配）"""
-        keyword_part = " OR ".join([f"all:{k}" for k in self.keywords if k.strip()])
-        category_part = " OR ".join([f"cat:{c}" for c in self.categories if c.strip()])
-        
-        if keyword_part and category_part:
-            query = f"({keyword_part}) AND ({category_part})"
-        elif keyword_part:
-            query = keyword_part
-        elif category_part:
-            query = category_part
-        else:
-            query = "cat:cs.CV"
+        Args:
+            days_back: 向后查找的天数（默认1天，即当天）
         
-        logger.debug(f"AND查询: {query}")
-        return query
+        Returns:
+            论文列表
+        """
+        if self.fetch_mode == 'oai':
+            return self.fetch_papers_oai(days_back)
+        
+        return self._fetch_with_query(self.build_search_query(), days_back)
+    
+    def _fetch_with_query(self, query: str, days_back: int) -> List[Paper]:
+        """
+        使用共享客户端执行给定查询
+        
+        Args:
+            query: 查询语句
+            days_back: 向后查找的天数
+        
+        Returns:
+            论文列表，出错时返回空列表
+        """
+        try:
+            logger.info(f"开始从arxiv查询论文（查找过去{days_back}天）...")
+            logger.info(f"搜索查询: {query}")
+            
+            papers = self._collect(self.client, query, days_back)
+            
+            logger.info(f"成功获取 {len(papers)} 篇论文")
+            return papers
+        
+        except Exception as e:
+            logger.error(f"从arxiv获取论文时出错: {e}", exc_info=True)
+            return []
     
-    def _build_keyword_query(self) -> str:
-        """仅使用关键词查询"""
-        query_parts = [f"all:{k}" for k in self.keywords if k.strip()]
-        if not query_parts:
-            query_parts.append("cat:cs.CV")
+    def _collect(self, client: arxiv.Client, query: str, days_back: int) -> List[Paper]:
+        """
+        使用指定客户端执行查询，收集时间范围内的论文
         
-        query = " OR ".join(query_parts)
-        if len(query_parts) > 1:
-            query = f"({query})"
+        Args:
+            client: arxiv客户端
+            query: 查询语句
+            days_back: 向后查找的天数
         
-        logger.debug(f"关键词查询: {query}")
-        return query
+        Returns:
+            论文列表
+        """
+        return list(self._iter_collect(client, query, days_back))
     
-    def _build_category_query(self) -> str:
-        """仅使用分类查询"""
-        query_parts = [f"cat:{c}" for c in self.categories if c.strip()]
-        if not query_parts:
-            query_parts.append("cat:cs.CV")
+    def _iter_collect(self, client: arxiv.Client, query: str, days_back: int) -> Iterator[Paper]:
+        """按发布时间倒序逐篇产出时间范围内的论文"""
+        sort_by = _SORT_MAP.get(self.sort_by, arxiv.SortCriterion.SubmittedDate)
+        
+        # 构建搜索请求
+        search = arxiv.Search(
+            query=query,
+            max_results=self.max_results,
+            sort_by=sort_by,
+            sort_order=arxiv.SortOrder.Descending
+        )
         
-        query = " OR ".join(query_parts)
-        if len(query_parts) > 1:
-            query = f"({query})"
+        # 计算时间范围（entry.published带UTC时区，直接比较时间戳）
+        cutoff_ts = (datetime.now(timezone.utc) - timedelta(days=days_back)).timestamp()
+        fetch_time = datetime.utcnow().isoformat()
         
-        logger.debug(f"分类查询: {query}")
-        return query
+        # 获取论文
+        for entry in client.results(search):
+            # 检查论文发布日期
+            if entry.published.timestamp() < cutoff_ts:
+                logger.debug(f"论文 {entry.entry_id} 发布于{entry.published}，已超出时间范围")
+                break
+            
+            paper = self._parse_paper(entry, fetch_time)
+            logger.debug(f"获取论文: {paper.title[:50]}...")
+            yield paper
     
-    def fetch_papers(self, days_back: int = 1) -> List[Paper]:
+    async def fetch_papers_async(self, days_back: int = 1,
+                                 queries: Optional[List[str]] = None) -> List[Paper]:
         """
-        从arxiv获取论文
+        异步从arxiv获取论文，多个查询共享同一连接池与请求节流
         
         Args:
-            days_back: 向后查找的天数（默认1天，即当天）
+            days_back: 向后查找的天数
+            queries: 查询语句列表，默认使用当前配置构建的查询
         
         Returns:
-            论文列表
+            论文列表（多个查询时按paper_id去重）
         """
-        query = self.build_search_query()
-        papers = []
+        queries = queries or [self.build_search_query()]
         
         try:
-            logger.info(f"开始从arxiv查询论文（查找过去{days_back}天）...")
-            logger.info(f"搜索查询: {query}")
+            logger.info(f"开始异步查询arxiv（{len(queries)}个查询，查找过去{days_back}天）...")
             
-            # 排序方式映射
-            sort_criterion_map = {
-                'submittedDate': arxiv.SortCriterion.SubmittedDate,
-                'relevance': arxiv.SortCriterion.Relevance,
-                'lastUpdatedDate': arxiv.SortCriterion.LastUpdatedDate,
-            }
-            sort_by = sort_criterion_map.get(self.sort_by, arxiv.SortCriterion.SubmittedDate)
+            connector = aiohttp.TCPConnector(limit=4, keepalive_timeout=60)
+            timeout = aiohttp.ClientTimeout(total=self.config.get('timeout', 30))
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                # 同一时刻只有一个请求在途，请求间至少间隔3秒（或更长的delay_seconds）
+                gate = asyncio.Semaphore(1)
+                results = await asyncio.gather(
+                    *[self._collect_async(session, gate, q, days_back) for q in queries]
+                )
             
-            # 构建搜索请求
-            search = arxiv.Search(
-                query=query,
-                max_results=self.max_results,
-                sort_by=sort_by,
-                sort_order=arxiv.SortOrder.Descending
-            )
+            papers: Dict[str, Paper] = {}
+            for batch in results:
+                for paper in batch:
+                    papers.setdefault(paper.paper_id, paper)
             
-            # 计算时间范围
-            now = datetime.utcnow()
-            cutoff_date = now - timedelta(days=days_back)
+            logger.info(f"成功获取 {len(papers)} 篇论文")
+            return list(papers.values())
+        
+        except Exception as e:
+            logger.error(f"异步获取论文时出错: {e}", exc_info=True)
+            return []
+    
+    async def _collect_async(self, session: aiohttp.ClientSession, gate: asyncio.Semaphore,
+                             query: str, days_back: int) -> List[Paper]:
+        """逐页异步查询，直到超出时间范围或达到max_results"""
+        page_size = min(self.max_results, 100)
+        cutoff_date = (datetime.now(timezone.utc) - timedelta(days=days_back)).isoformat()
+        fetch_time = datetime.utcnow().isoformat()
+        papers = []
+        
+        start = 0
+        while start < self.max_results:
+            body = await self._query_page(
+                session, gate, query, start, min(page_size, self.max_results - start)
+            )
+            page = self._parse_atom(body, fetch_time)
+            if not page:
+                break
             
-            # 获取论文
-            count = 0
-            for entry in self.client.results(search):
-                # 检查论文发布日期
-                published_date = entry.published.replace(tzinfo=None)
-                
-                if published_date < cutoff_date:
-                    logger.debug(f"论文 {entry.entry_id} 发布于{published_date}，已超出时间范围")
-                    break
-                
-                paper = self._parse_paper(entry)
+            for paper in page:
+                # 同为UTC的ISO格式字符串，可直接按字典序比较
+                if paper.published < cutoff_date:
+                    return papers
                 papers.append(paper)
-                count += 1
-                
-                logger.debug(f"获取论文: {paper.title[:50]}...")
-                
-                # 避免触发arxiv的速率限制
-                time.sleep(0.5)
             
-            logger.info(f"成功获取 {count} 篇论文")
+            start += len(page)
+        
+        return papers
+    
+    async def _query_page(self, session: aiohttp.ClientSession, gate: asyncio.Semaphore,
+                          query: str, start: int, max_results: int) -> bytes:
+        """
+        请求单页Atom结果
+        
+        Args:
+            session: 复用的HTTP会话
+            gate: 全局请求闸门
+            query: 查询语句
+            start: 起始偏移
+            max_results: 本页数量
+        
+        Returns:
+            Atom响应原文
+        """
+        params = {
+            'search_query': query,
+            'start': start,
+            'max_results': max_results,
+            'sortBy': self.sort_by,
+            'sortOrder': 'descending',
+        }
+        
+        await gate.acquire()
+        try:
+            async with session.get(self.API_URL, params=params) as response:
+                response.raise_for_status()
+                body = await response.read()
+        finally:
+            # 闸门在访问间隔结束后才释放，保证下一次请求满足arxiv的要求；
+            # 本页响应立即返回，解析与间隔等待重叠，间隔一到即可发出下一页请求
+            interval = max(self.delay_seconds, ARXIV_REQUEST_INTERVAL)
+            asyncio.get_running_loop().call_later(interval, gate.release)
+        
+        return body
+    
+    @staticmethod
+    def _parse_atom(xml_bytes: bytes, fetch_time: str) -> List[Paper]:
+        """
+        直接解析arxiv API返回的Atom XML（C实现的ElementTree，绕过feedparser）
+        
+        Args:
+            xml_bytes: Atom响应原文
+            fetch_time: 获取时间
+        
+        Returns:
+            Paper列表
+        """
+        def utc_iso(text: str) -> str:
+            return datetime.fromisoformat(text.replace('Z', '+00:00')).isoformat()
+        
+        papers = []
+        for entry in ET.fromstring(xml_bytes).iter(f'{ATOM_NS}entry'):
+            entry_id = entry.findtext(f'{ATOM_NS}id', '')
+            if '/api/errors' in entry_id:
+                raise ValueError(f"arxiv查询错误: {entry.findtext(f'{ATOM_NS}summary', '')}")
+            
+            paper_id = entry_id.split('/abs/')[-1]
+            papers.append(Paper(
+                paper_id=paper_id,
+                title=re.sub(r'\s+', ' ', entry.findtext(f'{ATOM_NS}title', '')).strip(),
+                authors=[a.findtext(f'{ATOM_NS}name', '') for a in entry.iter(f'{ATOM_NS}author')],
+                summary=entry.findtext(f'{ATOM_NS}summary', '').strip(),
+                published=utc_iso(entry.findtext(f'{ATOM_NS}published')),
+                updated=utc_iso(entry.findtext(f'{ATOM_NS}updated')),
+                categories=tuple(c.get('term') for c in entry.iter(f'{ATOM_NS}category')),
+                pdf_url=f"https://arxiv.org/pdf/{paper_id}.pdf",
+                arxiv_url=f"https://arxiv.org/abs/{paper_id}",
+                fetch_time=fetch_time
+            ))
+        
+        return papers
+    
+    def fetch_papers_parallel(self, keyword_groups: List[List[str]], days_back: int = 1) -> List[Paper]:
+        """
+        执行多组关键词查询，按paper_id合并去重
+        
+        各组查询经由 fetch_papers_async 共用同一个请求闸门：arxiv使用条款要求同一时刻只有一个连接、
+        请求间隔不少于3秒，因此不另开线程并发请求，只让翻页解析与间隔等待重叠；
+        需在没有运行中事件循环的线程中调用
+        
+        Args:
+            keyword_groups: 关键词分组，每组构成一个独立的OR查询
+            days_back: 向后查找的天数
+        
+        Returns:
+            去重后的论文列表（按发布日期倒序）
+        """
+        queries = [_build_query('keyword_only', tuple(group), ()) for group in keyword_groups]
+        logger.info(f"开始查询 {len(queries)} 组关键词...")
+        
+        papers = asyncio.run(self.fetch_papers_async(days_back, queries=queries))
+        
+        result = sorted(papers, key=lambda p: p.published, reverse=True)
+        logger.info(f"多组查询完成，去重后共 {len(result)} 篇论文")
+        return result
+    
+    def fetch_papers_oai(self, days_back: int = 1) -> List[Paper]:
+        """
+        通过OAI-PMH批量获取论文，关键词/分类在本地过滤
+        
+        Args:
+            days_back: 向后查找的天数
+        
+        Returns:
+            论文列表（按发布日期倒序，最多max_results篇）
+        """
+        cutoff = datetime.utcnow() - timedelta(days=days_back)
+        cutoff_str = cutoff.strftime('%Y-%m-%d')
+        set_spec = self.categories[0].split('.')[0] if self.categories else 'cs'
+        papers = []
+        
+        try:
+            logger.info(f"开始通过OAI-PMH批量获取论文（集合: {set_spec}, 起始: {cutoff_str}）...")
+            harvester = OAIHarvester()
+            fetch_time = datetime.utcnow().isoformat()
+            
+            for record in harvester.list_records(set_spec, cutoff_str):
+                # OAI的from按记录修改日期过滤，这里按首次提交日期再筛一次
+                if record['created'] < cutoff_str:
+                    continue
+                if not self._match_record(record):
+                    continue
+                papers.append(self._parse_oai_record(record, fetch_time))
+            
+            papers.sort(key=lambda p: p.published, reverse=True)
+            papers = papers[:self.max_results]
+            logger.info(f"成功获取 {len(papers)} 篇论文")
             return papers
         
         except Exception as e:
-            logger.error(f"从arxiv获取论文时出错: {e}", exc_info=True)
+            logger.error(f"通过OAI-PMH获取论文时出错: {e}", exc_info=True)
             return []
     
-    def _parse_paper(self, entry) -> Paper:
+    def _match_record(self, record: Dict[str, Any]) -> bool:
+        """按搜索模式在本地匹配OAI记录的关键词与分类"""
+        text = f"{record['title']} {record['abstract']}".lower()
+        keywords = [k.lower() for k in self.keywords if k.strip()]
+        categories = [c for c in self.categories if c.strip()]
+        
+        kw_hit = any(k in text for k in keywords)
+        cat_hit = any(c in record['categories'] for c in categories)
+        
+        mode = self.search_mode
+        if mode == 'keyword_only':
+            return kw_hit or not keywords
+        elif mode == 'category_only':
+            return cat_hit or not categories
+        elif mode == 'and':
+            return (kw_hit or not keywords) and (cat_hit or not categories)
+        else:
+            return kw_hit or cat_hit
+    
+    @staticmethod
+    def _parse_oai_record(record: Dict[str, Any], fetch_time: str) -> Paper:
+        """将OAI记录转换为Paper对象"""
+        paper_id = record['id']
+        
+        return Paper(
+            paper_id=paper_id,
+            title=record['title'],
+            authors=record['authors'],
+            summary=record['abstract'],
+            published=record['created'],
+            updated=record['updated'],
+            categories=tuple(record['categories']),
+            pdf_url=f"https://arxiv.org/pdf/{paper_id}.pdf",
+            arxiv_url=f"https://arxiv.org/abs/{paper_id}",
+            fetch_time=fetch_time
+        )
+    
+    def _parse_paper(self, entry, fetch_time: Optional[str] = None) -> Paper:
         """
         解析arxiv条目为Paper对象
         
         Args:
             entry: arxiv API返回的条目
+            fetch_time: 获取时间，批量解析时由调用方统一传入
         
         Returns:
             Paper对象
@@ -233,7 +530,7 @@ class ArxivCrawler:
         authors = [author.name for author in entry.authors]
         
         # 提取分类
-        categories = ", ".join(entry.categories)
+        categories = tuple(entry.categories)
         
         # 构造URLs
         paper_id = entry.entry_id.split('/abs/')[-1]
@@ -250,7 +547,7 @@ class ArxivCrawler:
             categories=categories,
             pdf_url=pdf_url,
             arxiv_url=arxiv_url,
-            fetch_time=datetime.utcnow().isoformat()
+            fetch_time=fetch_time or datetime.utcnow().isoformat()
         )
         
         return paper
@@ -266,16 +563,9 @@ class ArxivCrawler:
         Returns:
             论文列表
         """
-        # 临时替换关键词
-        original_keywords = self.keywords
-        self.keywords = keywords
-        
-        try:
-            papers = self.fetch_papers(days_back)
-            return papers
-        finally:
-            # 恢复原始关键词
-            self.keywords = original_keywords
+        # 查询只在本次调用内构建，不再临时替换self.keywords
+        query = _build_query(self.search_mode, tuple(keywords), tuple(self.categories))
+        return self._fetch_with_query(query, days_back)
     
     def download_paper_info(self, paper_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -287,15 +577,40 @@ class ArxivCrawler:
         Returns:
             论文信息字典或None
         """
-        try:
-            search = arxiv.Search(id_list=[paper_id])
-            for entry in self.client.results(search):
-                paper = self._parse_paper(entry)
-                return paper.to_dict()
-            return None
-        except Exception as e:
-            logger.error(f"下载论文 {paper_id} 信息时出错: {e}")
-            return None
+        return self.download_papers_info([paper_id]).get(paper_id)
+    
+    def download_papers_info(self, paper_ids: List[str], chunk: int = 100) -> Dict[str, Dict[str, Any]]:
+        """
+        批量下载论文详细信息，每批通过一次id_list查询获取
+        
+        Args:
+            paper_ids: 论文ID列表
+            chunk: 每次查询的ID数量（arxiv单次最多约100个）
+        
+        Returns:
+            {paper_id: 论文信息字典}，查询失败的ID不在结果中
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        fetch_time = datetime.utcnow().isoformat()
+        
+        for i in range(0, len(paper_ids), chunk):
+            batch = paper_ids[i:i + chunk]
+            try:
+                search = arxiv.Search(id_list=batch, max_results=len(batch))
+                for entry in self.client.results(search):
+                    paper = self._parse_paper(entry, fetch_time)
+                    results[paper.paper_id] = paper.to_dict()
+            except Exception as e:
+                logger.error(f"批量下载论文信息时出错（{len(batch)}篇）: {e}")
+        
+        # 返回的ID带版本号，调用方传入无版本号ID时同样可以命中
+        requested = set(paper_ids)
+        for key in list(results):
+            base_id = key.rsplit('v', 1)[0]
+            if base_id in requested:
+                results.setdefault(base_id, results[key])
+        
+        return results
 
 
 def main():
@@ -0,0 +1,63 @@
+"""
+爬取结果缓存模块
+开发调试时多个测试脚本反复以相同参数爬取arxiv（分页之间还有限速等待），
+这里按查询参数把结果存入本地shelve，有效期内重复运行直接读取，不再访问网络
+"""
+
+import hashlib
+import logging
+import os
+import shelve
+import time
+from typing import List
+
+from .arxiv_crawler import ArxivCrawler, Paper
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join('data', 'arxiv_fetch_cache')
+
+
+def _cache_key(crawler: ArxivCrawler, days_back: int) -> str:
+    """由影响爬取结果的参数生成缓存键"""
+    raw = '|'.join((crawler.fetch_mode, crawler.build_search_query(),
+                    str(crawler.max_results), str(days_back)))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def cached_fetch_papers(crawler: ArxivCrawler, days_back: int = 1, ttl: float = 3600,
+                        path: str = DEFAULT_CACHE_PATH) -> List[Paper]:
+    """
+    带本地缓存的 crawler.fetch_papers
+
+    Args:
+        crawler: 爬虫实例（查询语句、爬取方式、最大结果数都参与缓存键）
+        days_back: 向后查找的天数
+        ttl: 缓存有效期（秒），默认1小时
+        path: shelve文件路径（不含扩展名）
+
+    Returns:
+        论文列表
+    """
+    key = _cache_key(crawler, days_back)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    try:
+        with shelve.open(path) as cache:
+            entry = cache.get(key)
+    except Exception as e:
+        logger.warning(f"爬取缓存读取失败，忽略: {e}")
+        entry = None
+
+    if entry is not None and time.time() - entry[0] < ttl:
+        logger.info(f"使用缓存的爬取结果: {len(entry[1])} 篇（{int(time.time() - entry[0])}秒前）")
+        return entry[1]
+
+    papers = crawler.fetch_papers(days_back=days_back)
+    # 爬取出错时 fetch_papers 返回空列表，不缓存，下次重新请求
+    if papers:
+        try:
+            with shelve.open(path) as cache:
+                cache[key] = (time.time(), papers)
+        except Exception as e:
+            logger.warning(f"爬取缓存写入失败: {e}")
+    return papers
@@ -0,0 +1,142 @@
+"""
+arxiv OAI-PMH 批量采集模块
+通过 ListRecords 接口按日期范围批量拉取论文元数据，一次请求返回数百条记录
+"""
+
+import logging
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Any, Iterator, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+OAI_NS = '{http://www.openarchives.org/OAI/2.0/}'
+ARXIV_NS = '{http://arxiv.org/OAI/arXiv/}'
+
+
+class OAIHarvester:
+    """arxiv OAI-PMH 采集器"""
+
+    BASE_URL = 'http://export.arxiv.org/oai2'
+
+    def __init__(self, timeout: int = 60, max_retries: int = 3,
+                 session: Optional[requests.Session] = None):
+        """
+        初始化采集器
+
+        Args:
+            timeout: 单次请求超时（秒）
+            max_retries: 遇到503限流时的最大重试次数
+            session: 可复用的HTTP会话
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = session or requests.Session()
+        self.session.headers['Accept-Encoding'] = 'gzip'
+
+    def list_records(self, set_spec: str, from_date: str) -> Iterator[Dict[str, Any]]:
+        """
+        按集合与起始日期批量拉取记录，自动跟随 resumptionToken 翻页
+
+        Args:
+            set_spec: OAI集合（如 'cs'）
+            from_date: 起始日期 YYYY-MM-DD
+
+        Yields:
+            论文记录字典
+        """
+        params = {
+            'verb': 'ListRecords',
+            'set': set_spec,
+            'from': from_date,
+            'metadataPrefix': 'arXiv',
+        }
+
+        page = 0
+        while params:
+            page += 1
+            response = self._request(params)
+            token = None
+
+            try:
+                response.raw.decode_content = True
+                for record, token in self._iter_records(response.raw):
+                    if record is not None:
+                        yield record
+            finally:
+                response.close()
+
+            logger.debug(f"OAI第{page}页解析完成")
+            # 继续翻页时只能携带 verb 和 resumptionToken
+            params = {'verb': 'ListRecords', 'resumptionToken': token} if token else None
+
+    def _request(self, params: Dict[str, str]) -> requests.Response:
+        """发起请求，处理 503 Retry-After 限流"""
+        for attempt in range(self.max_retries + 1):
+            response = self.session.get(self.BASE_URL, params=params,
+                                        timeout=self.timeout, stream=True)
+            if response.status_code != 503 or attempt == self.max_retries:
+                response.raise_for_status()
+                return response
+
+            retry_after = int(response.headers.get('Retry-After', 10))
+            response.close()
+            logger.info(f"OAI接口限流，{retry_after}秒后重试...")
+            time.sleep(retry_after)
+
+        raise RuntimeError("OAI请求失败")
+
+    @staticmethod
+    def _iter_records(stream) -> Iterator:
+        """
+        流式解析 ListRecords 响应，避免构建完整DOM
+
+        Yields:
+            (记录字典或None, resumptionToken或None)
+        """
+        token = None
+        for _, elem in ET.iterparse(stream, events=('end',)):
+            tag = elem.tag
+            if tag == f'{OAI_NS}record':
+                header = elem.find(f'{OAI_NS}header')
+                if header is not None and header.get('status') == 'deleted':
+                    elem.clear()
+                    continue
+
+                meta = elem.find(f'{OAI_NS}metadata/{ARXIV_NS}arXiv')
+                if meta is not None:
+                    yield OAIHarvester._parse_metadata(meta), None
+                elem.clear()
+            elif tag == f'{OAI_NS}resumptionToken':
+                token = (elem.text or '').strip() or None
+            elif tag == f'{OAI_NS}error':
+                code = elem.get('code')
+                if code != 'noRecordsMatch':
+                    raise RuntimeError(f"OAI错误 {code}: {elem.text}")
+
+        yield None, token
+
+    @staticmethod
+    def _parse_metadata(meta) -> Dict[str, Any]:
+        """将 arXiv 元数据节点转换为字典"""
+        def text(tag: str) -> str:
+            node = meta.find(f'{ARXIV_NS}{tag}')
+            return ' '.join((node.text or '').split()) if node is not None else ''
+
+        authors = []
+        for author in meta.iterfind(f'{ARXIV_NS}authors/{ARXIV_NS}author'):
+            forenames = author.findtext(f'{ARXIV_NS}forenames', '').strip()
+            keyname = author.findtext(f'{ARXIV_NS}keyname', '').strip()
+            authors.append(f"{forenames} {keyname}".strip())
+
+        return {
+            'id': text('id'),
+            'title': text('title'),
+            'authors': authors,
+            'abstract': text('abstract'),
+            'categories': text('categories').split(),
+            'created': text('created'),
+            'updated': text('updated') or text('created'),
+        }
@@ -2,6 +2,7 @@
 论文质量评估模块
 """
 
-from .paper_evaluator import PaperEvaluator, PaperQuality
+from .paper_evaluator import PaperEvaluator, PaperQuality, PaperQualityBatch
+from .evaluation_store import EvaluationStore
 
-__all__ = ['PaperEvaluator', 'PaperQuality']
+__all__ = ['PaperEvaluator', 'PaperQuality', 'PaperQualityBatch', 'EvaluationStore']
@@ -0,0 +1,96 @@
+"""
+评估结果持久化模块
+以论文内容哈希为键将质量评估结果存入SQLite，重复运行时未变化的论文不再调用API
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+try:
+    from orjson import loads as json_loads, dumps as json_dumps
+except ImportError:  # 未安装orjson时退回标准库
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.path.join('data', 'evaluations.db')
+
+
+def content_hash(title: str, summary: str) -> str:
+    """计算论文内容哈希（标题 + 摘要前1500字）"""
+    text = f"{title}\n{summary[:1500]}"
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class EvaluationStore:
+    """基于SQLite的评估结果存储"""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        """
+        打开（必要时创建）存储
+
+        Args:
+            path: 数据库文件路径
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS evals ('
+            'content_hash TEXT PRIMARY KEY, paper_id TEXT, quality_json BLOB, ts INTEGER)'
+        )
+        self._conn.commit()
+
+    def get(self, title: str, summary: str) -> Optional[Dict[str, Any]]:
+        """
+        查找评估结果
+
+        Args:
+            title: 论文标题
+            summary: 论文摘要
+
+        Returns:
+            评估结果字典，未找到时返回None
+        """
+        row = self._conn.execute(
+            'SELECT quality_json FROM evals WHERE content_hash = ?',
+            (content_hash(title, summary),)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json_loads(row[0])
+        except Exception as e:
+            logger.warning(f"评估存储记录损坏，忽略: {e}")
+            return None
+
+    def put(self, paper_id: str, title: str, summary: str, quality: Dict[str, Any]):
+        """
+        写入评估结果
+
+        Args:
+            paper_id: 论文ID
+            title: 论文标题
+            summary: 论文摘要
+            quality: 评估结果字典
+        """
+        # WAL + synchronous=NORMAL 下提交不触发fsync，逐条提交开销很小
+        with self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO evals (content_hash, paper_id, quality_json, ts) VALUES (?, ?, ?, ?)',
+                (content_hash(title, summary), paper_id, json_dumps(quality), int(time.time()))
+            )
+
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
@@ -5,12 +5,28 @@
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
-from datetime import datetime
+from array import array
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timezone
 import aiohttp
 import json
 
+try:
+    from orjson import loads as json_loads, dumps as json_dumps
+except ImportError:  # 未安装orjson时退回标准库
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+from ..extractor.deepseek_client import (
+    JsonScanner, extract_json_object, extract_json_array, read_stream_content, truncate_for_prompt
+)
+from ..extractor.semantic_cache import get_semantic_cache
+from ..extractor.rate_limiter import estimate_tokens, get_rate_limiter, parse_retry_after
+from .evaluation_store import EvaluationStore, DEFAULT_STORE_PATH
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,18 +58,104 @@ class PaperQuality:
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
-        return asdict(self)
+        return {
+            'paper_id': self.paper_id,
+            'title': self.title,
+            'innovation_score': self.innovation_score,
+            'practicality_score': self.practicality_score,
+            'technical_depth_score': self.technical_depth_score,
+            'experimental_rigor_score': self.experimental_rigor_score,
+            'impact_potential_score': self.impact_potential_score,
+            'overall_score': self.overall_score,
+            'quality_level': self.quality_level,
+            'reasoning': self.reasoning,
+            'strengths': list(self.strengths),
+            'weaknesses': list(self.weaknesses),
+            'evaluation_time': self.evaluation_time,
+            'evaluation_status': self.evaluation_status,
+        }
+
+
+class PaperQualityBatch:
+    """
+    批量评估结果（按列存储）
+    
+    数值评分存放在紧凑的 float 数组中，其余字段各占一个列表；
+    排序、按等级筛选与序列化都按列一次遍历完成，无需逐条构造对象
+    """
+    
+    SCORE_COLUMNS = (
+        'innovation_score', 'practicality_score', 'technical_depth_score',
+        'experimental_rigor_score', 'impact_potential_score', 'overall_score',
+    )
+    TEXT_COLUMNS = (
+        'paper_id', 'title', 'quality_level', 'reasoning',
+        'strengths', 'weaknesses', 'evaluation_time', 'evaluation_status',
+    )
+    
+    def __init__(self, qualities: Iterable[PaperQuality] = ()):
+        self.columns: Dict[str, Any] = {name: array('d') for name in self.SCORE_COLUMNS}
+        self.columns.update({name: [] for name in self.TEXT_COLUMNS})
+        for quality in qualities:
+            self.append(quality)
+    
+    def append(self, quality: PaperQuality):
+        """追加一条评估结果"""
+        for name, column in self.columns.items():
+            column.append(getattr(quality, name))
+    
+    def __len__(self) -> int:
+        return len(self.columns['paper_id'])
+    
+    def __getitem__(self, index: int) -> PaperQuality:
+        return PaperQuality(**{name: column[index] for name, column in self.columns.items()})
+    
+    def __iter__(self) -> Iterator[PaperQuality]:
+        return (self[i] for i in range(len(self)))
+    
+    @property
+    def overall_scores(self) -> array:
+        return self.columns['overall_score']
+    
+    def argsort(self, column: str = 'overall_score', descending: bool = True) -> List[int]:
+        """
+        按评分列排序
+        
+        Args:
+            column: 评分列名
+            descending: 是否降序
+        
+        Returns:
+            排序后的下标列表
+        """
+        return sorted(range(len(self)), key=self.columns[column].__getitem__, reverse=descending)
+    
+    def mask_levels(self, levels: Iterable[str]) -> List[int]:
+        """返回质量等级属于 levels 的下标列表"""
+        wanted = set(levels)
+        return [i for i, level in enumerate(self.columns['quality_level']) if level in wanted]
+    
+    def take(self, indices: Iterable[int]) -> 'PaperQualityBatch':
+        """按下标选出子集（保持给定顺序）"""
+        indices = list(indices)
+        batch = PaperQualityBatch()
+        for name, column in self.columns.items():
+            batch.columns[name].extend(column[i] for i in indices)
+        return batch
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """逐列一次遍历序列化为字典列表"""
+        names = list(self.columns)
+        rows = zip(*(self.columns[name] for name in names))
+        return [dict(zip(names, row)) for row in rows]
 
 
 class PaperEvaluator:
     """论文质量评估器 - 使用AI进行多维度分析"""
     
-    # 评估提示词模板
-    EVALUATION_PROMPT = """你是一位资深的学术论文评审专家。请从以下5个维度对这篇论文进行客观、严谨的评估：
-
-**论文信息：**
-标题：{title}
-摘要：{summary}
+    # 评估规则（系统消息）。所有请求的前缀逐字节一致，便于服务端复用前缀缓存，
+    # 因此这里不能包含时间戳等可变内容；论文信息放在用户消息中
+    EVALUATION_SYSTEM_PROMPT = """你是一位资深的学术论文评审专家。请从以下5个维度对用户给出的论文进行客观、严谨的评估：
 
 **评估维度（每个维度1-10分）：**
 1. **创新性 (Innovation)**：方法是否新颖，是否有理论或技术突破
@@ -70,7 +172,7 @@ class PaperEvaluator:
 - 1-2分：较弱（Weak）- 该维度表现较弱，需要大幅改进
 
 **请严格按照以下JSON格式输出（不要添加任何其他文字）：**
-{{
+{
     "innovation_score": 数字(1-10),
     "practicality_score": 数字(1-10),
     "technical_depth_score": 数字(1-10),
@@ -81,7 +183,7 @@ class PaperEvaluator:
     "reasoning": "综合评估理由（100-200字，说明各维度得分依据）",
     "strengths": ["优点1", "优点2", "优点3"],
     "weaknesses": ["不足1", "不足2"]
-}}
+}
 
 **注意事项：**
 1. 综合评分应为5个维度分数的加权平均（创新性和影响力权重更高）
@@ -90,6 +192,20 @@ class PaperEvaluator:
 4. 优点和不足要基于摘要内容，具体可操作
 """
 
+    # 单篇论文的用户消息
+    EVALUATION_USER_TEMPLATE = """**论文信息：**
+标题：{title}
+摘要：{summary}"""
+
+    # 多篇论文合并为一次请求时的用户消息，评估规则仍复用同一系统消息
+    BATCH_USER_HEADER = """请按上述标准依次评估以下{count}篇论文。
+输出一个JSON数组，按输入顺序包含{count}个元素，每个元素的格式与上面的JSON对象相同，并额外包含 "paper_id" 字段。
+不要添加任何其他文字。"""
+
+    BATCH_PAPER_TEMPLATE = """[{index}] paper_id: {paper_id}
+标题：{title}
+摘要：{summary}"""
+
     def __init__(self, deepseek_config: Dict[str, Any]):
         """
         初始化评估器
@@ -101,61 +217,65 @@ class PaperEvaluator:
         self.api_url = deepseek_config.get('api_url', 'https://api.deepseek.com/v1')
         self.model = deepseek_config.get('model', 'deepseek-chat')
         self.timeout = deepseek_config.get('timeout', 30)
+        self.cache = get_semantic_cache() if deepseek_config.get('semantic_cache', True) else None
+        # 按内容哈希持久化评估结果，每日重复运行时未变化的论文直接复用
+        store_path = deepseek_config.get('evaluation_store', DEFAULT_STORE_PATH)
+        self.store = EvaluationStore(store_path) if store_path else None
+        self.rate_limiter = get_rate_limiter(deepseek_config)
+        # 每次请求评估的论文数，>1时多篇论文共用一次评估规则的输入
+        self.papers_per_call = max(1, int(deepseek_config.get('papers_per_call', 5)))
+        self._batch_time: Optional[str] = None
         
         if not self.api_key:
             raise ValueError("DeepSeek API密钥未配置")
         
+        # 每次请求不变的部分只构造一次
+        self._headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        self._base_payload = {
+            'model': self.model,
+            'temperature': 0.3,  # 降低温度以获得更一致的评分
+            'stream': True
+        }
+        self._timeout = aiohttp.ClientTimeout(total=self.timeout)
+        
         logger.info(f"论文质量评估器已初始化: {self.model}")
     
-    async def _call_deepseek_api(self, prompt: str, session: aiohttp.ClientSession) -> Dict[str, Any]:
+    async def _chat(self, messages: List[Dict[str, str]], session: aiohttp.ClientSession,
+                    max_tokens: int = 800, json_opener: str = '{') -> Optional[str]:
         """
-        调用DeepSeek API进行评估
+        以流式方式调用DeepSeek对话接口，JSON闭合后即停止读取
         
         Args:
-            prompt: 评估提示词
+            messages: 消息列表
             session: aiohttp会话
+            max_tokens: 最大输出token数
+            json_opener: 期望输出的JSON类型，'{' 为对象，'[' 为数组
         
         Returns:
-            API响应的JSON结果
+            模型回复文本，失败时返回None
         """
-        headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
-        
-        payload = {
-            'model': self.model,
-            'messages': [
-                {'role': 'user', 'content': prompt}
-            ],
-            'temperature': 0.3,  # 降低温度以获得更一致的评分
-            'max_tokens': 800
-        }
+        payload = {**self._base_payload, 'messages': messages, 'max_tokens': max_tokens}
+        if json_opener == '{':
+            payload['response_format'] = {'type': 'json_object'}
+        closer = ']' if json_opener == '[' else '}'
         
         try:
-            async with session.post(
+            async with self.rate_limiter.acquire(estimate_tokens(messages, max_tokens)), session.post(
                 f"{self.api_url}/chat/completions",
-                json=payload,
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=self.timeout)
+                data=json_dumps(payload),
+                headers=self._headers,
+                timeout=self._timeout
             ) as response:
                 if response.status == 200:
-                    data = await response.json()
-                    content = data['choices'][0]['message']['content'].strip()
-                    
-                    # 提取JSON内容
-                    # 有些模型可能会在JSON前后添加文字，需要提取
-                    json_start = content.find('{')
-                    json_end = content.rfind('}') + 1
-                    
-                    if json_start >= 0 and json_end > json_start:
-                        json_str = content[json_start:json_end]
-                        result = json.loads(json_str)
-                        return result
-                    else:
-                        logger.error(f"无法从响应中提取JSON: {content}")
-                        return None
+                    content = await read_stream_content(response, JsonScanner(json_opener, closer))
+                    self.rate_limiter.on_success()
+                    return content.strip()
                 else:
+                    if response.status == 429:
+                        self.rate_limiter.on_throttle(parse_retry_after(response.headers.get('Retry-After')))
                     error_text = await response.text()
                     logger.error(f"DeepSeek API错误 {response.status}: {error_text}")
                     return None
@@ -167,6 +287,35 @@ class PaperEvaluator:
             logger.error(f"DeepSeek API调用异常: {e}")
             return None
     
+    async def _call_deepseek_api(self, messages: List[Dict[str, str]],
+                                 session: aiohttp.ClientSession) -> Dict[str, Any]:
+        """
+        调用DeepSeek API进行评估
+        
+        Args:
+            messages: 消息列表
+            session: aiohttp会话
+        
+        Returns:
+            API响应的JSON结果
+        """
+        content = await self._chat(messages, session)
+        if content is None:
+            return None
+        
+        # 提取JSON内容
+        # 有些模型可能会在JSON前后添加文字，需要提取
+        json_str = extract_json_object(content)
+        if not json_str:
+            logger.error(f"无法从响应中提取JSON: {content}")
+            return None
+        
+        try:
+            return json_loads(json_str)
+        except Exception as e:
+            logger.error(f"评估结果JSON解析失败: {e}")
+            return None
+    
     def _create_fallback_quality(self, paper: Dict[str, Any]) -> PaperQuality:
         """
         创建备选的质量评估（当AI不可用时）
@@ -196,7 +345,7 @@ class PaperEvaluator:
             reasoning='AI评估暂时不可用，基于关键词匹配给出保守评分。',
             strengths=['匹配研究关键词'],
             weaknesses=['需要详细阅读原文以准确评估'],
-            evaluation_time=datetime.utcnow().isoformat(),
+            evaluation_time=self._evaluation_time(),
             evaluation_status='fallback'
         )
     
@@ -221,37 +370,26 @@ class PaperEvaluator:
         
         logger.info(f"开始评估论文: {paper_id}")
         
-        # 构建提示词
-        prompt = self.EVALUATION_PROMPT.format(
-            title=title,
-            summary=summary[:1500]  # 限制摘要长度避免token过多
-        )
+        # 内容相同或高度相似的论文直接复用已有评估
+        cached = self._cached_quality(paper)
+        if cached is not None:
+            return cached
+        
+        # 构建消息：固定的评估规则 + 论文信息
+        messages = [
+            {'role': 'system', 'content': self.EVALUATION_SYSTEM_PROMPT},
+            {'role': 'user', 'content': self.EVALUATION_USER_TEMPLATE.format(
+                title=title,
+                summary=truncate_for_prompt(summary)  # 按token预算截断，避免中文摘要占用过多token
+            )}
+        ]
         
         # 调用API
-        result = await self._call_deepseek_api(prompt, session)
+        result = await self._call_deepseek_api(messages, session)
         
         if result:
             try:
-                quality = PaperQuality(
-                    paper_id=paper_id,
-                    title=title,
-                    innovation_score=float(result.get('innovation_score', 5)),
-                    practicality_score=float(result.get('practicality_score', 5)),
-                    technical_depth_score=float(result.get('technical_depth_score', 5)),
-                    experimental_rigor_score=float(result.get('experimental_rigor_score', 5)),
-                    impact_potential_score=float(result.get('impact_potential_score', 5)),
-                    overall_score=float(result.get('overall_score', 5)),
-                    quality_level=result.get('quality_level', '一般'),
-                    reasoning=result.get('reasoning', ''),
-                    strengths=result.get('strengths', []),
-                    weaknesses=result.get('weaknesses', []),
-                    evaluation_time=datetime.utcnow().isoformat(),
-                    evaluation_status='success'
-                )
-                
-                logger.info(f"✅ 论文 {paper_id} 评估成功: {quality.overall_score:.1f}/10 ({quality.quality_level})")
-                return quality
-                
+                return self._build_quality(paper, result)
             except Exception as e:
                 logger.error(f"解析评估结果失败: {e}, result={result}")
                 return self._create_fallback_quality(paper)
@@ -259,24 +397,159 @@ class PaperEvaluator:
             logger.warning(f"论文 {paper_id} AI评估失败，使用备选方案")
             return self._create_fallback_quality(paper)
     
+    async def evaluate_k_papers_in_one_call(
+        self,
+        papers: List[Dict[str, Any]],
+        session: aiohttp.ClientSession
+    ) -> List[PaperQuality]:
+        """
+        在一次请求中评估多篇论文，评估规则只随请求发送一次
+        
+        Args:
+            papers: 论文列表（建议不超过5篇）
+            session: aiohttp会话
+        
+        Returns:
+            与输入顺序一致的质量评估列表
+        """
+        if len(papers) == 1:
+            return [await self.evaluate_single_paper(papers[0], session)]
+        
+        logger.info(f"开始合并评估 {len(papers)} 篇论文: {[p.get('paper_id', '') for p in papers]}")
+        
+        blocks = [self.BATCH_USER_HEADER.format(count=len(papers))]
+        for index, paper in enumerate(papers, 1):
+            blocks.append(self.BATCH_PAPER_TEMPLATE.format(
+                index=index,
+                paper_id=paper.get('paper_id', ''),
+                title=paper.get('title', ''),
+                summary=truncate_for_prompt(paper.get('summary', ''))
+            ))
+        messages = [
+            {'role': 'system', 'content': self.EVALUATION_SYSTEM_PROMPT},
+            {'role': 'user', 'content': '\n\n'.join(blocks)}
+        ]
+        
+        content = await self._chat(messages, session, max_tokens=min(8000, 600 * len(papers)),
+                                   json_opener='[')
+        if content is None:
+            # 请求本身失败（网络或HTTP错误），拆成逐篇请求只会成倍加重负载
+            logger.warning(f"合并评估请求失败，{len(papers)} 篇论文使用备选方案")
+            return [self._create_fallback_quality(p) for p in papers]
+        json_str = extract_json_array(content)
+        try:
+            results = json_loads(json_str) if json_str else None
+        except Exception as e:
+            logger.error(f"合并评估结果JSON解析失败: {e}")
+            results = None
+        
+        if not isinstance(results, list):
+            # 收到了响应但无法解析为数组时退回逐篇评估
+            logger.warning(f"合并评估失败，改为逐篇评估 {len(papers)} 篇论文")
+            return list(await asyncio.gather(*[self.evaluate_single_paper(p, session) for p in papers]))
+        
+        # 优先按paper_id对齐，缺失时按位置对齐
+        by_id = {str(r.get('paper_id')): r for r in results if isinstance(r, dict) and r.get('paper_id')}
+        qualities = []
+        for index, paper in enumerate(papers):
+            result = by_id.get(paper.get('paper_id', ''))
+            if result is None and index < len(results) and isinstance(results[index], dict):
+                result = results[index]
+            try:
+                if result is None:
+                    raise ValueError("结果缺失")
+                qualities.append(self._build_quality(paper, result))
+            except Exception as e:
+                logger.warning(f"论文 {paper.get('paper_id', '')} 合并评估结果无效（{e}），使用备选方案")
+                qualities.append(self._create_fallback_quality(paper))
+        return qualities
+    
+    def _evaluation_time(self) -> str:
+        """评估时间：批量评估期间整批共用开始时间，单独调用时取当前时间"""
+        return self._batch_time or datetime.now(timezone.utc).isoformat()
+    
+    def _cached_quality(self, paper: Dict[str, Any]) -> Optional[PaperQuality]:
+        """查找评估存储与缓存，命中时返回以当前论文ID/标题构造的评估对象"""
+        title = paper.get('title', '')
+        summary = paper.get('summary', '')
+        cached = self.store.get(title, summary) if self.store is not None else None
+        if cached is None and self.cache is not None:
+            cached = self.cache.get('quality', title, summary)
+        if cached is None:
+            return None
+        logger.info(f"♻️ 论文 {paper.get('paper_id', '')} 命中评估缓存")
+        return PaperQuality(paper_id=paper.get('paper_id', ''), title=title, **cached)
+    
+    def _build_quality(self, paper: Dict[str, Any], result: Dict[str, Any]) -> PaperQuality:
+        """
+        由模型返回的评估字典构造评估对象，并写入缓存
+        
+        Args:
+            paper: 论文信息
+            result: 模型返回的评估结果
+        
+        Returns:
+            质量评估对象
+        
+        Raises:
+            KeyError/TypeError/ValueError: 评分字段缺失或不是数字
+        """
+        paper_id = paper.get('paper_id', '')
+        title = paper.get('title', '')
+        
+        # 评分缺失时直接报错走备选方案，避免缺字段被当成5分；
+        # orjson解出的数字已是int/float，只有非float值才需要转换
+        scores = [result[name] for name in PaperQualityBatch.SCORE_COLUMNS]
+        innovation, practicality, depth, rigor, impact, overall = (
+            v if type(v) is float else float(v) for v in scores
+        )
+        
+        quality = PaperQuality(
+            paper_id=paper_id,
+            title=title,
+            innovation_score=innovation,
+            practicality_score=practicality,
+            technical_depth_score=depth,
+            experimental_rigor_score=rigor,
+            impact_potential_score=impact,
+            overall_score=overall,
+            quality_level=result.get('quality_level', '一般'),
+            reasoning=result.get('reasoning', ''),
+            strengths=result.get('strengths', []),
+            weaknesses=result.get('weaknesses', []),
+            evaluation_time=self._evaluation_time(),
+            evaluation_status='success'
+        )
+        
+        logger.info(f"✅ 论文 {paper_id} 评估成功: {quality.overall_score:.1f}/10 ({quality.quality_level})")
+        if self.cache is not None or self.store is not None:
+            cached = quality.to_dict()
+            del cached['paper_id'], cached['title']
+            if self.store is not None:
+                self.store.put(paper_id, title, paper.get('summary', ''), cached)
+            if self.cache is not None:
+                self.cache.put('quality', title, paper.get('summary', ''), cached)
+        return quality
+    
     async def evaluate_batch_papers(
         self,
         papers: List[Dict[str, Any]],
         batch_size: int = 3
-    ) -> Tuple[List[PaperQuality], Dict[str, Any]]:
+    ) -> Tuple[PaperQualityBatch, Dict[str, Any]]:
         """
         批量评估论文
         
         Args:
             papers: 论文列表
-            batch_size: 并发批大小
+            batch_size: 同时进行的请求数
         
         Returns:
-            (评估结果列表, 统计信息)
+            (按列存储的评估结果, 统计信息)
         """
-        start_time = datetime.utcnow()
+        start_time = datetime.now(timezone.utc)
+        self._batch_time = start_time.isoformat()
         
-        qualities: List[PaperQuality] = []
+        qualities = PaperQualityBatch()
         stats = {
             'total': len(papers),
             'success': 0,
@@ -284,36 +557,60 @@ class PaperEvaluator:
             'error': 0
         }
         
-        async with aiohttp.ClientSession() as session:
-            for i in range(0, len(papers), batch_size):
-                batch = papers[i:i + batch_size]
-                batch_num = i // batch_size + 1
-                
-                logger.info(f"处理第 {batch_num} 批（{len(batch)} 篇）...")
-                
-                # 并发评估当前批次
-                tasks = [self.evaluate_single_paper(paper, session) for paper in batch]
-                batch_qualities = await asyncio.gather(*tasks, return_exceptions=True)
+        # 句向量一次性批量编码（在线程池中执行），随后的缓存查找与写入直接复用
+        if self.cache is not None:
+            await self.cache.embed_many_async(
+                [(p.get('title', ''), p.get('summary', '')) for p in papers]
+            )
+        
+        # 先查缓存，未命中的论文每papers_per_call篇合并为一次请求
+        results: List[Any] = [self._cached_quality(p) for p in papers]
+        pending = [i for i, q in enumerate(results) if q is None]
+        groups = [pending[i:i + self.papers_per_call]
+                  for i in range(0, len(pending), self.papers_per_call)]
+        
+        if groups:
+            async with aiohttp.ClientSession() as session:
+                # 信号量保持并发度，请求节奏交给限流器，不再在批次之间固定等待
+                slots = asyncio.Semaphore(batch_size)
                 
-                # 统计结果
-                for quality in batch_qualities:
-                    if isinstance(quality, Exception):
-                        logger.error(f"评估异常: {quality}")
-                        stats['error'] += 1
-                    else:
-                        qualities.append(quality)
-                        if quality.evaluation_status == 'success':
-                            stats['success'] += 1
-                        elif quality.evaluation_status == 'fallback':
-                            stats['fallback'] += 1
-                        else:
-                            stats['error'] += 1
+                async def evaluate(group: List[int]) -> Tuple[List[int], Any]:
+                    try:
+                        async with slots:
+                            return group, await self.evaluate_k_papers_in_one_call(
+                                [papers[i] for i in group], session
+                            )
+                    except Exception as e:
+                        return group, e
                 
-                # 批次间延迟，避免API限流
-                if i + batch_size < len(papers):
-                    await asyncio.sleep(1)
+                # 按完成先后回填结果，单个慢请求不会拖住其余分组
+                done = 0
+                for future in asyncio.as_completed([evaluate(g) for g in groups]):
+                    group, group_result = await future
+                    for n, i in enumerate(group):
+                        results[i] = group_result if isinstance(group_result, Exception) else group_result[n]
+                    done += len(group)
+                    logger.info(f"评估进度 {done}/{len(pending)}")
+        
+        # 统计结果
+        for quality in results:
+            if isinstance(quality, Exception):
+                logger.error(f"评估异常: {quality}")
+                stats['error'] += 1
+            else:
+                qualities.append(quality)
+                if quality.evaluation_status == 'success':
+                    stats['success'] += 1
+                elif quality.evaluation_status == 'fallback':
+                    stats['fallback'] += 1
+                else:
+                    stats['error'] += 1
+        
+        if self.cache is not None:
+            self.cache.save()
         
-        end_time = datetime.utcnow()
+        self._batch_time = None
+        end_time = datetime.now(timezone.utc)
         stats['processing_time'] = (end_time - start_time).total_seconds()
         
         logger.info(
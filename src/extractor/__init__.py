@@ -5,10 +5,16 @@
 
 from .deepseek_client import DeepSeekClient, DeepSeekBatchProcessor
 from .idea_extractor import IdeaExtractor, ExtractedIdea
+from .semantic_cache import SemanticCache, get_semantic_cache
+from .rate_limiter import AdaptiveRateLimiter, get_rate_limiter
 
 __all__ = [
     'DeepSeekClient',
     'DeepSeekBatchProcessor',
     'IdeaExtractor',
     'ExtractedIdea',
+    'SemanticCache',
+    'get_semantic_cache',
+    'AdaptiveRateLimiter',
+    'get_rate_limiter',
 ]
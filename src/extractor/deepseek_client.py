@@ -6,18 +6,261 @@ DeepSeek API 客户端
 import asyncio
 import aiohttp
 import logging
-from typing import Optional, Dict, Any, Tuple
+import random
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Dict, Any, Tuple, Callable
 from datetime import datetime
 import json
 
+try:
+    from orjson import loads as json_loads, dumps as json_dumps
+except ImportError:  # 未安装orjson时退回标准库
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+from .semantic_cache import SemanticCache, hash_text
+from .rate_limiter import AdaptiveRateLimiter, estimate_tokens, parse_retry_after
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class ApiResult:
+    """单次API请求的结果"""
+    text: Optional[str]         # 响应文本，失败时为None
+    status: int                 # HTTP状态码，网络错误/超时为0
+    retry_after: float = 0.0    # 服务端建议的重试等待（秒）
+    
+    @property
+    def retryable(self) -> bool:
+        """限流、服务端错误和网络错误值得重试，认证等客户端错误不重试"""
+        return self.text is None and (self.status in (0, 429) or self.status >= 500)
+
+
+class JsonScanner:
+    """
+    增量括号配平扫描器
+    
+    可分多次喂入文本（如流式响应的增量片段），跳过字符串字面量中的括号，
+    第一个顶层对象/数组闭合时停止并保存该片段
+    """
+    
+    def __init__(self, opener: str = '{', closer: str = '}'):
+        self.opener = opener
+        self.closer = closer
+        self.result: Optional[str] = None
+        self._parts = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+    
+    def feed(self, text: str) -> bool:
+        """
+        追加一段文本
+        
+        Returns:
+            是否已得到完整片段
+        """
+        if self.result is not None:
+            return True
+        
+        start = 0
+        if self._depth == 0:
+            start = text.find(self.opener)
+            if start < 0:
+                return False
+        
+        for i in range(start, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == self.opener:
+                self._depth += 1
+            elif ch == self.closer:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(text[start:i + 1])
+                    self.result = ''.join(self._parts)
+                    return True
+        
+        self._parts.append(text[start:])
+        return False
+
+
+def _extract_balanced(text: str, opener: str, closer: str) -> Optional[str]:
+    """单趟扫描返回第一个括号配平的片段，跳过字符串字面量中的括号"""
+    # 快速路径：模型常把JSON包在 ```json 代码块中，直接按围栏切出
+    start = text.find('```json')
+    if start >= 0:
+        end = text.find('```', start + 7)
+        if end > 0:
+            block = text[start + 7:end].strip()
+            if block.startswith(opener) and block.endswith(closer):
+                return block
+    
+    scanner = JsonScanner(opener, closer)
+    scanner.feed(text)
+    return scanner.result
+
+
+async def read_stream_content(response: aiohttp.ClientResponse,
+                              scanner: Optional[JsonScanner] = None) -> str:
+    """
+    读取流式（SSE）对话响应并拼接增量内容
+    
+    传入scanner时，一旦JSON闭合就停止读取并关闭连接，丢弃模型之后附加的说明文字
+    
+    Args:
+        response: stream=true 请求的响应
+        scanner: 可选的JSON扫描器
+    
+    Returns:
+        模型回复文本（提前结束时为JSON片段）
+    """
+    pieces = []
+    buffer = bytearray()
+    async for chunk in response.content.iter_chunked(4096):
+        buffer += chunk
+        *lines, rest = buffer.split(b'\n')
+        buffer = bytearray(rest)
+        for line in lines:
+            line = line.strip()
+            if not line.startswith(b'data:'):
+                continue
+            data = line[5:].strip()
+            if data == b'[DONE]':
+                return ''.join(pieces)
+            choices = json_loads(data).get('choices') or [{}]
+            delta = (choices[0].get('delta') or {}).get('content') or ''
+            if not delta:
+                continue
+            pieces.append(delta)
+            if scanner is not None and scanner.feed(delta):
+                response.close()
+                return scanner.result
+    return ''.join(pieces)
+
+
+def extract_json_object(text: str) -> Optional[str]:
+    """
+    找出文本中第一个完整的顶层JSON对象
+    
+    跟踪括号深度并跳过字符串字面量中的括号，模型在JSON前后附加说明文字
+    或输出多个对象时只取第一个
+    
+    Args:
+        text: 模型返回的文本
+    
+    Returns:
+        JSON对象子串，未找到完整对象时返回None
+    """
+    return _extract_balanced(text, '{', '}')
+
+
+def extract_json_array(text: str) -> Optional[str]:
+    """找出文本中第一个完整的顶层JSON数组，规则同 extract_json_object"""
+    return _extract_balanced(text, '[', ']')
+
+
+@lru_cache(maxsize=64)
+def _char_budget(max_tokens: int, cjk_tenths: int) -> int:
+    """按中文字符占比估算token预算对应的字符数（英文约4字符/token，中文约2字符/token）"""
+    return int(max_tokens * (4.0 - 2.0 * cjk_tenths / 10))
+
+
+def truncate_for_prompt(text: str, max_tokens: int = 1000) -> str:
+    """
+    折叠空白后按近似token数截断文本
+    
+    中文字符UTF-8编码占3字节，用字节数/字符数之比估计中文占比，
+    使中英文摘要在提示词中占用的token数大致一致
+    
+    Args:
+        text: 原始文本
+        max_tokens: token预算
+    
+    Returns:
+        截断后的文本
+    """
+    text = ' '.join(text.split())
+    if len(text) <= 2 * max_tokens:  # 任何语言都不会超出预算
+        return text
+    extra = len(text.encode('utf-8')) - len(text)
+    cjk_tenths = min(10, round(5 * extra / len(text)))  # 每个中文字符多出2字节
+    return text[:_char_budget(max_tokens, cjk_tenths)]
+
+
 class DeepSeekClient:
     """DeepSeek API 异步客户端"""
     
+    # 默认的论文总结系统提示词
+    SUMMARY_SYSTEM_PROMPT = """你是一个学术论文总结专家。请用中文总结以下论文的核心思想，
+包括：1) 研究问题 2) 方法创新 3) 主要贡献 4) 实验结果。
+控制在200-300字以内，语言简洁学术。"""
+    
+    # 论文水平评估的系统提示词（固定前缀，便于服务端前缀缓存命中）
+    QUALITY_SYSTEM_PROMPT = """你是一个资深的学术论文评审专家。请根据论文的标题和摘要，评估其学术水平。
+
+评估维度：
+1. 创新性：研究问题和方法是否有创新
+2. 技术深度：方法是否有技术难度和深度
+3. 实用价值：研究成果的应用价值
+4. 实验完整性：实验设计是否完整充分
+
+请以JSON格式返回评估结果：
+{
+  "quality_score": 8,
+  "quality_level": "优秀",
+  "reasoning": "简要说明评分理由（50字以内）"
+}
+
+评分标准：
+- 9-10分：顶级（顶会/顶刊水平，创新性强，影响力大）
+- 7-8分：优秀（方法新颖，实验充分，有较好贡献）
+- 5-6分：良好（有一定创新，实验合理）
+- 3-4分：一般（创新有限，实验基础）
+- 1-2分：较弱（缺乏创新或实验不足）"""
+    
+    # 总结与评估合并为一次请求时追加在总结提示词之后的说明
+    COMBINED_SUFFIX = """
+
+此外，请同时评估论文的学术水平（1-10分）：
+- 9-10分：顶级（顶会/顶刊水平，创新性强，影响力大）
+- 7-8分：优秀（方法新颖，实验充分，有较好贡献）
+- 5-6分：良好（有一定创新，实验合理）
+- 3-4分：一般（创新有限，实验基础）
+- 1-2分：较弱（缺乏创新或实验不足）
+
+请只输出一个JSON对象，不要添加任何其他文字：
+{
+  "summary": "论文总结",
+  "evaluation": {
+    "quality_score": 8,
+    "quality_level": "优秀",
+    "reasoning": "简要说明评分理由（50字以内）"
+  }
+}"""
+    
+    # 进程内所有客户端共用的会话及其所属事件循环；TLS握手在整个运行期间摊薄
+    _shared_session: Optional[aiohttp.ClientSession] = None
+    _shared_loop: Optional[asyncio.AbstractEventLoop] = None
+    
     def __init__(self, api_key: str, api_url: str = "https://api.deepseek.com/v1", 
-                 model: str = "deepseek-chat", timeout: int = 30):
+                 model: str = "deepseek-chat", timeout: int = 30,
+                 cache: Optional[SemanticCache] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 max_retries: int = 2, retry_delay: float = 1.0):
         """
         初始化DeepSeek客户端
         
@@ -26,69 +269,155 @@ class DeepSeekClient:
             api_url: API端点
             model: 模型名称
             timeout: 超时时间（秒）
+            cache: 语义响应缓存，None表示不使用缓存
+            rate_limiter: 请求限流器，默认5次/秒、最多8个在途请求
+            max_retries: 可重试错误的最大重试次数
+            retry_delay: 首次重试的基础等待（秒），之后按指数增长
         """
         self.api_key = api_key
         self.api_url = api_url
         self.model = model
         self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        
+        # 每次请求不变的部分只构造一次
+        self._headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        self._base_payload = {"model": model, "top_p": 0.9}
+        self._client_timeout = aiohttp.ClientTimeout(total=timeout)
         
         logger.info(f"DeepSeek客户端已初始化: {model}")
     
+    async def __aenter__(self) -> 'DeepSeekClient':
+        await self._get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        # 共享会话在进程（事件循环）结束前由 aclose 统一关闭，这里不关闭
+        pass
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        获取（必要时创建）进程内共享会话
+        
+        aiohttp会话只能在创建它的事件循环中使用，每次 asyncio.run 都会换一个新循环，
+        因此按循环重建；创建过程中没有await，同一循环内不会重复创建
+        """
+        cls = DeepSeekClient
+        loop = asyncio.get_running_loop()
+        session = cls._shared_session
+        if session is None or session.closed or cls._shared_loop is not loop:
+            cls._shared_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.rate_limiter.max_concurrent, ttl_dns_cache=300, keepalive_timeout=60
+                ),
+                timeout=self._client_timeout
+            )
+            cls._shared_loop = loop
+        return cls._shared_session
+    
+    @classmethod
+    async def aclose(cls):
+        """关闭共享会话；应在事件循环结束前（如 asyncio.run 的主协程退出时）调用一次"""
+        session = cls._shared_session
+        if session is not None and not session.closed:
+            await session.close()
+        cls._shared_session = None
+        cls._shared_loop = None
+    
     async def _call_api(self, messages: list, temperature: float = 0.7, 
-                        max_tokens: int = 500) -> Optional[str]:
+                        max_tokens: int = 500, json_opener: Optional[str] = None) -> Optional[str]:
         """
-        调用DeepSeek API（异步）
+        调用DeepSeek API（异步），对限流/服务端/网络错误做有限次指数退避重试
         
         Args:
             messages: 消息列表
             temperature: 温度参数
             max_tokens: 最大token数
+            json_opener: 期望输出JSON时传入 '{' 或 '['，流式读取并在JSON闭合时提前结束
         
         Returns:
             API响应文本或None
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        for attempt in range(self.max_retries + 1):
+            result = await self._request(messages, temperature, max_tokens, json_opener)
+            if not result.retryable or attempt == self.max_retries:
+                return result.text
+            
+            # 指数退避加随机抖动，避免同批请求同时重试；服务端给出Retry-After时以其为下限
+            delay = max(result.retry_after, self.retry_delay * (2 ** attempt) + random.uniform(0, 0.5))
+            logger.info(f"API请求失败（状态{result.status}），{delay:.1f}秒后第{attempt + 1}次重试")
+            await asyncio.sleep(delay)
+        
+        return None
+    
+    async def _request(self, messages: list, temperature: float, max_tokens: int,
+                       json_opener: Optional[str] = None) -> ApiResult:
+        """
+        发送单次API请求
+        
+        Args:
+            messages: 消息列表
+            temperature: 温度参数
+            max_tokens: 最大token数
+            json_opener: 非空时以流式请求读取，JSON闭合即停止
         
+        Returns:
+            请求结果
+        """
         payload = {
-            "model": self.model,
+            **self._base_payload,
             "messages": messages,
             "temperature": temperature,
-            "max_tokens": max_tokens,
-            "top_p": 0.9
+            "max_tokens": max_tokens
         }
+        if json_opener:
+            payload["stream"] = True
+            if json_opener == '{':
+                # JSON模式：约束模型只输出合法的JSON对象
+                payload["response_format"] = {"type": "json_object"}
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.api_url}/chat/completions",
-                    json=payload,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=self.timeout)
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        content = data.get('choices', [{}])[0].get('message', {}).get('content', '')
-                        return content
-                    elif response.status == 429:
-                        logger.warning("API限流：429错误")
-                        return None
-                    elif response.status == 401:
-                        logger.error("API认证失败：401错误，请检查API密钥")
-                        return None
+            session = await self._get_session()
+            async with self.rate_limiter.acquire(estimate_tokens(messages, max_tokens)), session.post(
+                f"{self.api_url}/chat/completions",
+                data=json_dumps(payload),
+                headers=self._headers,
+                timeout=self._client_timeout
+            ) as response:
+                if response.status == 200:
+                    if json_opener:
+                        closer = ']' if json_opener == '[' else '}'
+                        content = await read_stream_content(response, JsonScanner(json_opener, closer))
                     else:
-                        error_text = await response.text()
-                        logger.error(f"API返回错误 {response.status}: {error_text}")
-                        return None
+                        data = json_loads(await response.read())
+                        content = data.get('choices', [{}])[0].get('message', {}).get('content', '')
+                    self.rate_limiter.on_success()
+                    return ApiResult(content, 200)
+                elif response.status == 429:
+                    logger.warning("API限流：429错误")
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    self.rate_limiter.on_throttle(retry_after)
+                    return ApiResult(None, 429, retry_after)
+                elif response.status == 401:
+                    logger.error("API认证失败：401错误，请检查API密钥")
+                    return ApiResult(None, 401)
+                else:
+                    error_text = await response.text()
+                    logger.error(f"API返回错误 {response.status}: {error_text}")
+                    return ApiResult(None, response.status)
         
         except asyncio.TimeoutError:
             logger.warning("API请求超时")
-            return None
+            return ApiResult(None, 0)
         except Exception as e:
             logger.error(f"API调用出错: {e}")
-            return None
+            return ApiResult(None, 0)
     
     async def summarize_paper(self, title: str, summary: str, 
                              system_prompt: Optional[str] = None) -> Optional[str]:
@@ -104,16 +433,21 @@ class DeepSeekClient:
             总结文本或None
         """
         if not system_prompt:
-            system_prompt = """你是一个学术论文总结专家。请用中文总结以下论文的核心思想，
-包括：1) 研究问题 2) 方法创新 3) 主要贡献 4) 实验结果。
-控制在200-300字以内，语言简洁学术。"""
+            system_prompt = self.SUMMARY_SYSTEM_PROMPT
         
         messages = [
             {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"标题：{title}\n\n摘要：{summary}"}
+            {"role": "user", "content": f"标题：{title}\n\n摘要：{truncate_for_prompt(summary)}"}
         ]
         
-        return await self._call_api(messages, temperature=0.5, max_tokens=500)
+        async def compute() -> Optional[str]:
+            return await self._call_api(messages, temperature=0.5, max_tokens=500) or None
+        
+        if self.cache is None:
+            return await compute()
+        # 不同的系统提示词产生不同的总结，分开缓存
+        namespace = f"summary:{hash_text(system_prompt)[:8]}"
+        return await self.cache.get_or_compute(namespace, title, summary, compute)
     
     async def evaluate_paper_quality(self, title: str, summary: str, 
                                      authors: list = None) -> Optional[Dict[str, Any]]:
@@ -131,29 +465,14 @@ class DeepSeekClient:
             - quality_level: 水平等级 (顶级/优秀/良好/一般/较弱)
             - reasoning: 评估理由
         """
+        if self.cache is not None:
+            cached = self.cache.get('evaluation', title, summary)
+            if cached is not None:
+                return cached
+        
         authors_info = f"作者：{', '.join(authors[:3])}" if authors else ""
         
-        system_prompt = """你是一个资深的学术论文评审专家。请根据论文的标题和摘要，评估其学术水平。
-
-评估维度：
-1. 创新性：研究问题和方法是否有创新
-2. 技术深度：方法是否有技术难度和深度
-3. 实用价值：研究成果的应用价值
-4. 实验完整性：实验设计是否完整充分
-
-请以JSON格式返回评估结果：
-{
-  "quality_score": 8,
-  "quality_level": "优秀",
-  "reasoning": "简要说明评分理由（50字以内）"
-}
-
-评分标准：
-- 9-10分：顶级（顶会/顶刊水平，创新性强，影响力大）
-- 7-8分：优秀（方法新颖，实验充分，有较好贡献）
-- 5-6分：良好（有一定创新，实验合理）
-- 3-4分：一般（创新有限，实验基础）
-- 1-2分：较弱（缺乏创新或实验不足）"""
+        system_prompt = self.QUALITY_SYSTEM_PROMPT
         
         user_content = f"""请评估以下论文：
 
@@ -161,29 +480,26 @@ class DeepSeekClient:
 
 {authors_info}
 
-摘要：{summary}"""
+摘要：{truncate_for_prompt(summary)}"""
         
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_content}
         ]
         
-        response = await self._call_api(messages, temperature=0.3, max_tokens=300)
+        response = await self._call_api(messages, temperature=0.3, max_tokens=300, json_opener='{')
         
         if not response:
             return None
         
         try:
             # 提取JSON内容
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-                
-                # 验证字段
-                if 'quality_score' in result and 'quality_level' in result:
-                    # 确保评分在1-10范围内
-                    result['quality_score'] = max(1, min(10, int(result['quality_score'])))
+            json_str = extract_json_object(response)
+            if json_str:
+                result = self._validate_evaluation(json_loads(json_str))
+                if result is not None:
+                    if self.cache is not None:
+                        self.cache.put('evaluation', title, summary, result)
                     return result
             
             logger.warning(f"无法解析论文评估结果: {response}")
@@ -192,90 +508,338 @@ class DeepSeekClient:
         except Exception as e:
             logger.error(f"解析论文评估JSON失败: {e}")
             return None
+    
+    @staticmethod
+    def _validate_evaluation(result: Any) -> Optional[Dict[str, Any]]:
+        """校验评估字段并将评分限制在1-10，不合格时返回None"""
+        if not isinstance(result, dict) or 'quality_score' not in result or 'quality_level' not in result:
+            return None
+        result['quality_score'] = max(1, min(10, int(result['quality_score'])))
+        return result
+    
+    def combined_messages(self, title: str, summary: str, system_prompt: str) -> list:
+        """构造总结与评估合并请求的消息列表"""
+        return [
+            {"role": "system", "content": system_prompt + self.COMBINED_SUFFIX},
+            {"role": "user", "content": f"标题：{title}\n\n摘要：{truncate_for_prompt(summary)}"}
+        ]
+    
+    def parse_combined(self, response: Optional[str]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """解析合并请求的回复，无法解析的部分为None"""
+        json_str = extract_json_object(response) if response else None
+        if not json_str:
+            return None, None
+        try:
+            result = json_loads(json_str)
+            ai_summary = (result.get('summary') or '').strip() or None
+            return ai_summary, self._validate_evaluation(result.get('evaluation'))
+        except Exception as e:
+            logger.warning(f"解析合并结果失败: {e}")
+            return None, None
+    
+    def cached_combined(self, title: str, summary: str, system_prompt: str
+                        ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """从缓存中查找总结与评估结果"""
+        if self.cache is None:
+            return None, None
+        namespace = f"summary:{hash_text(system_prompt)[:8]}"
+        return self.cache.get(namespace, title, summary), self.cache.get('evaluation', title, summary)
+    
+    def cache_combined(self, title: str, summary: str, system_prompt: str,
+                       ai_summary: Optional[str], evaluation: Optional[Dict[str, Any]]):
+        """将合并请求得到的结果写入缓存"""
+        if self.cache is None:
+            return
+        if ai_summary is not None:
+            self.cache.put(f"summary:{hash_text(system_prompt)[:8]}", title, summary, ai_summary)
+        if evaluation is not None:
+            self.cache.put('evaluation', title, summary, evaluation)
+    
+    async def summarize_and_evaluate(self, title: str, summary: str,
+                                     system_prompt: Optional[str] = None,
+                                     authors: list = None
+                                     ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        一次请求同时完成总结与评估
+        
+        两项结果都在缓存中时不发请求；收到响应但某一部分解析失败时，
+        只对缺失的部分单独调用 summarize_paper / evaluate_paper_quality；
+        请求本身失败时不再补发，返回缓存中已有的结果（没有则为None）
+        
+        Args:
+            title: 论文标题
+            summary: 论文摘要
+            system_prompt: 总结的系统提示词
+            authors: 作者列表（仅在单独补评估时使用）
+        
+        Returns:
+            (总结文本或None, 评估结果字典或None)
+        """
+        if not system_prompt:
+            system_prompt = self.SUMMARY_SYSTEM_PROMPT
+        
+        cached_summary, cached_eval = self.cached_combined(title, summary, system_prompt)
+        if cached_summary is not None and cached_eval is not None:
+            return cached_summary, cached_eval
+        
+        messages = self.combined_messages(title, summary, system_prompt)
+        response = await self._call_api(messages, temperature=0.4, max_tokens=800, json_opener='{')
+        if response is None:
+            # _call_api 已用尽重试（服务不可用或持续限流），再拆成两个请求只会加重负载
+            return cached_summary, cached_eval
+        ai_summary, evaluation = self.parse_combined(response)
+        self.cache_combined(title, summary, system_prompt, ai_summary, evaluation)
+        
+        # 收到了响应但某一部分解析失败，缺失的部分单独补请求
+        if ai_summary is None:
+            ai_summary = cached_summary or await self.summarize_paper(title, summary, system_prompt)
+        if evaluation is None:
+            evaluation = cached_eval or await self.evaluate_paper_quality(title, summary, authors)
+        return ai_summary, evaluation
 
 
 class DeepSeekBatchProcessor:
     """DeepSeek批处理器"""
     
+    # 批处理接口中每条请求对应的端点
+    BATCH_ENDPOINT = "/v1/chat/completions"
+    # 批处理任务的终止状态
+    BATCH_FINAL_STATES = ('completed', 'failed', 'expired', 'cancelled')
+    
     def __init__(self, client: DeepSeekClient, batch_size: int = 3, delay: float = 0.5):
         """
         初始化批处理器
         
         Args:
             client: DeepSeek客户端
-            batch_size: 批处理大小
-            delay: 批次间延迟（秒）
+            batch_size: 同时处理的论文数
+            delay: 已废弃，请求节奏由客户端的限流器控制
         """
         self.client = client
         self.batch_size = batch_size
         self.delay = delay
     
     async def process_papers_with_evaluation(self, papers: list, 
-                                            system_prompt: Optional[str] = None) -> Tuple[list, list]:
+                                            system_prompt: Optional[str] = None,
+                                            on_progress: Optional[Callable[[int, int, dict], None]] = None
+                                            ) -> Tuple[list, list]:
         """
         🆕 批量处理论文（包含总结和评估）
         
         Args:
             papers: 论文列表
             system_prompt: 系统提示词
+            on_progress: 每完成一篇时的回调 (已完成数, 总数, 论文)
         
         Returns:
             (总结结果列表, 评估结果列表)
         """
-        summaries = []
-        evaluations = []
-        total = len(papers)
-        
-        for i in range(0, total, self.batch_size):
-            batch = papers[i:i + self.batch_size]
-            batch_num = i // self.batch_size + 1
-            total_batches = (total + self.batch_size - 1) // self.batch_size
-            
-            logger.info(f"正在处理第 {batch_num}/{total_batches} 批...")
-            
-            # 并发执行总结和评估
-            tasks = []
-            for paper in batch:
-                # 总结任务
-                summary_task = self.client.summarize_paper(
-                    paper.get('title', ''),
-                    paper.get('summary', ''),
-                    system_prompt
-                )
-                # 评估任务
-                eval_task = self.client.evaluate_paper_quality(
+        async with self.client:
+            return await self._process_with_evaluation(papers, system_prompt, on_progress)
+    
+    async def _process_with_evaluation(self, papers: list, system_prompt: Optional[str],
+                                       on_progress: Optional[Callable[[int, int, dict], None]] = None
+                                       ) -> Tuple[list, list]:
+        """process_papers_with_evaluation 的实际处理逻辑"""
+        logger.info(f"开始处理 {len(papers)} 篇论文（同时处理{self.batch_size}篇）...")
+        
+        # 不再按批次等待+固定延迟，由信号量保持并发度、限流器控制请求节奏；
+        # 按完成先后收集结果，慢请求不会阻塞其他论文的处理
+        slots = asyncio.Semaphore(self.batch_size)
+        
+        async def indexed(index: int, paper: dict):
+            return index, await self._process_one(paper, system_prompt, slots)
+        
+        results = [None] * len(papers)
+        pending = [indexed(i, paper) for i, paper in enumerate(papers)]
+        for done, future in enumerate(asyncio.as_completed(pending), 1):
+            index, results[index] = await future
+            logger.info(f"进度 {done}/{len(papers)}: {papers[index].get('paper_id', 'unknown')}")
+            if on_progress is not None:
+                on_progress(done, len(papers), papers[index])
+        
+        summaries = [(paper, summary) for paper, summary, _ in results]
+        evaluations = [(paper, evaluation) for paper, _, evaluation in results]
+        return summaries, evaluations
+    
+    async def _process_one(self, paper: dict, system_prompt: Optional[str],
+                           slots: asyncio.Semaphore) -> Tuple[dict, Optional[str], Optional[dict]]:
+        """一次请求完成单篇论文的总结和评估，异常时对应结果为None"""
+        paper_id = paper.get('paper_id', 'unknown')
+        
+        try:
+            async with slots:
+                summary_result, eval_result = await self.client.summarize_and_evaluate(
                     paper.get('title', ''),
                     paper.get('summary', ''),
+                    system_prompt,
                     paper.get('authors', [])
                 )
-                tasks.append((summary_task, eval_task, paper))
+        except Exception as e:
+            logger.error(f"总结/评估失败 {paper_id}: {e}")
+            summary_result, eval_result = None, None
+        
+        return paper, summary_result, eval_result
+    
+    async def process_via_batch_api(self, papers: list,
+                                    system_prompt: Optional[str] = None,
+                                    on_progress: Optional[Callable[[int, int, dict], None]] = None,
+                                    poll_interval: float = 30.0,
+                                    max_wait: float = 24 * 3600
+                                    ) -> Tuple[list, list]:
+        """
+        通过批处理接口（上传JSONL → 轮询 → 下载结果）完成总结和评估
+        
+        适合对时延不敏感的每日任务，费用约为实时调用的一半；
+        缓存命中的论文不提交，批处理失败或缺失的论文退回实时调用
+        
+        Args:
+            papers: 论文列表
+            system_prompt: 系统提示词
+            on_progress: 每完成一篇时的回调 (已完成数, 总数, 论文)
+            poll_interval: 首次轮询等待（秒），之后按指数增长
+            max_wait: 最长等待时间（秒），超时后取消任务并退回实时调用
+        
+        Returns:
+            (总结结果列表, 评估结果列表)，格式同 process_papers_with_evaluation
+        """
+        client = self.client
+        system_prompt = system_prompt or client.SUMMARY_SYSTEM_PROMPT
+        results: list = [(None, None)] * len(papers)
+        
+        lines = []
+        for i, paper in enumerate(papers):
+            title, summary = paper.get('title', ''), paper.get('summary', '')
+            cached = client.cached_combined(title, summary, system_prompt)
+            if cached[0] is not None and cached[1] is not None:
+                results[i] = cached
+                continue
+            body = {
+                **client._base_payload,
+                "messages": client.combined_messages(title, summary, system_prompt),
+                "temperature": 0.4,
+                "max_tokens": 800,
+                "response_format": {"type": "json_object"}
+            }
+            lines.append(json_dumps({
+                "custom_id": f"{i}:{paper.get('paper_id', 'unknown')}",
+                "method": "POST",
+                "url": self.BATCH_ENDPOINT,
+                "body": body
+            }))
+        
+        async with client:
+            if lines:
+                logger.info(f"提交批处理任务: {len(lines)} 篇论文（{len(papers) - len(lines)} 篇命中缓存）")
+                try:
+                    responses = await self._run_batch(b'\n'.join(lines), poll_interval, max_wait)
+                except Exception as e:
+                    logger.warning(f"批处理接口失败，全部改为实时调用: {e}")
+                    responses = {}
+                
+                for i, content in responses.items():
+                    paper = papers[i]
+                    ai_summary, evaluation = client.parse_combined(content)
+                    client.cache_combined(paper.get('title', ''), paper.get('summary', ''),
+                                          system_prompt, ai_summary, evaluation)
+                    results[i] = (ai_summary, evaluation)
             
-            # 等待所有任务完成
-            batch_results = await asyncio.gather(
-                *[asyncio.gather(s, e) for s, e, p in tasks],
-                return_exceptions=True
-            )
+            done = 0
+            retry = []
+            for i, (ai_summary, evaluation) in enumerate(results):
+                if ai_summary is None or evaluation is None:
+                    retry.append(i)
+                    continue
+                done += 1
+                if on_progress is not None:
+                    on_progress(done, len(papers), papers[i])
             
-            # 处理结果
-            for (summary_result, eval_result), (_, _, paper) in zip(batch_results, tasks):
-                paper_id = paper.get('paper_id', 'unknown')
+            if retry:
+                logger.info(f"{len(retry)} 篇论文批处理未完成，改为实时调用")
+                offset = done
                 
-                # 处理总结结果
-                if isinstance(summary_result, Exception):
-                    logger.error(f"总结失败 {paper_id}: {summary_result}")
-                    summaries.append((paper, None))
-                else:
-                    summaries.append((paper, summary_result))
+                def retry_progress(completed: int, total: int, paper: dict):
+                    if on_progress is not None:
+                        on_progress(offset + completed, len(papers), paper)
                 
-                # 处理评估结果
-                if isinstance(eval_result, Exception):
-                    logger.error(f"评估失败 {paper_id}: {eval_result}")
-                    evaluations.append((paper, None))
-                else:
-                    evaluations.append((paper, eval_result))
-            
-            # 批次间延迟
-            if i + self.batch_size < total:
-                await asyncio.sleep(self.delay)
+                summaries, evaluations = await self._process_with_evaluation(
+                    [papers[i] for i in retry], system_prompt, retry_progress
+                )
+                for i, (_, ai_summary), (_, evaluation) in zip(retry, summaries, evaluations):
+                    results[i] = (ai_summary, evaluation)
         
+        summaries = [(paper, summary) for paper, (summary, _) in zip(papers, results)]
+        evaluations = [(paper, evaluation) for paper, (_, evaluation) in zip(papers, results)]
         return summaries, evaluations
+    
+    async def _run_batch(self, jsonl: bytes, poll_interval: float, max_wait: float) -> Dict[int, str]:
+        """
+        上传请求文件、创建批处理任务并等待完成
+        
+        Returns:
+            论文下标 -> 模型回复文本（仅包含成功的请求）
+        """
+        client = self.client
+        session = await client._get_session()
+        headers = {"Authorization": client._headers["Authorization"]}
+        # 文件上传/下载可能远慢于单次对话请求，不受客户端超时约束
+        file_timeout = aiohttp.ClientTimeout(total=600)
+        
+        form = aiohttp.FormData()
+        form.add_field('purpose', 'batch')
+        form.add_field('file', jsonl, filename='batch_input.jsonl', content_type='application/jsonl')
+        async with session.post(f"{client.api_url}/files", data=form,
+                                headers=headers, timeout=file_timeout) as response:
+            response.raise_for_status()
+            input_file_id = json_loads(await response.read())['id']
+        
+        async with session.post(f"{client.api_url}/batches", headers=client._headers, data=json_dumps({
+            "input_file_id": input_file_id,
+            "endpoint": self.BATCH_ENDPOINT,
+            "completion_window": "24h"
+        })) as response:
+            response.raise_for_status()
+            batch = json_loads(await response.read())
+        batch_id = batch['id']
+        logger.info(f"批处理任务已创建: {batch_id}")
+        
+        deadline = time.monotonic() + max_wait
+        wait = poll_interval
+        while batch.get('status') not in self.BATCH_FINAL_STATES:
+            if time.monotonic() + wait > deadline:
+                logger.warning(f"批处理任务 {batch_id} 等待超时，取消任务")
+                async with session.post(f"{client.api_url}/batches/{batch_id}/cancel", headers=headers):
+                    pass
+                return {}
+            await asyncio.sleep(wait)
+            wait = min(wait * 2, 600)
+            async with session.get(f"{client.api_url}/batches/{batch_id}", headers=headers) as response:
+                response.raise_for_status()
+                batch = json_loads(await response.read())
+            logger.info(f"批处理任务 {batch_id} 状态: {batch.get('status')} {batch.get('request_counts', '')}")
+        
+        output_file_id = batch.get('output_file_id')
+        if batch['status'] != 'completed' or not output_file_id:
+            logger.warning(f"批处理任务 {batch_id} 结束状态: {batch['status']}")
+            return {}
+        
+        async with session.get(f"{client.api_url}/files/{output_file_id}/content",
+                               headers=headers, timeout=file_timeout) as response:
+            response.raise_for_status()
+            output = await response.read()
+        
+        responses: Dict[int, str] = {}
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            try:
+                item = json_loads(line)
+                resp = item.get('response') or {}
+                if resp.get('status_code') != 200:
+                    continue
+                content = resp['body']['choices'][0]['message']['content']
+                responses[int(item['custom_id'].split(':', 1)[0])] = content
+            except Exception as e:
+                logger.warning(f"批处理结果解析失败: {e}")
+        logger.info(f"批处理任务 {batch_id} 完成: {len(responses)} 条成功")
+        return responses
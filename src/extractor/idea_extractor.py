@@ -3,19 +3,26 @@
 负责对论文进行AI总结和思想提取
 """
 
-import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
 import json
 
+try:
+    import orjson
+except ImportError:  # 未安装orjson时退回标准库
+    orjson = None
+
 from .deepseek_client import DeepSeekClient, DeepSeekBatchProcessor
+from .semantic_cache import get_semantic_cache
+from .rate_limiter import get_rate_limiter
+from ..filter.deduplicator import Deduplicator
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ExtractedIdea:
     """提取的论文思想"""
     paper_id: str
@@ -23,14 +30,14 @@ class ExtractedIdea:
     authors: List[str]
     summary: str                    # 原始摘要
     ai_summary: str                 # AI生成的总结
-    key_points: Optional[str]       # 关键要点
+    key_points: Optional[str] = None  # 关键要点（暂未提取）
     
     # 🆕 论文质量评估
     quality_score: Optional[int] = None     # 质量评分 1-10
     quality_level: Optional[str] = None     # 质量等级
     quality_reasoning: Optional[str] = None # 评估理由
     
-    extraction_status: str = 'unknown'      # success|fallback|error
+    extraction_status: str = 'unknown'      # success|fallback|error|cached|skipped_short
     extraction_error: Optional[str] = None  # 错误信息
     extraction_time: str = ''               # 提取时间
     
@@ -40,18 +47,43 @@ class ExtractedIdea:
     
     def to_dict(self) -> Dict:
         """转换为字典"""
-        return asdict(self)
+        return {
+            'paper_id': self.paper_id,
+            'title': self.title,
+            'authors': list(self.authors),
+            'summary': self.summary,
+            'ai_summary': self.ai_summary,
+            'key_points': self.key_points,
+            'quality_score': self.quality_score,
+            'quality_level': self.quality_level,
+            'quality_reasoning': self.quality_reasoning,
+            'extraction_status': self.extraction_status,
+            'extraction_error': self.extraction_error,
+            'extraction_time': self.extraction_time,
+            'published': self.published,
+            'arxiv_url': self.arxiv_url,
+        }
+    
+    def to_json(self) -> bytes:
+        """序列化为UTF-8编码的JSON（orjson直接序列化dataclass，不构造中间字典）"""
+        if orjson is not None:
+            return orjson.dumps(self)
+        return json.dumps(self.to_dict(), ensure_ascii=False).encode('utf-8')
 
 
 class IdeaExtractor:
     """论文思想提取器"""
     
-    def __init__(self, deepseek_config: Dict[str, Any]):
+    # 摘要短于此长度时模型只能复述原文，直接截断原摘要而不调用API
+    MIN_SUMMARY_LENGTH = 200
+    
+    def __init__(self, deepseek_config: Dict[str, Any], deduplicator: Optional[Deduplicator] = None):
         """
         初始化思想提取器
         
         Args:
             deepseek_config: DeepSeek配置字典
+            deduplicator: 可选的去重器，重复论文直接复用其记录中的提取结果
         """
         api_key = deepseek_config.get('api_key')
         if not api_key:
@@ -61,7 +93,9 @@ class IdeaExtractor:
             api_key=api_key,
             api_url=deepseek_config.get('api_url', 'https://api.deepseek.com/v1'),
             model=deepseek_config.get('model', 'deepseek-chat'),
-            timeout=deepseek_config.get('timeout', 30)
+            timeout=deepseek_config.get('timeout', 30),
+            cache=get_semantic_cache() if deepseek_config.get('semantic_cache', True) else None,
+            rate_limiter=get_rate_limiter(deepseek_config)
         )
         
         self.system_prompt = deepseek_config.get('system_prompt', 
@@ -69,6 +103,15 @@ class IdeaExtractor:
 包括：1) 研究问题 2) 方法创新 3) 主要贡献 4) 实验结果。
 控制在200-300字以内，语言简洁学术。""")
         
+        self.deduplicator = deduplicator
+        
+        # 论文数超过阈值时走批处理接口（约半价，但需等待任务完成）
+        self.use_batch_api = deepseek_config.get('use_batch_api', False)
+        self.batch_api_threshold = deepseek_config.get('batch_api_threshold', 20)
+        # 最长等待须留在每日调度周期内，超时后取消任务并退回实时调用
+        self.batch_api_max_wait = float(deepseek_config.get('batch_api_max_wait', 2 * 3600))
+        self.batch_api_poll_interval = float(deepseek_config.get('batch_api_poll_interval', 30))
+        
         logger.info("论文思想提取器已初始化")
     
     def _fallback_summary(self, original_summary: str, max_len: int = 300) -> str:
@@ -77,6 +120,24 @@ class IdeaExtractor:
             return original_summary
         return original_summary[:max_len] + "..."
     
+    def _is_short(self, summary: str) -> bool:
+        return len(summary.strip()) < self.MIN_SUMMARY_LENGTH
+    
+    def _short_summary_idea(self, paper: Dict[str, Any], extraction_time: str) -> ExtractedIdea:
+        """摘要过短的论文：不调用API，以原摘要作为总结"""
+        summary = paper.get('summary', '')
+        return ExtractedIdea(
+            paper_id=paper.get('paper_id', 'unknown'),
+            title=paper.get('title', ''),
+            authors=paper.get('authors') or [],
+            summary=summary,
+            ai_summary=self._fallback_summary(summary),
+            extraction_status='skipped_short',
+            extraction_time=extraction_time,
+            published=paper.get('published', ''),
+            arxiv_url=paper.get('arxiv_url', '')
+        )
+    
     async def extract_single_paper(self, paper: Dict[str, Any]) -> ExtractedIdea:
         """
         异步提取单篇论文的核心思想（包含评估）
@@ -88,22 +149,20 @@ class IdeaExtractor:
             提取的思想对象
         """
         paper_id = paper.get('paper_id', 'unknown')
+        title = paper.get('title', '')
+        summary = paper.get('summary', '')
+        authors = paper.get('authors') or []
+        
+        if self._is_short(summary):
+            logger.info(f"摘要过短，跳过API调用: {paper_id}")
+            return self._short_summary_idea(paper, datetime.now(timezone.utc).isoformat())
         
         try:
-            # 并发执行总结和评估
-            summary_task = self.client.summarize_paper(
-                paper.get('title', ''),
-                paper.get('summary', ''),
-                self.system_prompt
-            )
-            
-            eval_task = self.client.evaluate_paper_quality(
-                paper.get('title', ''),
-                paper.get('summary', ''),
-                paper.get('authors', [])
-            )
-            
-            ai_summary, eval_result = await asyncio.gather(summary_task, eval_task)
+            # 一次请求同时完成总结和评估
+            async with self.client:
+                ai_summary, eval_result = await self.client.summarize_and_evaluate(
+                    title, summary, self.system_prompt, authors
+                )
             
             # 处理总结结果
             if ai_summary:
@@ -111,7 +170,7 @@ class IdeaExtractor:
                 extraction_error = None
                 logger.info(f"✅ 思想提取成功: {paper_id}")
             else:
-                ai_summary = self._fallback_summary(paper.get('summary', ''))
+                ai_summary = self._fallback_summary(summary)
                 extraction_status = 'fallback'
                 extraction_error = 'API调用失败，使用备选方案'
                 logger.warning(f"⚠️  API失败，使用备选方案: {paper_id}")
@@ -130,7 +189,7 @@ class IdeaExtractor:
             
         except Exception as e:
             logger.error(f"❌ 提取失败 {paper_id}: {e}")
-            ai_summary = self._fallback_summary(paper.get('summary', ''))
+            ai_summary = self._fallback_summary(summary)
             extraction_status = 'error'
             extraction_error = str(e)
             quality_score = None
@@ -139,9 +198,9 @@ class IdeaExtractor:
         
         return ExtractedIdea(
             paper_id=paper_id,
-            title=paper.get('title', ''),
-            authors=paper.get('authors', []),
-            summary=paper.get('summary', ''),
+            title=title,
+            authors=authors,
+            summary=summary,
             ai_summary=ai_summary,
             key_points=None,
             quality_score=quality_score,
@@ -149,13 +208,16 @@ class IdeaExtractor:
             quality_reasoning=quality_reasoning,
             extraction_status=extraction_status,
             extraction_error=extraction_error,
-            extraction_time=datetime.now().isoformat(),
+            extraction_time=datetime.now(timezone.utc).isoformat(),
             published=paper.get('published', ''),
             arxiv_url=paper.get('arxiv_url', '')
         )
     
     async def extract_batch_papers(self, papers: List[Dict[str, Any]], 
-                                   batch_size: int = 3) -> Tuple[List[ExtractedIdea], Dict[str, Any]]:
+                                   batch_size: int = 3,
+                                   on_progress: Optional[Callable[[int, int, Dict[str, Any]], None]] = None,
+                                   close_session: bool = False
+                                   ) -> Tuple[List[ExtractedIdea], Dict[str, Any]]:
         """
         批量提取论文思想（异步，带评估）
         
@@ -163,25 +225,82 @@ class IdeaExtractor:
         
         Args:
             papers: 论文列表
-            batch_size: 批处理大小
+            batch_size: 同时处理的论文数
+            on_progress: 每完成一篇（API处理）时的回调 (已完成数, 总数, 论文)
+            close_session: 完成后关闭进程共享的HTTP会话，仅在事件循环即将结束时传True
         
         Returns:
             (提取的思想列表, 统计信息字典)
         """
-        start_time = datetime.now()
+        start_time = datetime.now(timezone.utc)
+        extraction_time = start_time.isoformat()  # 整批共用同一提取时间
         processor = DeepSeekBatchProcessor(self.client, batch_size=batch_size)
         
-        summaries, evaluations = await processor.process_papers_with_evaluation(
-            papers, self.system_prompt
-        )
+        # 已处理过的重复论文（如同一论文的v1/v2）直接复用去重记录中的结果，
+        # 摘要过短的论文不调用API
+        results: List[Optional[ExtractedIdea]] = [None] * len(papers)
+        pending = []
+        skipped_count = 0
+        for i, paper in enumerate(papers):
+            record = self.deduplicator.get_cached_idea(paper) if self.deduplicator else None
+            if record is None:
+                if self._is_short(paper.get('summary', '')):
+                    results[i] = self._short_summary_idea(paper, extraction_time)
+                    skipped_count += 1
+                else:
+                    pending.append(i)
+                continue
+            results[i] = ExtractedIdea(
+                paper_id=paper.get('paper_id', 'unknown'),
+                title=paper.get('title', ''),
+                authors=paper.get('authors') or [],
+                summary=paper.get('summary', ''),
+                ai_summary=record['ai_summary'],
+                key_points=None,
+                quality_score=record.get('quality_score'),
+                quality_level=record.get('quality_level'),
+                quality_reasoning=record.get('quality_reasoning'),
+                extraction_status='cached',
+                extraction_time=extraction_time,
+                published=paper.get('published', ''),
+                arxiv_url=paper.get('arxiv_url', '')
+            )
+        cached_count = len(papers) - len(pending) - skipped_count
+        if cached_count:
+            logger.info(f"♻️ {cached_count} 篇重复论文复用已有提取结果")
+        if skipped_count:
+            logger.info(f"{skipped_count} 篇论文摘要过短，跳过API调用")
+        
+        pending_papers = [papers[i] for i in pending]
+        
+        # 句向量一次性批量编码，避免逐篇编码阻塞事件循环
+        if self.client.cache is not None:
+            await self.client.cache.embed_many_async(
+                [(p.get('title', ''), p.get('summary', '')) for p in pending_papers]
+            )
+        
+        summaries, evaluations = [], []
+        try:
+            if pending_papers and self.use_batch_api and len(pending_papers) > self.batch_api_threshold:
+                summaries, evaluations = await processor.process_via_batch_api(
+                    pending_papers, self.system_prompt, on_progress,
+                    poll_interval=self.batch_api_poll_interval,
+                    max_wait=self.batch_api_max_wait
+                )
+            elif pending_papers:
+                summaries, evaluations = await processor.process_papers_with_evaluation(
+                    pending_papers, self.system_prompt, on_progress
+                )
+        finally:
+            if close_session:
+                await DeepSeekClient.aclose()
         
-        results = []
         success_count = 0
         fallback_count = 0
         error_count = 0
         
-        for (paper, ai_summary), (_, eval_result) in zip(summaries, evaluations):
-            paper_id = paper.get('paper_id', 'unknown')
+        for index, (paper, ai_summary), (_, eval_result) in zip(pending, summaries, evaluations):
+            summary = paper.get('summary', '')
             
             # 处理总结
             if ai_summary:
@@ -189,7 +308,7 @@ class IdeaExtractor:
                 extraction_error = None
                 success_count += 1
             else:
-                ai_summary = self._fallback_summary(paper.get('summary', ''))
+                ai_summary = self._fallback_summary(summary)
                 extraction_status = 'fallback'
                 extraction_error = 'API调用失败'
                 fallback_count += 1
@@ -204,11 +323,11 @@ class IdeaExtractor:
                 quality_level = None
                 quality_reasoning = None
             
-            results.append(ExtractedIdea(
-                paper_id=paper_id,
+            results[index] = ExtractedIdea(
+                paper_id=paper.get('paper_id', 'unknown'),
                 title=paper.get('title', ''),
-                authors=paper.get('authors', []),
-                summary=paper.get('summary', ''),
+                authors=paper.get('authors') or [],
+                summary=summary,
                 ai_summary=ai_summary,
                 key_points=None,
                 quality_score=quality_score,
@@ -216,20 +335,29 @@ class IdeaExtractor:
                 quality_reasoning=quality_reasoning,
                 extraction_status=extraction_status,
                 extraction_error=extraction_error,
-                extraction_time=datetime.now().isoformat(),
+                extraction_time=extraction_time,
                 published=paper.get('published', ''),
                 arxiv_url=paper.get('arxiv_url', '')
-            ))
+            )
+            if self.deduplicator is not None and extraction_status == 'success':
+                self.deduplicator.mark_as_processed(paper, results[index].to_dict(), save=False)
+        
+        if self.client.cache is not None:
+            self.client.cache.save()
+        if self.deduplicator is not None and pending_papers:
+            self.deduplicator.save()
         
-        processing_time = (datetime.now() - start_time).total_seconds()
+        processing_time = (datetime.now(timezone.utc) - start_time).total_seconds()
         
         stats = {
             'success': success_count,
+            'cached': cached_count,
+            'skipped': skipped_count,
             'fallback': fallback_count,
             'error': error_count,
             'total': len(results),
             'processing_time': processing_time
         }
         
-        logger.info(f"批量提取完成：共 {len(results)} 篇 (成功:{success_count} 备选:{fallback_count} 失败:{error_count})")
+        logger.info(f"批量提取完成：共 {len(results)} 篇 (成功:{success_count} 复用:{cached_count} 跳过:{skipped_count} 备选:{fallback_count} 失败:{error_count})")
         return results, stats
@@ -0,0 +1,200 @@
+"""
+API限流模块
+令牌桶控制请求速率（RPM）与token用量（TPM），信号量限制在途请求数，遇到429时按AIMD自适应降速
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveRateLimiter:
+    """自适应令牌桶限流器（加性增、乘性减）"""
+
+    # 两次乘性减之间的最短间隔（秒），尚未测得请求耗时时也能合并同一波429
+    MIN_DECREASE_INTERVAL = 1.0
+
+    def __init__(self, rate: float = 5.0, max_concurrent: int = 8,
+                 min_rate: float = 0.2, max_rate: Optional[float] = None,
+                 recovery_step: float = 0.1, tokens_per_minute: Optional[int] = None):
+        """
+        初始化限流器
+
+        Args:
+            rate: 初始速率（请求/秒）
+            max_concurrent: 最大在途请求数
+            min_rate: 降速下限
+            max_rate: 恢复上限，默认等于初始速率
+            recovery_step: 每次成功后速率的加性恢复量
+            tokens_per_minute: 每分钟token上限（TPM），为空时不限制
+        """
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate or rate
+        self.recovery_step = recovery_step
+        self.max_concurrent = max_concurrent
+
+        self._tokens = 1.0
+        self._last = time.monotonic()
+        # TPM桶：容量为一分钟的额度
+        self.tokens_per_minute = tokens_per_minute
+        self._budget = float(tokens_per_minute or 0)
+        self._paused_until = 0.0
+        # 乘性减的冷却：同一窗口内收到的多个429来自同一波在途请求，只降速一次
+        self._cooldown_until = 0.0
+        self._rtt = 0.0                          # 请求耗时的滑动平均（秒）
+        # asyncio原语与事件循环绑定，按循环延迟创建
+        self._loop = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._sem = asyncio.Semaphore(self.max_concurrent)
+            self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_config(cls, deepseek_config: Dict[str, Any]) -> 'AdaptiveRateLimiter':
+        """
+        按DeepSeek配置创建限流器
+
+        rpm 优先于 requests_per_second；max_concurrency 限制在途请求数；tpm 限制每分钟token数
+        """
+        rpm = deepseek_config.get('rpm')
+        rate = rpm / 60 if rpm else deepseek_config.get('requests_per_second', 5.0)
+        return cls(rate=rate,
+                   max_concurrent=deepseek_config.get('max_concurrency', 8),
+                   tokens_per_minute=deepseek_config.get('tpm'))
+
+    async def _take_token(self, tokens: int = 0):
+        """等待直到取得一个请求令牌，以及（设置了TPM时）足够的token额度"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                elapsed = now - self._last
+                self._last = now
+                self._tokens = min(1.0, self._tokens + elapsed * self.rate)
+                wait = 0.0 if self._tokens >= 1.0 else (1.0 - self._tokens) / self.rate
+
+                if self.tokens_per_minute:
+                    per_second = self.tokens_per_minute / 60
+                    need = min(float(tokens), float(self.tokens_per_minute))
+                    self._budget = min(float(self.tokens_per_minute), self._budget + elapsed * per_second)
+                    if self._budget < need:
+                        wait = max(wait, (need - self._budget) / per_second)
+
+                if wait <= 0:
+                    self._tokens -= 1.0
+                    if self.tokens_per_minute:
+                        self._budget -= need
+                    return
+                await asyncio.sleep(wait)
+
+    def acquire(self, tokens: int = 0) -> '_Permit':
+        """
+        获取一次请求许可，用法：async with limiter.acquire(tokens=...)
+
+        Args:
+            tokens: 本次请求预计消耗的token数（仅在设置了TPM时生效）
+        """
+        return _Permit(self, tokens)
+
+    async def __aenter__(self):
+        await self._enter(0)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._sem.release()
+
+    async def _enter(self, tokens: int):
+        self._bind_loop()
+        await self._sem.acquire()
+        try:
+            await self._take_token(tokens)
+        except BaseException:
+            self._sem.release()
+            raise
+
+    def on_success(self):
+        """请求成功：速率加性恢复"""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    def on_throttle(self, retry_after: float = 0.0):
+        """
+        收到429：速率减半，并在Retry-After期间暂停发放令牌
+
+        同时在途的多个请求往往一起被限流：每次降速后的一个请求耗时（或Retry-After时长，
+        至少 MIN_DECREASE_INTERVAL 秒）内再收到429只延长暂停、不再减半，避免一波限流就把速率压到下限
+
+        Args:
+            retry_after: 服务端建议的等待秒数
+        """
+        now = time.monotonic()
+        if retry_after > 0:
+            self._paused_until = max(self._paused_until, now + retry_after)
+        if now < self._cooldown_until:
+            return
+        self._cooldown_until = now + max(retry_after, self._rtt, self.MIN_DECREASE_INTERVAL)
+        self.rate = max(self.min_rate, self.rate / 2)
+        logger.warning(f"API限流，速率降至 {self.rate:.2f} 次/秒" +
+                       (f"，暂停 {retry_after:.1f} 秒" if retry_after > 0 else ""))
+
+    def _observe_rtt(self, seconds: float):
+        """记录一次请求耗时（指数滑动平均）"""
+        self._rtt = seconds if self._rtt == 0 else 0.8 * self._rtt + 0.2 * seconds
+
+
+class _Permit:
+    """携带token数的一次性许可"""
+
+    def __init__(self, limiter: AdaptiveRateLimiter, tokens: int):
+        self.limiter = limiter
+        self.tokens = tokens
+
+    async def __aenter__(self) -> AdaptiveRateLimiter:
+        await self.limiter._enter(self.tokens)
+        self._start = time.monotonic()
+        return self.limiter
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.limiter._observe_rtt(time.monotonic() - self._start)
+        self.limiter._sem.release()
+
+
+_shared: Dict[str, AdaptiveRateLimiter] = {}
+
+
+def get_rate_limiter(deepseek_config: Dict[str, Any]) -> AdaptiveRateLimiter:
+    """
+    获取进程内共享的限流器，同一API地址只创建一次
+
+    AI总结与质量评估并发执行且共用同一账号的RPM/TPM额度，
+    使用同一个限流器才能让总请求量不超过配置的上限，429降速也对两者同时生效
+    """
+    key = deepseek_config.get('api_url', 'https://api.deepseek.com/v1')
+    if key not in _shared:
+        _shared[key] = AdaptiveRateLimiter.from_config(deepseek_config)
+    return _shared[key]
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int = 0) -> int:
+    """粗略估算一次请求的token数：提示词约4字符/token，加上输出上限"""
+    return sum(len(m.get('content', '')) for m in messages) // 4 + max_tokens
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """解析Retry-After响应头（仅支持秒数形式）"""
+    try:
+        return max(0.0, float(value)) if value else 0.0
+    except ValueError:
+        return 0.0
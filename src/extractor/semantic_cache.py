@@ -0,0 +1,328 @@
+"""
+语义响应缓存模块
+在调用DeepSeek API之前按论文内容查找已有结果：
+1. 规范化文本的SHA256精确匹配
+2. 句向量余弦相似度近邻匹配（需安装 sentence-transformers）
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from orjson import loads as json_loads, dumps as json_dumps
+except ImportError:  # 未安装orjson时退回标准库
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # 未安装时仅使用精确匹配
+    np = None
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join('data', 'semantic_cache.json')
+
+# 句向量模型按名称在进程内共享，只加载一次
+_models: Dict[str, Any] = {}
+
+
+def _normalize(text: str) -> str:
+    """折叠空白并转小写，使仅有排版差异的文本得到相同的哈希"""
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+def hash_text(text: str) -> str:
+    """计算文本的SHA256十六进制摘要"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _title_tokens(title: str) -> set:
+    return set(re.findall(r'\w+', title.lower()))
+
+
+def _embed_text(title: str, summary: str) -> str:
+    return f"{title}\n{summary[:1500]}"
+
+
+def _load_model(name: str):
+    if name not in _models:
+        logger.info(f"加载句向量模型: {name}")
+        _models[name] = SentenceTransformer(name)
+    return _models[name]
+
+
+class SemanticCache:
+    """基于内容的LLM响应缓存（LRU + TTL，持久化为JSON）"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH,
+                 threshold: float = 0.92,
+                 accept_threshold: float = 0.97,
+                 title_overlap: float = 0.6,
+                 ttl_days: float = 30,
+                 max_entries: int = 5000,
+                 model_name: str = 'all-MiniLM-L6-v2'):
+        """
+        初始化缓存
+
+        Args:
+            path: 持久化文件路径
+            threshold: 语义命中的最低余弦相似度
+            accept_threshold: 直接接受的相似度，介于两者之间的灰区需要二次校验
+            title_overlap: 灰区二次校验要求的标题词重合度（Jaccard）
+            ttl_days: 条目有效期（天）
+            max_entries: 最大条目数，超出时淘汰最久未使用的条目
+            model_name: 句向量模型名称
+        """
+        self.path = path
+        self.threshold = threshold
+        self.accept_threshold = accept_threshold
+        self.title_overlap = title_overlap
+        self.ttl = ttl_days * 86400
+        self.max_entries = max_entries
+
+        # key -> {'namespace', 'title', 'value', 'ts', 'vec'}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._model_name = model_name
+        # 文本 -> 句向量；批量预编码的结果以及get未命中后紧接着put的同一文本都从这里取
+        self._vectors: Dict[str, Any] = {}
+        # 命名空间 -> (句向量矩阵 (N, D) float32, 对应的条目键)；首次查找时构建，写入时追加行
+        self._index: Dict[str, Tuple[Any, List[str]]] = {}
+        self._dirty = False
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+        self._load()
+
+    @staticmethod
+    def _key(namespace: str, title: str, summary: str) -> str:
+        return hash_text(f"{namespace}\n{_normalize(title)}\n{_normalize(summary[:1500])}")
+
+    def _embed(self, title: str, summary: str):
+        """生成归一化句向量；模型不可用时返回None"""
+        if SentenceTransformer is None:
+            return None
+        text = _embed_text(title, summary)
+        vec = self._vectors.get(text)
+        if vec is None:
+            vec = _load_model(self._model_name).encode(text, normalize_embeddings=True)
+            self._remember(text, vec)
+        return vec
+
+    def _remember(self, text: str, vec):
+        if len(self._vectors) >= 4096:
+            self._vectors.clear()
+        self._vectors[text] = vec
+
+    def embed_many(self, items: Sequence[Tuple[str, str]], batch_size: int = 32):
+        """
+        批量编码 (标题, 摘要)，结果供随后的get/put直接使用
+
+        Args:
+            items: (标题, 摘要) 列表
+            batch_size: 模型内部批大小
+        """
+        if SentenceTransformer is None:
+            return
+        texts = list(dict.fromkeys(
+            t for t in (_embed_text(title, summary) for title, summary in items)
+            if t not in self._vectors
+        ))
+        if not texts:
+            return
+        vecs = _load_model(self._model_name).encode(
+            texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+        )
+        for text, vec in zip(texts, vecs):
+            self._remember(text, vec)
+
+    async def embed_many_async(self, items: Sequence[Tuple[str, str]]):
+        """在线程池中执行 embed_many，避免编码阻塞事件循环"""
+        if SentenceTransformer is None or not items:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, self.embed_many, list(items))
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return now - entry['ts'] > self.ttl
+
+    def get(self, namespace: str, title: str, summary: str) -> Optional[Any]:
+        """
+        查找缓存
+
+        Args:
+            namespace: 结果类型（如 quality / summary / evaluation）
+            title: 论文标题
+            summary: 论文摘要
+
+        Returns:
+            缓存的结果，未命中时返回None
+        """
+        now = time.time()
+        key = self._key(namespace, title, summary)
+
+        entry = self._entries.get(key)
+        if entry is not None and not self._expired(entry, now):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['value']
+
+        vec = self._embed(title, summary)
+        if vec is not None:
+            match = self._nearest(namespace, title, vec, now)
+            if match is not None:
+                self._entries.move_to_end(match)
+                self.hits += 1
+                self.semantic_hits += 1
+                return self._entries[match]['value']
+
+        self.misses += 1
+        return None
+
+    def _namespace_index(self, namespace: str, now: float) -> Tuple[Any, List[str]]:
+        """获取（必要时构建）命名空间的句向量矩阵"""
+        index = self._index.get(namespace)
+        if index is None:
+            keys = [k for k, e in self._entries.items()
+                    if e['namespace'] == namespace and e['vec'] is not None and not self._expired(e, now)]
+            matrix = np.asarray([self._entries[k]['vec'] for k in keys], dtype=np.float32)
+            index = self._index[namespace] = (matrix, keys)
+        return index
+
+    def _nearest(self, namespace: str, title: str, vec, now: float) -> Optional[str]:
+        """在同一命名空间内查找最相似且通过校验的条目"""
+        matrix, keys = self._namespace_index(namespace, now)
+        if not keys:
+            return None
+
+        sims = matrix @ np.asarray(vec, dtype=np.float32)
+        best = int(np.argmax(sims))
+        sim = float(sims[best])
+        if self._expired(self._entries[keys[best]], now):
+            # 矩阵中含已过期条目，下次查找时重建
+            self._index.pop(namespace, None)
+            return None
+
+        if sim < self.threshold:
+            return None
+        if sim < self.accept_threshold:
+            # 灰区：主题相近但可能是不同论文，要求标题也基本一致
+            a, b = _title_tokens(title), _title_tokens(self._entries[keys[best]]['title'])
+            if not a or not b or len(a & b) / len(a | b) < self.title_overlap:
+                return None
+        return keys[best]
+
+    def put(self, namespace: str, title: str, summary: str, value: Any):
+        """
+        写入缓存
+
+        Args:
+            namespace: 结果类型
+            title: 论文标题
+            summary: 论文摘要
+            value: 可JSON序列化的结果
+        """
+        vec = self._embed(title, summary)
+        key = self._key(namespace, title, summary)
+        index = self._index.get(namespace)
+        if index is not None:
+            if key in self._entries or vec is None:
+                self._index.pop(namespace)
+            else:
+                matrix, keys = index
+                row = np.asarray(vec, dtype=np.float32)[None, :]
+                self._index[namespace] = (np.concatenate([matrix, row]) if keys else row, keys + [key])
+        self._entries[key] = {
+            'namespace': namespace,
+            'title': title,
+            'value': value,
+            'ts': time.time(),
+            'vec': vec.tolist() if vec is not None else None,
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._index.pop(evicted['namespace'], None)
+        self._dirty = True
+
+    async def get_or_compute(self, namespace: str, title: str, summary: str,
+                             compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        命中缓存时直接返回，否则调用compute并缓存非空结果
+
+        Args:
+            namespace: 结果类型
+            title: 论文标题
+            summary: 论文摘要
+            compute: 未命中时执行的异步函数
+
+        Returns:
+            缓存或新计算的结果
+        """
+        cached = self.get(namespace, title, summary)
+        if cached is not None:
+            return cached
+        value = await compute()
+        if value is not None:
+            self.put(namespace, title, summary, value)
+        return value
+
+    def _load(self):
+        """从磁盘加载未过期的条目"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                data: List[Dict[str, Any]] = json_loads(f.read())
+        except Exception as e:
+            logger.warning(f"语义缓存加载失败，将重新建立: {e}")
+            return
+
+        now = time.time()
+        for item in data:
+            entry = {k: item.get(k) for k in ('namespace', 'title', 'value', 'ts', 'vec')}
+            if entry['ts'] is not None and not self._expired(entry, now):
+                self._entries[item['key']] = entry
+        logger.info(f"语义缓存已加载: {len(self._entries)} 条")
+
+    def save(self):
+        """将缓存写回磁盘（无变更时跳过）"""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            data = [{'key': k, **e} for k, e in self._entries.items()]
+            tmp_path = self.path + '.tmp'
+            # 条目中含句向量（浮点列表），用orjson序列化明显更快，且直接得到字节串
+            with open(tmp_path, 'wb') as f:
+                f.write(json_dumps(data))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            logger.info(
+                f"语义缓存已保存: {len(self._entries)} 条 "
+                f"(命中{self.hits}，其中语义命中{self.semantic_hits}，未命中{self.misses})"
+            )
+        except Exception as e:
+            logger.error(f"保存语义缓存失败: {e}")
+
+
+_shared: Dict[str, SemanticCache] = {}
+
+
+def get_semantic_cache(path: str = DEFAULT_CACHE_PATH) -> SemanticCache:
+    """获取进程内共享的缓存实例，同一路径只加载一次"""
+    if path not in _shared:
+        _shared[path] = SemanticCache(path)
+    return _shared[path]
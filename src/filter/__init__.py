@@ -4,11 +4,15 @@
 """
 
 from .deduplicator import Deduplicator, PaperFingerprint
+from .minhash import MinHashLSH
+from .classification_cache import ClassificationCache
 from .paper_filter import PaperFilter, PaperClassifier, FilteredPaper
 
 __all__ = [
     'Deduplicator',
     'PaperFingerprint',
+    'MinHashLSH',
+    'ClassificationCache',
     'PaperFilter',
     'PaperClassifier',
     'FilteredPaper',
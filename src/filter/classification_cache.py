@@ -0,0 +1,162 @@
+"""
+分类结果缓存模块
+以论文ID为键将分类结果存入SQLite，重复运行时内容未变化的论文不再重新分类；
+主题关键词配置变化后缓存整体失效
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from orjson import loads as json_loads, dumps as json_dumps
+except ImportError:  # 未安装orjson时退回标准库
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join('data', 'classifications.db')
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def keywords_hash(topic_keywords: Dict[str, Dict]) -> str:
+    """计算主题关键词配置的哈希，作为缓存版本号"""
+    return _digest(json.dumps(topic_keywords, sort_keys=True, ensure_ascii=False))
+
+
+def _content_hash(paper: Dict) -> str:
+    """论文标题和摘要的哈希；同一ID的新版本内容变化时不命中旧结果"""
+    return _digest(f"{paper.get('title', '')}\n{paper.get('summary', '')}")
+
+
+class ClassificationCache:
+    """基于SQLite的分类结果缓存（按最近使用时间淘汰）"""
+
+    def __init__(self, topic_keywords: Dict[str, Dict], path: str = DEFAULT_CACHE_PATH,
+                 max_entries: int = 50000):
+        """
+        打开（必要时创建）缓存
+
+        Args:
+            topic_keywords: 当前的主题关键词配置，哈希不一致时清空缓存
+            path: 数据库文件路径
+            max_entries: 最大条目数，超出时淘汰最久未使用的条目
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS classifications ('
+                'paper_id TEXT PRIMARY KEY, content_hash TEXT, result_json BLOB, ts INTEGER)'
+            )
+            version = keywords_hash(topic_keywords)
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'keywords_hash'").fetchone()
+            if row is None or row[0] != version:
+                if row is not None:
+                    logger.info("主题关键词配置已变化，清空分类缓存")
+                self._conn.execute('DELETE FROM classifications')
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('keywords_hash', ?)", (version,)
+                )
+
+    def get_many(self, papers: List[Dict]) -> List[Optional[Tuple[str, Dict, float, List[str]]]]:
+        """
+        批量查找分类结果
+
+        Args:
+            papers: 论文信息字典列表
+
+        Returns:
+            与输入顺序一致的列表，未命中（或内容已变化）的位置为None
+        """
+        ids = [paper.get('paper_id', '') for paper in papers]
+        rows: Dict[str, Tuple[str, bytes]] = {}
+        unique_ids = [pid for pid in dict.fromkeys(ids) if pid]
+        # 分批查询，避免超过SQLite的参数个数上限
+        for i in range(0, len(unique_ids), 500):
+            batch = unique_ids[i:i + 500]
+            placeholders = ','.join('?' * len(batch))
+            for pid, content, result in self._conn.execute(
+                    f'SELECT paper_id, content_hash, result_json FROM classifications '
+                    f'WHERE paper_id IN ({placeholders})', batch):
+                rows[pid] = (content, result)
+
+        results: List[Optional[Tuple[str, Dict, float, List[str]]]] = []
+        touched = []
+        for paper, pid in zip(papers, ids):
+            row = rows.get(pid)
+            result = None
+            if row is not None and row[0] == _content_hash(paper):
+                try:
+                    topic, details, score, matched = json_loads(row[1])
+                    # 反序列化得到的主题名重新驻留，与分类器返回的保持一致
+                    result = (sys.intern(topic), details, score, matched)
+                    touched.append(pid)
+                except Exception as e:
+                    logger.warning(f"分类缓存记录损坏，忽略: {e}")
+            results.append(result)
+
+        self.hits += len(touched)
+        self.misses += len(papers) - len(touched)
+        if touched:
+            now = int(time.time())
+            with self._conn:
+                self._conn.executemany('UPDATE classifications SET ts = ? WHERE paper_id = ?',
+                                       [(now, pid) for pid in touched])
+        return results
+
+    def put_many(self, papers: List[Dict], results: List[Tuple[str, Dict, float, List[str]]]):
+        """
+        批量写入分类结果
+
+        Args:
+            papers: 论文信息字典列表
+            results: 与 papers 一一对应的分类结果
+        """
+        now = int(time.time())
+        rows = [
+            (paper.get('paper_id'), _content_hash(paper), json_dumps(list(result)), now)
+            for paper, result in zip(papers, results) if paper.get('paper_id')
+        ]
+        if not rows:
+            return
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO classifications (paper_id, content_hash, result_json, ts) '
+                'VALUES (?, ?, ?, ?)', rows
+            )
+            self._evict()
+
+    def _evict(self):
+        """条目数超过上限时删除最久未使用的条目"""
+        (count,) = self._conn.execute('SELECT COUNT(*) FROM classifications').fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                'DELETE FROM classifications WHERE paper_id IN '
+                '(SELECT paper_id FROM classifications ORDER BY ts LIMIT ?)', (excess,)
+            )
+
+    def close(self):
+        """关闭数据库连接"""
+        logger.info(f"分类缓存: 命中{self.hits}，未命中{self.misses}")
+        self._conn.close()
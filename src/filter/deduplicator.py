@@ -5,16 +5,40 @@
 
 import json
 import os
+import re
 import logging
-from typing import List, Dict, Set, Tuple
+from typing import List, Dict, Set, Tuple, Optional
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 import hashlib
 
+from .minhash import MinHashLSH, SIGNATURE_VERSION
+
+try:
+    from orjson import loads as _loads, dumps as _dumps
+except ImportError:  # 未安装orjson时退回标准库
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
 logger = logging.getLogger(__name__)
 
+# 指纹哈希算法（仅用于去重，无需密码学强度）；变更时旧缓存会在加载时按记录重新计算
+HASH_ALGO = 'blake2b_128'
+
+
+def _fingerprint_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+# 标题中需要去除的字符：字母、数字、空白以外的所有字符（\w 含下划线，需单独排除）
+_TITLE_STRIP_RE = re.compile(r'[^\w\s]|_')
+# 标题中的数字（版本号、年份、序号），近似匹配时必须完全一致
+_TITLE_NUMBER_RE = re.compile(r'\d+')
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class PaperFingerprint:
     """论文指纹 - 用于去重"""
     paper_id: str
@@ -35,43 +59,149 @@ class PaperFingerprint:
 class Deduplicator:
     """论文去重器"""
     
-    def __init__(self, cache_file: str = 'data/processed_papers.json'):
+    def __init__(self, cache_file: str = 'data/processed_papers.jsonl',
+                 near_duplicate_threshold: Optional[float] = 0.85,
+                 retention_days: Optional[int] = 365):
         """
         初始化去重器
         
         Args:
             cache_file: 已处理论文缓存文件路径
+            near_duplicate_threshold: 标题近似重复的相似度阈值（MinHash估计的Jaccard），
+                                      为None时只做精确匹配
+            retention_days: 记录保留天数，加载时丢弃更早标记的记录，使缓存不随运行时间无限增长；
+                            为None时永久保留
         """
         self.cache_file = cache_file
-        self.processed_papers: Set[str] = set()  # 存储论文哈希值
-        self.paper_records: Dict[str, Dict] = {}  # 存储完整记录
+        self.retention_days = retention_days
+        base = os.path.splitext(cache_file)[0]
+        self._meta_file = base + '.meta.json'    # 更新时间、总数、哈希算法
+        self._legacy_file = base + '.json'       # 旧版整体JSON缓存
+        self.paper_records: Dict[str, Dict] = {}  # 论文哈希值 -> 完整记录
+        self._dirty_keys: Set[str] = set()       # 待追加写入的记录
+        self._line_count = 0                     # 文件现有行数，用于判断何时压缩
+        self._needs_compact = False
+        # 精确匹配未命中时，用标题MinHash-LSH捕捉修订后的近似标题
+        self.lsh = MinHashLSH(threshold=near_duplicate_threshold) if near_duplicate_threshold else None
         
         self._load_cache()
+        self._build_lsh()
     
     def _load_cache(self):
-        """从缓存文件加载已处理论文"""
+        """
+        从缓存文件加载已处理论文
+        
+        缓存为追加写入的JSONL，每行一条记录，同一键后出现的行覆盖先前的行；
+        旧版整体JSON缓存（同名 .json 文件）会在首次加载时导入
+        """
+        meta = self._read_meta()
         if os.path.exists(self.cache_file):
             try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.paper_records = data.get('records', {})
-                    # 提取所有论文哈希值
-                    self.processed_papers = set(self.paper_records.keys())
-                    logger.info(f"从缓存加载了 {len(self.processed_papers)} 条论文记录")
+                with open(self.cache_file, 'rb') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        record = _loads(line)
+                        self.paper_records[record.pop('key')] = record
+                        self._line_count += 1
+            except Exception as e:
+                logger.warning(f"加载缓存文件失败: {e}")
+        elif os.path.exists(self._legacy_file):
+            try:
+                with open(self._legacy_file, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                self.paper_records = meta.get('records', {})
+                self._needs_compact = True
+                logger.info(f"导入旧版去重缓存 {self._legacy_file}")
             except Exception as e:
                 logger.warning(f"加载缓存文件失败: {e}")
         else:
             logger.info("缓存文件不存在，开始新建")
+        
+        if self.paper_records and meta.get('hash_algo') != HASH_ALGO:
+            self._rehash_records()
+        if self.paper_records and meta.get('minhash_version') != SIGNATURE_VERSION:
+            # 签名算法已变更，丢弃旧签名，建立索引时重新计算
+            for record in self.paper_records.values():
+                record.pop('minhash', None)
+            self._needs_compact = True
+        if self.retention_days and self.paper_records:
+            self._expire_records()
+        if self.paper_records:
+            logger.info(f"从缓存加载了 {len(self.paper_records)} 条论文记录")
+    
+    def _expire_records(self):
+        """丢弃超过保留期的记录（爬取窗口只有几天，早已过期的论文不会再次出现）"""
+        cutoff = (datetime.utcnow() - timedelta(days=self.retention_days)).isoformat()
+        expired = [key for key, record in self.paper_records.items()
+                   if record.get('marked_at') and record['marked_at'] < cutoff]
+        if expired:
+            for key in expired:
+                del self.paper_records[key]
+            self._needs_compact = True
+            logger.info(f"丢弃 {len(expired)} 条超过 {self.retention_days} 天的去重记录")
+    
+    def _read_meta(self) -> Dict:
+        if not os.path.exists(self._meta_file):
+            return {}
+        try:
+            with open(self._meta_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"读取去重缓存元信息失败: {e}")
+            return {}
+    
+    def _build_lsh(self):
+        """用记录中保存的签名建立LSH索引（旧记录没有签名时补算）"""
+        if self.lsh is None:
+            return
+        for dup_key, record in self.paper_records.items():
+            signature = record.get('minhash')
+            if not signature or len(signature) != self.lsh.num_perm:
+                signature = record['minhash'] = self._title_signature(record.get('title', ''))
+            self.lsh.insert(dup_key, signature)
+    
+    def _title_signature(self, title: str) -> List[int]:
+        return self.lsh.signature(self._normalize_title(title))
+    
+    def _rehash_records(self):
+        """旧版本缓存使用其他哈希算法，按记录中保存的标题/作者重新生成键"""
+        records = {}
+        for record in self.paper_records.values():
+            fingerprint = self.get_paper_fingerprint({
+                'paper_id': record.get('paper_id', ''),
+                'title': record.get('title', ''),
+                'authors': record.get('authors', []),
+                'doi': record.get('fingerprint', {}).get('doi', '')
+            })
+            record['fingerprint'] = fingerprint.to_dict()
+            records[self._generate_duplicate_key(fingerprint)] = record
+        self.paper_records = records
+        self._needs_compact = True
+        logger.info(f"去重缓存已迁移到 {HASH_ALGO} 指纹: {len(records)} 条")
     
     def _save_cache(self):
-        """保存缓存到文件"""
+        """
+        保存缓存到文件：只追加新增/更新的记录，
+        文件行数超过记录数两倍（或需要迁移）时整体重写压缩
+        """
         try:
             # 确保目录存在
-            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            
+            if self._needs_compact or self._line_count + len(self._dirty_keys) > 2 * max(len(self.paper_records), 1):
+                self.compact()
+            elif self._dirty_keys:
+                with open(self.cache_file, 'ab') as f:
+                    for key in self._dirty_keys:
+                        f.write(_dumps({'key': key, **self.paper_records[key]}) + b'\n')
+                self._line_count += len(self._dirty_keys)
+                self._dirty_keys.clear()
             
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
+            with open(self._meta_file, 'w', encoding='utf-8') as f:
                 json.dump({
-                    'records': self.paper_records,
+                    'hash_algo': HASH_ALGO,
+                    'minhash_version': SIGNATURE_VERSION,
                     'updated_at': datetime.utcnow().isoformat(),
                     'total_count': len(self.paper_records)
                 }, f, ensure_ascii=False, indent=2)
@@ -80,6 +210,18 @@ class Deduplicator:
         except Exception as e:
             logger.error(f"保存缓存失败: {e}")
     
+    def compact(self):
+        """重写缓存文件，每条记录只保留一行"""
+        tmp_file = self.cache_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            for key, record in self.paper_records.items():
+                f.write(_dumps({'key': key, **record}) + b'\n')
+        os.replace(tmp_file, self.cache_file)
+        self._line_count = len(self.paper_records)
+        self._dirty_keys.clear()
+        self._needs_compact = False
+        logger.debug(f"去重缓存已压缩: {self._line_count} 条")
+    
     @staticmethod
     def _compute_title_hash(title: str) -> str:
         """
@@ -92,15 +234,12 @@ class Deduplicator:
         Returns:
             标题哈希值
         """
-        # 标准化标题
-        normalized = title.lower().strip()
-        # 只保留字母、数字和空格
-        normalized = ''.join(c if c.isalnum() or c.isspace() else '' for c in normalized)
-        # 去除多余空格
-        normalized = ' '.join(normalized.split())
-        
-        # 计算SHA256哈希
-        return hashlib.sha256(normalized.encode()).hexdigest()
+        return _fingerprint_hash(Deduplicator._normalize_title(title))
+    
+    @staticmethod
+    def _normalize_title(title: str) -> str:
+        """标准化标题：小写，只保留字母、数字和空格，去除多余空格"""
+        return ' '.join(_TITLE_STRIP_RE.sub('', title.lower()).split())
     
     @staticmethod
     def _compute_authors_hash(authors: List[str], top_n: int = 3) -> str:
@@ -115,12 +254,10 @@ class Deduplicator:
         Returns:
             作者哈希值
         """
-        # 只取前N个作者
-        top_authors = authors[:top_n]
-        # 标准化：小写、去除空格
-        authors_str = '|'.join([a.lower().strip() for a in top_authors])
+        # 只取前N个作者；标准化：小写、去除空格
+        authors_str = '|'.join(a.lower().strip() for a in authors[:top_n])
         
-        return hashlib.sha256(authors_str.encode()).hexdigest()
+        return _fingerprint_hash(authors_str)
     
     def get_paper_fingerprint(self, paper: Dict) -> PaperFingerprint:
         """
@@ -159,44 +296,108 @@ class Deduplicator:
         key = f"{fingerprint.title_hash}_{fingerprint.authors_hash}"
         return key
     
-    def is_duplicate(self, paper: Dict) -> Tuple[bool, str]:
+    def is_duplicate(self, paper: Dict,
+                     fingerprint: Optional[PaperFingerprint] = None) -> Tuple[bool, str]:
         """
         检查论文是否重复
         
         Args:
             paper: 论文信息字典
+            fingerprint: 预先计算的论文指纹，为空时重新计算
         
         Returns:
             (是否重复, 如果重复则返回第一次出现的paper_id，否则返回空字符串)
         """
-        fingerprint = self.get_paper_fingerprint(paper)
+        if fingerprint is None:
+            fingerprint = self.get_paper_fingerprint(paper)
         dup_key = self._generate_duplicate_key(fingerprint)
         
-        if dup_key in self.processed_papers:
-            # 查找第一次出现的paper_id
-            if dup_key in self.paper_records:
-                first_paper_id = self.paper_records[dup_key].get('paper_id', 'unknown')
-                logger.debug(f"检测到重复论文: {paper['title'][:50]}... (第一次出现: {first_paper_id})")
-                return True, first_paper_id
-            return True, ''
+        record = self.paper_records.get(dup_key)
+        if record is not None:
+            # 第一次出现的paper_id
+            first_paper_id = record.get('paper_id', 'unknown')
+            logger.debug(f"检测到重复论文: {paper['title'][:50]}... (第一次出现: {first_paper_id})")
+            return True, first_paper_id
+        
+        near_key = self._find_near_duplicate(paper)
+        if near_key is not None:
+            first_paper_id = self.paper_records[near_key].get('paper_id', 'unknown')
+            logger.debug(f"检测到近似重复论文: {paper['title'][:50]}... (相似于: {first_paper_id})")
+            return True, first_paper_id
         
         return False, ''
     
-    def mark_as_processed(self, paper: Dict) -> bool:
+    def _find_near_duplicate(self, paper: Dict) -> Optional[str]:
+        """
+        在LSH索引中查找标题近似的已处理论文，返回其记录键
+
+        标题相似只说明可能是同一论文的修订版；系列论文（如 "Llama 2"/"Llama 3"）
+        或同一作者的同模板标题相似度同样很高，因此还要求作者列表完全相同、
+        标题中的数字完全相同
+        """
+        if self.lsh is None:
+            return None
+        title = paper.get('title', '')
+        authors = self._normalize_authors(paper.get('authors', []))
+        numbers = _TITLE_NUMBER_RE.findall(title)
+
+        def same_paper(key: str) -> bool:
+            record = self.paper_records[key]
+            return (self._normalize_authors(record.get('authors', [])) == authors
+                    and _TITLE_NUMBER_RE.findall(record.get('title', '')) == numbers)
+
+        return self.lsh.query(self._title_signature(title), accept=same_paper)
+    
+    @staticmethod
+    def _normalize_authors(authors: List[str]) -> List[str]:
+        return [a.lower().strip() for a in authors]
+    
+    # 随记录保存的AI提取结果字段，重复论文可直接复用
+    IDEA_FIELDS = ('ai_summary', 'quality_score', 'quality_level', 'quality_reasoning')
+    
+    def get_cached_idea(self, paper: Dict) -> Optional[Dict]:
+        """
+        查找重复论文已保存的AI提取结果（只认精确指纹匹配，近似匹配的论文可能内容不同）
+        
+        Args:
+            paper: 论文信息字典
+        
+        Returns:
+            包含 IDEA_FIELDS 与首次出现的 paper_id 的记录，未找到时返回None
+        """
+        dup_key = self._generate_duplicate_key(self.get_paper_fingerprint(paper))
+        record = self.paper_records.get(dup_key)
+        if record is None or not record.get('ai_summary'):
+            return None
+        return record
+    
+    def mark_as_processed(self, paper: Dict, idea: Optional[Dict] = None, save: bool = True,
+                          fingerprint: Optional[PaperFingerprint] = None) -> bool:
         """
         将论文标记为已处理
         
         Args:
             paper: 论文信息字典
+            idea: AI提取结果（ExtractedIdea.to_dict()），提供时随记录保存；
+                  论文已存在时仅补充该结果
+            save: 是否立即写回缓存文件
+            fingerprint: 预先计算的论文指纹，为空时重新计算
         
         Returns:
             是否成功标记（如果已存在则返回False）
         """
-        fingerprint = self.get_paper_fingerprint(paper)
+        if fingerprint is None:
+            fingerprint = self.get_paper_fingerprint(paper)
         dup_key = self._generate_duplicate_key(fingerprint)
         
-        if dup_key in self.processed_papers:
+        record = self.paper_records.get(dup_key)
+        if record is not None:
             logger.debug(f"论文已存在: {paper['title'][:50]}...")
+            if idea:
+                record.update({k: idea.get(k) for k in self.IDEA_FIELDS})
+                self._dirty_keys.add(dup_key)
+                if save:
+                    self._save_cache()
             return False
         
         # 记录论文信息
@@ -207,9 +408,16 @@ class Deduplicator:
             'marked_at': datetime.utcnow().isoformat(),
             'fingerprint': fingerprint.to_dict()
         }
+        if idea:
+            self.paper_records[dup_key].update({k: idea.get(k) for k in self.IDEA_FIELDS})
+        if self.lsh is not None:
+            signature = self._title_signature(paper.get('title', ''))
+            self.paper_records[dup_key]['minhash'] = signature
+            self.lsh.insert(dup_key, signature)
         
-        self.processed_papers.add(dup_key)
-        self._save_cache()
+        self._dirty_keys.add(dup_key)
+        if save:
+            self._save_cache()
         
         logger.debug(f"已标记论文: {paper['title'][:50]}...")
         return True
@@ -228,24 +436,38 @@ class Deduplicator:
         duplicate_papers = []
         
         for paper in papers:
-            is_dup, first_paper_id = self.is_duplicate(paper)
+            # 指纹只计算一次，供查重和标记共用
+            fingerprint = self.get_paper_fingerprint(paper)
+            is_dup, first_paper_id = self.is_duplicate(paper, fingerprint)
             
             if is_dup:
                 paper['duplicate_of'] = first_paper_id
                 duplicate_papers.append(paper)
             else:
                 unique_papers.append(paper)
-                self.mark_as_processed(paper)
+                self.mark_as_processed(paper, save=False, fingerprint=fingerprint)
+        
+        # 整批标记完成后只写一次文件
+        if unique_papers:
+            self._save_cache()
         
         logger.info(f"去重完成: 新增{len(unique_papers)}篇, 重复{len(duplicate_papers)}篇")
         return unique_papers, duplicate_papers
     
+    def save(self):
+        """将缓存写回文件（配合 mark_as_processed(save=False) 批量写入）"""
+        self._save_cache()
+    
     def clear_cache(self):
         """清空缓存"""
-        self.processed_papers.clear()
         self.paper_records.clear()
-        if os.path.exists(self.cache_file):
-            os.remove(self.cache_file)
+        if self.lsh is not None:
+            self.lsh.clear()
+        self._dirty_keys.clear()
+        self._line_count = 0
+        for path in (self.cache_file, self._meta_file):
+            if os.path.exists(path):
+                os.remove(path)
         logger.info("缓存已清空")
 
 
@@ -0,0 +1,142 @@
+"""
+MinHash-LSH 近似去重模块
+对标题的UTF-8字节3-gram计算MinHash签名，通过分段(banding)索引快速找出相似标题
+安装 numba 时签名计算使用JIT编译版本
+"""
+
+import random
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:  # 未安装numba时使用纯Python实现
+    np = None
+    njit = None
+
+# 签名算法版本；持久化的签名版本不一致时需要重新计算
+SIGNATURE_VERSION = 2
+
+_MASK64 = (1 << 64) - 1
+_SHINGLE_BYTES = 3
+
+
+def _shingles(data: bytes, k: int = _SHINGLE_BYTES) -> Set[int]:
+    """
+    UTF-8字节k-gram集合
+
+    k不超过8时窗口本身即可无冲突地装入一个整数，无需再做哈希；
+    打散由签名中的乘法哈希完成
+    """
+    if len(data) <= k:
+        return {int.from_bytes(data, 'big')}
+    return {int.from_bytes(data[i:i + k], 'big') for i in range(len(data) - k + 1)}
+
+
+def _signature_py(data: bytes, perms: Sequence[Tuple[int, int]]) -> List[int]:
+    hashes = _shingles(data)
+    return [min(((a * h + b) & _MASK64) >> 32 for h in hashes) for a, b in perms]
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _signature_jit(data, k, mul, add):
+        """与 _signature_py 等价的编译版本：uint64乘加自然按2^64回绕"""
+        n = data.shape[0]
+        count = n - k + 1 if n > k else 1
+        out = np.full(mul.shape[0], np.uint64(0xFFFFFFFF))
+        for i in range(count):
+            h = np.uint64(0)
+            for j in range(i, min(i + k, n)):
+                h = (h << np.uint64(8)) | np.uint64(data[j])
+            for p in range(mul.shape[0]):
+                v = (mul[p] * h + add[p]) >> np.uint64(32)
+                if v < out[p]:
+                    out[p] = v
+        return out
+
+
+class MinHashLSH:
+    """MinHash签名 + LSH分段索引"""
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 64, bands: int = 8, seed: int = 1):
+        """
+        初始化索引
+
+        Args:
+            threshold: 判定为近似重复的Jaccard相似度下限
+            num_perm: 签名长度（置换数）
+            bands: LSH分段数，num_perm须能被整除；候选再按签名相似度确认
+            seed: 置换参数的随机种子，持久化的签名依赖它保持不变
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm 必须能被 bands 整除")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = random.Random(seed)
+        # 乘法-移位哈希：奇数乘数，取64位乘积的高32位
+        self._perms: List[Tuple[int, int]] = [
+            (rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(num_perm)
+        ]
+        if njit is not None:
+            self._mul = np.array([a for a, _ in self._perms], dtype=np.uint64)
+            self._add = np.array([b for _, b in self._perms], dtype=np.uint64)
+        self._buckets: List[Dict[Tuple[int, ...], List[str]]] = [defaultdict(list) for _ in range(bands)]
+        self._signatures: Dict[str, List[int]] = {}
+
+    def signature(self, text: str) -> List[int]:
+        """计算文本的MinHash签名"""
+        data = text.encode('utf-8')
+        if njit is not None:
+            return _signature_jit(np.frombuffer(data, dtype=np.uint8),
+                                  _SHINGLE_BYTES, self._mul, self._add).tolist()
+        return _signature_py(data, self._perms)
+
+    def _band_keys(self, signature: Sequence[int]):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, tuple(signature[start:start + self.rows])
+
+    def insert(self, key: str, signature: Sequence[int]):
+        """加入索引（同一key重复插入时忽略）"""
+        if key in self._signatures or len(signature) != self.num_perm:
+            return
+        self._signatures[key] = list(signature)
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band][band_key].append(key)
+
+    def query(self, signature: Sequence[int],
+              accept: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        查找相似度不低于阈值的已索引条目
+
+        Args:
+            signature: 待查询文本的签名
+            accept: 候选key的附加校验，返回False的候选不参与比较
+
+        Returns:
+            最相似条目的key，没有时返回None
+        """
+        candidates: Set[str] = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+
+        best, best_sim = None, self.threshold
+        for key in candidates:
+            if accept is not None and not accept(key):
+                continue
+            other = self._signatures[key]
+            sim = sum(1 for x, y in zip(signature, other) if x == y) / self.num_perm
+            if sim >= best_sim:
+                best, best_sim = key, sim
+        return best
+
+    def clear(self):
+        """清空索引"""
+        for buckets in self._buckets:
+            buckets.clear()
+        self._signatures.clear()
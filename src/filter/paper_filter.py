@@ -3,16 +3,82 @@
 负责对论文进行关键词匹配、相关性评分和分类
 """
 
-import re
+import os
+import sys
+import heapq
 import logging
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter, defaultdict
+from typing import List, Dict, Set, Tuple, Optional
+from dataclasses import dataclass
 import json
 
+from .classification_cache import ClassificationCache
+
+try:
+    import ahocorasick
+except ImportError:  # 未安装pyahocorasick时逐个关键词查找
+    ahocorasick = None
+
+try:
+    import numpy as np
+except ImportError:  # 未安装numpy时逐篇计算主题得分
+    np = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # 未安装numba时用numpy计算得分矩阵
+    njit = None
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _aggregate_scores(paper_idx, topic_idx, hit_counts, keyword_counts, weights,
+                          n_papers, n_topics):
+        """
+        把 (论文, 主题, 匹配数) 三元组汇总成得分矩阵
+
+        每个 (论文, 主题) 最多出现一次，各次迭代写入不同单元格，可并行
+        """
+        scores = np.zeros((n_papers, n_topics), dtype=np.float64)
+        for h in prange(paper_idx.shape[0]):
+            t = topic_idx[h]
+            score = hit_counts[h] / keyword_counts[t] * weights[t]
+            scores[paper_idx[h], t] = min(score, 1.0)
+        return scores
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == '_'
+
+
+def _is_word_boundary(text: str, start: int, end: int) -> bool:
+    """判断 text[start:end] 两端是否都是词边界（与正则 \\b 的判定一致）"""
+    def boundary(i: int) -> bool:
+        before = i > 0 and _is_word_char(text[i - 1])
+        after = i < len(text) and _is_word_char(text[i])
+        return before != after
+    return boundary(start) and boundary(end)
+
+
+def _find_word(text: str, word: str) -> bool:
+    """
+    判断 word 是否作为完整词出现在 text 中
+
+    关键词都是普通字面量，直接用C实现的 str.find 查找，命中后再校验词边界，
+    不必为每个关键词执行正则
+    """
+    idx = text.find(word)
+    while idx != -1:
+        if _is_word_boundary(text, idx, idx + len(word)):
+            return True
+        idx = text.find(word, idx + 1)
+    return False
+
+
+@dataclass(slots=True)
 class FilteredPaper:
     """筛选后的论文 - 包含分类和相关性信息"""
     paper_id: str
@@ -21,7 +87,7 @@ class FilteredPaper:
     summary: str
     published: str
     updated: str
-    categories: str
+    categories: Tuple[str, ...]
     pdf_url: str
     arxiv_url: str
     fetch_time: str
@@ -30,11 +96,27 @@ class FilteredPaper:
     relevance_score: float              # 相关性分数 0-1
     matched_keywords: List[str]         # 匹配的关键词
     topic_category: str                 # 论文主题分类
-    classification_details: Dict        # 分类详情
+    # 分类详情：(主题描述, 最高得分)；各主题完整得分不随每篇论文保存，需要时用 classify_paper 重新计算
+    classification_details: Optional[Tuple[str, float]]
     
     def to_dict(self) -> Dict:
-        """转换为字典"""
-        return asdict(self)
+        """转换为字典（列表浅拷贝，不做asdict的递归深拷贝）"""
+        return {
+            'paper_id': self.paper_id,
+            'title': self.title,
+            'authors': list(self.authors),
+            'summary': self.summary,
+            'published': self.published,
+            'updated': self.updated,
+            'categories': self.categories,
+            'pdf_url': self.pdf_url,
+            'arxiv_url': self.arxiv_url,
+            'fetch_time': self.fetch_time,
+            'relevance_score': self.relevance_score,
+            'matched_keywords': list(self.matched_keywords),
+            'topic_category': self.topic_category,
+            'classification_details': self.classification_details,
+        }
 
 
 class PaperClassifier:
@@ -159,35 +241,123 @@ class PaperClassifier:
         }
     }
     
+    # 关键词在类加载时统一转小写：主题 -> [(原关键词, 小写关键词)]
+    _TOPICS = {
+        topic: [(kw, kw.lower()) for kw in config.get('keywords', [])]
+        for topic, config in TOPIC_KEYWORDS.items()
+    }
+    
     def __init__(self):
         """初始化分类器"""
+        # 安装了pyahocorasick时，用所有关键词构建一个自动机，一次扫描找出全部匹配
+        self._automaton = None
+        if ahocorasick is not None:
+            owners = defaultdict(list)  # 小写关键词 -> [(主题, 原关键词)]
+            for topic, keywords in self._TOPICS.items():
+                for kw, lowered in keywords:
+                    owners[lowered].append((topic, kw))
+            self._automaton = ahocorasick.Automaton()
+            for word, entries in owners.items():
+                self._automaton.add_word(word, (len(word), entries))
+            self._automaton.make_automaton()
+        
+        # 批量打分用的主题参数（按 TOPIC_KEYWORDS 顺序）；主题名驻留，
+        # 分组/统计时以它为键的字典比较可直接按指针判等
+        self._topics = [sys.intern(topic) for topic in self.TOPIC_KEYWORDS]
+        self._topic_index = {topic: i for i, topic in enumerate(self._topics)}
+        if np is not None:
+            self._keyword_counts = np.array(
+                [len(c.get('keywords', [])) for c in self.TOPIC_KEYWORDS.values()], dtype=np.float64)
+            self._weights = np.array(
+                [c.get('weight', 1.0) for c in self.TOPIC_KEYWORDS.values()], dtype=np.float64)
         logger.info(f"论文分类器已初始化，包含{len(self.TOPIC_KEYWORDS)}个主题")
     
-    def classify_paper(self, paper: Dict) -> Tuple[str, Dict, float]:
+    def classify_paper(self, paper: Dict) -> Tuple[str, Dict, float, List[str]]:
         """
-        对单篇论文进行分类
+        对单篇论文进行分类，同一次扫描同时得到匹配的关键词
         
         Args:
             paper: 论文信息字典
         
         Returns:
-            (主要主题, 分类详情, 综合得分)
+            (主要主题, 分类详情, 综合得分, 匹配的关键词列表)
         """
-        title = paper.get('title', '').lower()
-        summary = paper.get('summary', '').lower()
+        return self.classify_papers([paper])[0]
+    
+    def classify_papers(self, papers: List[Dict]) -> List[Tuple[str, Dict, float, List[str]]]:
+        """
+        批量分类：逐篇匹配关键词后，安装了numpy时整批计算 (论文数 × 主题数) 得分矩阵
+        
+        Args:
+            papers: 论文信息字典列表
         
-        # 组合文本
-        full_text = f"{title}. {summary}"
+        Returns:
+            与输入顺序一致的 (主要主题, 分类详情, 综合得分, 匹配的关键词列表) 列表
+        """
+        hits_list = [self._match_keywords(self._prepare_text(paper)) for paper in papers]
+        
+        if np is not None and hits_list:
+            scores = self._score_matrix(hits_list)
+            score_rows = scores.tolist()
+            main_indices = scores.argmax(axis=1).tolist()
+        else:
+            score_rows, main_indices = [], []
+            for hits in hits_list:
+                row, main = self._score_row(hits)
+                score_rows.append(row)
+                main_indices.append(main)
+        
+        return [self._build_result(hits, row, main)
+                for hits, row, main in zip(hits_list, score_rows, main_indices)]
+    
+    def _score_row(self, hits: Dict[str, Set[str]]) -> Tuple[List[float], int]:
+        """
+        逐主题计算单篇论文的得分，同一循环中记录最高分主题（并列时取靠前的）
+        
+        未命中的主题直接记0分；得分已达上限1.0后，后面的主题不可能严格超过它，不再比较
+        """
+        row = []
+        best, best_score = 0, -1.0
+        for i, (topic, config) in enumerate(self.TOPIC_KEYWORDS.items()):
+            matched = hits.get(topic)
+            score = self._calculate_topic_score(len(matched), config) if matched else 0.0
+            row.append(score)
+            if best_score < 1.0 and score > best_score:
+                best, best_score = i, score
+        return row, best
+    
+    def _score_matrix(self, hits_list: List[Dict[str, Set[str]]]):
+        """
+        由各论文的匹配结果计算得分矩阵
         
-        # 计算每个主题的得分
-        topic_scores = {}
-        for topic, config in self.TOPIC_KEYWORDS.items():
-            score = self._calculate_topic_score(full_text, config)
-            topic_scores[topic] = score
+        得分 = min(匹配数 / 主题关键词数 * 权重, 1)，运算顺序与 _calculate_topic_score 相同
+        """
+        paper_idx, topic_idx, hit_counts = [], [], []
+        for i, hits in enumerate(hits_list):
+            for topic, keywords in hits.items():
+                paper_idx.append(i)
+                topic_idx.append(self._topic_index[topic])
+                hit_counts.append(len(keywords))
+        
+        if njit is not None:
+            return _aggregate_scores(
+                np.array(paper_idx, dtype=np.int32), np.array(topic_idx, dtype=np.int32),
+                np.array(hit_counts, dtype=np.float64), self._keyword_counts, self._weights,
+                len(hits_list), len(self._topics)
+            )
         
-        # 查找最高分主题
-        main_topic = max(topic_scores, key=topic_scores.get)
-        max_score = topic_scores[main_topic]
+        counts = np.zeros((len(hits_list), len(self._topics)), dtype=np.float64)
+        counts[paper_idx, topic_idx] = hit_counts
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.where(self._keyword_counts > 0, counts / self._keyword_counts * self._weights, 0.0)
+        return np.minimum(scores, 1.0)
+    
+    def _build_result(self, hits: Dict[str, Set[str]], row: List[float],
+                      main: int) -> Tuple[str, Dict, float, List[str]]:
+        """组装单篇论文的分类结果"""
+        topic_scores = dict(zip(self._topics, row))
+        main_topic = self._topics[main]
+        max_score = row[main]
         
         # 分类详情
         classification_details = {
@@ -197,14 +367,46 @@ class PaperClassifier:
             'description': self.TOPIC_KEYWORDS.get(main_topic, {}).get('description', '')
         }
         
-        return main_topic, classification_details, max_score
+        matched = set()
+        for keywords in hits.values():
+            matched.update(keywords)
+        
+        return main_topic, classification_details, max_score, list(matched)
+    
+    @staticmethod
+    def _prepare_text(paper: Dict) -> str:
+        """组合标题和摘要并整体转小写（只做一次转换和一次拼接）"""
+        return f"{paper.get('title', '')}. {paper.get('summary', '')}".lower()
+    
+    def _match_keywords(self, text: str) -> Dict[str, Set[str]]:
+        """
+        找出文本中（按词边界）出现的所有关键词
+        
+        Args:
+            text: 待分析文本（已转小写）
+        
+        Returns:
+            主题 -> 匹配到的关键词集合
+        """
+        hits: Dict[str, Set[str]] = defaultdict(set)
+        if self._automaton is not None:
+            for end, (length, entries) in self._automaton.iter(text):
+                if _is_word_boundary(text, end - length + 1, end + 1):
+                    for topic, kw in entries:
+                        hits[topic].add(kw)
+        else:
+            for topic, keywords in self._TOPICS.items():
+                for kw, lowered in keywords:
+                    if _find_word(text, lowered):
+                        hits[topic].add(kw)
+        return hits
     
-    def _calculate_topic_score(self, text: str, config: Dict) -> float:
+    def _calculate_topic_score(self, matched_count: int, config: Dict) -> float:
         """
-        计算文本对某个主题的匹配得分
+        计算某个主题的匹配得分
         
         Args:
-            text: 待分析文本
+            matched_count: 该主题匹配到的关键词数
             config: 主题配置
         
         Returns:
@@ -216,14 +418,6 @@ class PaperClassifier:
         if not keywords:
             return 0.0
         
-        # 统计匹配的关键词
-        matched_count = 0
-        for keyword in keywords:
-            # 使用词边界匹配，避免部分匹配
-            pattern = rf'\b{re.escape(keyword.lower())}\b'
-            if re.search(pattern, text):
-                matched_count += 1
-        
         # 计算得分：(匹配数 / 总关键词数) * 权重
         score = (matched_count / len(keywords)) * weight
         
@@ -240,34 +434,84 @@ class PaperClassifier:
         Returns:
             匹配的关键词列表
         """
-        title = paper.get('title', '').lower()
-        summary = paper.get('summary', '').lower()
-        full_text = f"{title}. {summary}"
+        matched = set()
+        for keywords in self._match_keywords(self._prepare_text(paper)).values():
+            matched.update(keywords)
         
-        matched = []
-        for topic, config in self.TOPIC_KEYWORDS.items():
-            for keyword in config.get('keywords', []):
-                pattern = rf'\b{re.escape(keyword.lower())}\b'
-                if re.search(pattern, full_text):
-                    matched.append(keyword)
-        
-        return list(set(matched))  # 去重
+        return list(matched)
+
+
+# 子进程内的分类器，由进程池的 initializer 创建一次
+_worker_classifier: Optional[PaperClassifier] = None
+
+
+def _init_worker():
+    global _worker_classifier
+    logging.getLogger(__name__).setLevel(logging.WARNING)
+    _worker_classifier = PaperClassifier()
+
+
+def _classify_chunk(papers: List[Dict]) -> List[Tuple[str, Dict, float, List[str]]]:
+    return _worker_classifier.classify_papers(papers)
 
 
 class PaperFilter:
     """论文筛选器 - 综合去重、分类、相关性评分"""
     
-    def __init__(self, min_relevance_score: float = 0.0):
+    def __init__(self, min_relevance_score: float = 0.0,
+                 parallel_threshold: int = 2000, chunk_size: int = 256,
+                 max_workers: Optional[int] = None,
+                 cache: Optional[ClassificationCache] = None):
         """
         初始化筛选器
         
         Args:
             min_relevance_score: 最低相关性分数（0-1）
+            parallel_threshold: 论文数超过此值时用多进程分类（进程启动有固定开销，小批量不值得）
+            chunk_size: 多进程分类时每个任务包含的论文数
+            max_workers: 进程数，默认为CPU核数
+            cache: 分类结果缓存，命中的论文跳过分类
         """
         self.classifier = PaperClassifier()
+        self.cache = cache
         self.min_relevance_score = min_relevance_score
+        self.parallel_threshold = parallel_threshold
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
         logger.info(f"论文筛选器已初始化，最低相关性分数: {min_relevance_score}")
     
+    def _classify(self, papers: List[Dict]) -> List[Tuple[str, Dict, float, List[str]]]:
+        """分类整批论文，设置了缓存时只分类未命中的论文"""
+        if self.cache is None:
+            return self._classify_uncached(papers)
+        
+        results = self.cache.get_many(papers)
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            todo = [papers[i] for i in missing]
+            computed = self._classify_uncached(todo)
+            self.cache.put_many(todo, computed)
+            for i, result in zip(missing, computed):
+                results[i] = result
+        logger.info(f"分类缓存命中 {len(papers) - len(missing)}/{len(papers)} 篇")
+        return results
+    
+    def _classify_uncached(self, papers: List[Dict]) -> List[Tuple[str, Dict, float, List[str]]]:
+        """分类整批论文，数量较多且有多个CPU时分块交给进程池"""
+        workers = self.max_workers or os.cpu_count() or 1
+        if len(papers) <= self.parallel_threshold or workers < 2:
+            return self.classifier.classify_papers(papers)
+        
+        chunks = [papers[i:i + self.chunk_size] for i in range(0, len(papers), self.chunk_size)]
+        logger.info(f"多进程分类: {len(papers)} 篇论文, {len(chunks)} 块, {workers} 个进程")
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for chunk_results in pool.map(_classify_chunk, chunks):
+                # 子进程返回的字符串经过反序列化，重新驻留主题名
+                results.extend((sys.intern(topic), details, score, matched)
+                               for topic, details, score, matched in chunk_results)
+        return results
+    
     def filter_papers(self, papers: List[Dict]) -> Tuple[List[FilteredPaper], List[Dict]]:
         """
         对论文列表进行筛选
@@ -281,9 +525,10 @@ class PaperFilter:
         filtered_papers = []
         rejected_papers = []
         
-        for paper in papers:
-            # 进行分类和相关性评分
-            main_topic, details, score = self.classifier.classify_paper(paper)
+        # 整批分类和相关性评分
+        results = self._classify(papers)
+        
+        for paper, (main_topic, details, score, matched_keywords) in zip(papers, results):
             
             # 检查是否满足最低相关性要求
             if score < self.min_relevance_score:
@@ -293,9 +538,6 @@ class PaperFilter:
                 })
                 continue
             
-            # 获取匹配的关键词
-            matched_keywords = self.classifier.get_matched_keywords(paper)
-            
             # 创建筛选后的论文对象
             filtered_paper = FilteredPaper(
                 paper_id=paper.get('paper_id', ''),
@@ -304,7 +546,7 @@ class PaperFilter:
                 summary=paper.get('summary', ''),
                 published=paper.get('published', ''),
                 updated=paper.get('updated', ''),
-                categories=paper.get('categories', ''),
+                categories=tuple(paper.get('categories', ())),
                 pdf_url=paper.get('pdf_url', ''),
                 arxiv_url=paper.get('arxiv_url', ''),
                 fetch_time=paper.get('fetch_time', ''),
@@ -312,7 +554,7 @@ class PaperFilter:
                 relevance_score=score,
                 matched_keywords=matched_keywords,
                 topic_category=main_topic,
-                classification_details=details
+                classification_details=(details['description'], details['max_score'])
             )
             
             filtered_papers.append(filtered_paper)
@@ -320,13 +562,15 @@ class PaperFilter:
         logger.info(f"筛选完成: 通过{len(filtered_papers)}篇, 被过滤{len(rejected_papers)}篇")
         return filtered_papers, rejected_papers
     
-    def filter_and_rank(self, papers: List[Dict], sort_by: str = 'relevance_score') ->  Tuple[List[FilteredPaper], List[Dict]]:
+    def filter_and_rank(self, papers: List[Dict], sort_by: str = 'relevance_score',
+                        top_k: Optional[int] = None) ->  Tuple[List[FilteredPaper], List[Dict]]:
         """
         对论文进行筛选和排序
         
         Args:
             papers: 论文列表
             sort_by: 排序方式 ('relevance_score'|'published'|'topic_category')
+            top_k: 只保留排序后的前k篇，为空时返回全部
         
         Returns:
             排序后的筛选论文列表
@@ -334,6 +578,9 @@ class PaperFilter:
         filtered_papers, rejected = self.filter_papers(papers)
         
         # 排序
+        if sort_by == 'relevance_score' and top_k:
+            # 只需要前k篇时用堆选取，不对全部论文排序（结果与完整排序后截取一致）
+            return heapq.nlargest(top_k, filtered_papers, key=lambda p: p.relevance_score), rejected
         if sort_by == 'relevance_score':
             filtered_papers.sort(key=lambda p: p.relevance_score, reverse=True)
         elif sort_by == 'published':
@@ -341,6 +588,8 @@ class PaperFilter:
         elif sort_by == 'topic_category':
             filtered_papers.sort(key=lambda p: p.topic_category)
         
+        if top_k:
+            filtered_papers = filtered_papers[:top_k]
         return filtered_papers, rejected
     
     def group_by_topic(self, papers: List[FilteredPaper]) -> Dict[str, List[FilteredPaper]]:
@@ -371,34 +620,25 @@ class PaperFilter:
             papers: 筛选后的论文列表
         
         Returns:
-            统计信息字典
+            统计信息字典（keywords_frequency 为 Counter，可直接 most_common）
         """
         if not papers:
             return {
                 'total': 0,
                 'avg_relevance_score': 0.0,
                 'topics': {},
-                'keywords_frequency': {}
+                'keywords_frequency': Counter()
             }
         
         # 按主题统计
-        topics = {}
-        keywords_freq = {}
-        total_score = 0.0
-        
-        for paper in papers:
-            topic = paper.topic_category
-            topics[topic] = topics.get(topic, 0) + 1
-            
-            total_score += paper.relevance_score
-            
-            for keyword in paper.matched_keywords:
-                keywords_freq[keyword] = keywords_freq.get(keyword, 0) + 1
+        topics = Counter(paper.topic_category for paper in papers)
+        keywords_freq = Counter(kw for paper in papers for kw in paper.matched_keywords)
+        total_score = sum(paper.relevance_score for paper in papers)
         
         return {
             'total': len(papers),
             'avg_relevance_score': total_score / len(papers),
-            'topics': topics,
+            'topics': dict(topics),
             'keywords_frequency': keywords_freq
         }
 
@@ -437,7 +677,7 @@ def main():
     print(f"  总数: {stats['total']}")
     print(f"  平均相关性分数: {stats['avg_relevance_score']:.2f}")
     print(f"  按主题分布: {stats['topics']}")
-    print(f"  高频关键词: {dict(sorted(stats['keywords_frequency'].items(), key=lambda x: x[1], reverse=True)[:10])}\n")
+    print(f"  高频关键词: {dict(stats['keywords_frequency'].most_common(10))}\n")
     
     # 显示前5篇高相关性论文
     print("📚 相关性最高的5篇论文:")
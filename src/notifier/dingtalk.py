@@ -8,6 +8,8 @@ import logging
 import requests
 from datetime import datetime
 from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +30,17 @@ class DingTalkNotifier:
         if not self.webhook_url and self.enabled:
             logger.warning("未配置 DINGTALK_WEBHOOK，钉钉通知将被禁用")
             self.enabled = False
+        
+        # 复用连接，多条通知之间不再重复TCP/TLS握手；
+        # 只重试连接失败，避免读超时后重发造成重复消息
+        self._session = requests.Session()
+        self._session.headers.update({"Content-Type": "application/json"})
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=2,
+            max_retries=Retry(total=2, connect=2, read=0, backoff_factor=0.3)
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
     
     def send_text(self, content: str, at_all: bool = False) -> bool:
         """
@@ -54,12 +67,7 @@ class DingTalkNotifier:
                 }
             }
             
-            response = requests.post(
-                self.webhook_url,
-                json=data,
-                timeout=10,
-                headers={"Content-Type": "application/json"}
-            )
+            response = self._session.post(self.webhook_url, json=data, timeout=10)
             
             result = response.json()
             if result.get("errcode") == 0:
@@ -96,12 +104,7 @@ class DingTalkNotifier:
                 }
             }
             
-            response = requests.post(
-                self.webhook_url,
-                json=data,
-                timeout=10,
-                headers={"Content-Type": "application/json"}
-            )
+            response = self._session.post(self.webhook_url, json=data, timeout=10)
             
             result = response.json()
             if result.get("errcode") == 0:
@@ -181,7 +184,13 @@ class DingTalkNotifier:
         return self.send_text(content, at_all=False)
 
 
+_notifier: Optional[DingTalkNotifier] = None
+
+
 # 便捷函数
 def get_notifier() -> DingTalkNotifier:
-    """获取钉钉通知器实例"""
-    return DingTalkNotifier()
+    """获取钉钉通知器实例（进程内共享，连接在多次任务之间复用）"""
+    global _notifier
+    if _notifier is None:
+        _notifier = DingTalkNotifier()
+    return _notifier
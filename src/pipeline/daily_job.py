@@ -5,20 +5,59 @@ DailyJob - 论文日报编排任务
 
 import os
 import asyncio
+import json
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+from operator import itemgetter
 from typing import Dict, Any, List, Optional
 
 from src.config import ConfigManager
 from src.crawler import ArxivCrawler
-from src.filter import PaperFilter, Deduplicator
+from src.filter import PaperFilter, PaperClassifier, Deduplicator, ClassificationCache
 from src.extractor import IdeaExtractor, ExtractedIdea
 from src.evaluator import PaperEvaluator  # 🆕 导入质量评估器
 from src.sender import EmailFormatter, EmailSender
 
+try:
+    import orjson
+except ImportError:  # 未安装orjson时退回标准库
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _write_html(path: str, html: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+
+def _write_report(path: str, stats: Dict[str, Any]):
+    with open(path, 'wb') as f:
+        if orjson is not None:
+            f.write(orjson.dumps(stats, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            f.write(json.dumps(stats, ensure_ascii=False, indent=2).encode('utf-8'))
+
+
+# 从筛选阶段带到邮件中的字段
+_META_KEYS = ('topic_category', 'relevance_score', 'matched_keywords')
+
+# 合并时使用的只读空值（所有论文共享，不要原地修改）
+_NO_ITEMS = ()
+_EMPTY_QUALITY: Dict[str, Any] = {
+    'quality_score': None,
+    'quality_level': None,
+    'quality_reasoning': None,
+    'innovation_score': None,
+    'practicality_score': None,
+    'technical_depth_score': None,
+    'experimental_rigor_score': None,
+    'impact_potential_score': None,
+    'strengths': _NO_ITEMS,
+    'weaknesses': _NO_ITEMS,
+}
+
+
 class DailyJob:
     """论文日报编排任务"""
 
@@ -30,23 +69,27 @@ class DailyJob:
     def _merge_meta(self, metas: List[Dict[str, Any]], ideas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """将筛选阶段元数据合并进AI总结结果，保留 topic_category / relevance_score / matched_keywords 等"""
         meta_map = {m.get("paper_id"): m for m in metas}
-        merged = []
+        # 下游只读取这几个筛选字段，直接补进总结结果字典，不再为每篇论文复制整份元数据
         for idea in ideas:
-            pid = idea.get("paper_id")
-            base = meta_map.get(pid, {})
-            merged.append({**base, **idea})
-        return merged
+            base = meta_map.get(idea.get("paper_id"))
+            if base:
+                for key in _META_KEYS:
+                    if key in base:
+                        idea.setdefault(key, base[key])
+        return ideas
     
     def _merge_quality(self, papers: List[Dict[str, Any]], qualities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """🆕 将质量评估结果合并到论文数据中"""
         quality_map = {q.get("paper_id"): q for q in qualities}
         merged = []
         for paper in papers:
-            pid = paper.get("paper_id")
-            quality_data = quality_map.get(pid, {})
+            quality_data = quality_map.get(paper.get("paper_id"))
+            if not quality_data:
+                # 没有评估结果时各字段都是空值，直接合并预先构造好的空字段
+                merged.append(paper | _EMPTY_QUALITY)
+                continue
             # 提取关键评估字段
-            paper_with_quality = {
-                **paper,
+            merged.append(paper | {
                 'quality_score': quality_data.get('overall_score'),
                 'quality_level': quality_data.get('quality_level'),
                 'quality_reasoning': quality_data.get('reasoning'),
@@ -55,19 +98,21 @@ class DailyJob:
                 'technical_depth_score': quality_data.get('technical_depth_score'),
                 'experimental_rigor_score': quality_data.get('experimental_rigor_score'),
                 'impact_potential_score': quality_data.get('impact_potential_score'),
-                'strengths': quality_data.get('strengths', []),
-                'weaknesses': quality_data.get('weaknesses', [])
-            }
-            merged.append(paper_with_quality)
+                'strengths': quality_data.get('strengths', _NO_ITEMS),
+                'weaknesses': quality_data.get('weaknesses', _NO_ITEMS)
+            })
         return merged
 
-    async def _extract_async(self, filtered_dict: List[Dict[str, Any]], batch_size: int) -> List[Dict[str, Any]]:
+    async def _extract_async(self, filtered_dict: List[Dict[str, Any]], batch_size: int,
+                             deduplicator: Optional[Deduplicator] = None) -> List[Dict[str, Any]]:
         """内部异步AI总结流程"""
         deepseek_config = self.cm.get_deepseek_config()
         ideas: List[ExtractedIdea] = []
         try:
-            extractor = IdeaExtractor(deepseek_config)
-            extracted_ideas, stats = await extractor.extract_batch_papers(filtered_dict, batch_size=batch_size)
+            extractor = IdeaExtractor(deepseek_config, deduplicator=deduplicator)
+            extracted_ideas, stats = await extractor.extract_batch_papers(
+                filtered_dict, batch_size=batch_size, close_session=True
+            )
             logger.info(f"AI总结完成: 成功{stats['success']} 备选{stats['fallback']} 失败{stats['error']} 耗时{stats['processing_time']:.2f}s")
             ideas = extracted_ideas
         except Exception as e:
@@ -83,7 +128,7 @@ class DailyJob:
                     key_points=None,
                     extraction_status='fallback',
                     extraction_error='DeepSeek unavailable',
-                    extraction_time=datetime.utcnow().isoformat(),
+                    extraction_time=datetime.now(timezone.utc).isoformat(),
                     published=p.get('published', ''),
                     arxiv_url=p.get('arxiv_url', '')
                 ))
@@ -96,11 +141,28 @@ class DailyJob:
             evaluator = PaperEvaluator(deepseek_config)
             qualities, stats = await evaluator.evaluate_batch_papers(papers, batch_size=batch_size)
             logger.info(f"质量评估完成: 成功{stats['success']} 备选{stats['fallback']} 失败{stats['error']} 耗时{stats['processing_time']:.2f}s")
-            return [q.to_dict() for q in qualities]
+            return qualities.to_dicts()
         except Exception as e:
             logger.warning(f"质量评估不可用: {e}")
             return []
 
+    async def _pipeline_async(self, filtered_dict: List[Dict[str, Any]], batch_size: int,
+                              deduplicator: Optional[Deduplicator] = None):
+        """
+        在同一事件循环中并发执行AI总结与质量评估
+
+        评估只用到标题/摘要/相关性，不依赖AI总结，无需等待总结完成，
+        两者从一开始就同时进行，API等待时间相互重叠
+
+        Returns:
+            (AI总结结果列表, 质量评估结果列表)
+        """
+        ideas_dict, quality_dict = await asyncio.gather(
+            self._extract_async(filtered_dict, batch_size=batch_size, deduplicator=deduplicator),
+            self._evaluate_async(filtered_dict, batch_size=batch_size)
+        )
+        return ideas_dict, quality_dict
+
     def run(self,
             days_back: int = 3,
             top_n: int = 10,
@@ -108,6 +170,23 @@ class DailyJob:
             only_new: bool = True,
             send_email: bool = True,
             html_out: Optional[str] = None) -> Dict[str, Any]:
+        """执行一次日报任务（同步入口，参数与返回值同 run_async）"""
+        return asyncio.run(self.run_async(
+            days_back=days_back,
+            top_n=top_n,
+            summary_batch_size=summary_batch_size,
+            only_new=only_new,
+            send_email=send_email,
+            html_out=html_out
+        ))
+
+    async def run_async(self,
+                        days_back: int = 3,
+                        top_n: int = 10,
+                        summary_batch_size: int = 3,
+                        only_new: bool = True,
+                        send_email: bool = True,
+                        html_out: Optional[str] = None) -> Dict[str, Any]:
         """
         执行一次日报任务
 
@@ -122,7 +201,9 @@ class DailyJob:
         Returns:
             统计信息字典
         """
-        start = datetime.utcnow()
+        # 整个流程共用开始时间：文件名、邮件主题与邮件正文中的日期保持一致，跨午夜运行时也不会错开
+        start = datetime.now(timezone.utc)
+        date_tag = start.strftime('%Y%m%d')
         stats: Dict[str, Any] = {
             "start_at": start.isoformat(),
             "days_back": days_back,
@@ -131,16 +212,20 @@ class DailyJob:
             "send_email": send_email
         }
 
-        # 1) 爬取
+        # 1) 爬取；同时在另一个线程加载去重缓存，文件读取与网络等待重叠
+        # API方式直接在事件循环中异步请求Atom接口；OAI-PMH方式仍在线程中同步收割
         arxiv_config = self.cm.get_arxiv_config()
         crawler = ArxivCrawler(arxiv_config)
-        papers = crawler.fetch_papers(days_back=days_back)
+        if crawler.fetch_mode == 'oai':
+            fetch = asyncio.to_thread(crawler.fetch_papers, days_back=days_back)
+        else:
+            fetch = crawler.fetch_papers_async(days_back=days_back)
+        papers, dedup = await asyncio.gather(fetch, asyncio.to_thread(Deduplicator))
         papers_dict = [p.to_dict() for p in papers]
         stats["fetched"] = len(papers_dict)
         logger.info(f"爬取完成: {len(papers_dict)} 篇")
 
         # 2) 去重（持久缓存）
-        dedup = Deduplicator()
         unique_papers, duplicate_papers = dedup.deduplicate_papers(papers_dict)
         if only_new:
             candidate = unique_papers
@@ -152,74 +237,89 @@ class DailyJob:
         logger.info(f"去重完成: 新增{len(unique_papers)} 重复{len(duplicate_papers)} 用于筛选{len(candidate)}")
 
         # 3) 筛选与排序（按相关性）
-        filter_obj = PaperFilter(min_relevance_score=0.0)
-        filtered_papers, _ = filter_obj.filter_and_rank(candidate, sort_by='relevance_score')
+        # 分类结果按论文ID跨运行缓存，only_new=False 时重复出现的论文不再重新分类
+        classification_cache = ClassificationCache(PaperClassifier.TOPIC_KEYWORDS)
+        try:
+            filter_obj = PaperFilter(min_relevance_score=0.0, cache=classification_cache)
+            filtered_papers, _ = filter_obj.filter_and_rank(candidate, sort_by='relevance_score',
+                                                            top_k=top_n or None)
+        finally:
+            classification_cache.close()
+        # 只把最终选用的前top_n篇转换为字典
         filtered_dict = [p.to_dict() for p in filtered_papers]
-        if top_n and len(filtered_dict) > top_n:
-            filtered_dict = filtered_dict[:top_n]
         stats["filtered"] = len(filtered_dict)
         logger.info(f"筛选完成: 选取{len(filtered_dict)} 篇用于AI总结")
 
-        # 4) AI 总结（异步）
-        ideas_dict: List[Dict[str, Any]] = asyncio.run(self._extract_async(filtered_dict, batch_size=summary_batch_size))
+        if not filtered_dict:
+            # 没有新论文（如周末无更新）：跳过AI总结、邮件生成与发送，只写报告
+            stats["skipped_reason"] = "no_new_papers"
+            logger.info("没有需要处理的论文，跳过后续步骤")
+            return await self._finalize(stats, date_tag)
+
+        # 4) AI 总结 + 🆕 质量评估（异步并发）
+        ideas_dict, quality_dict = await self._pipeline_async(filtered_dict, summary_batch_size, dedup)
         stats["summarized"] = len(ideas_dict)
+        stats["evaluated"] = len(quality_dict)
 
         # 5) 合并元数据，确保主题/相关性在邮件中显示
         merged_papers = self._merge_meta(filtered_dict, ideas_dict)
         
-        # 🆕 6) 质量评估（异步，使用相同的batch_size）
-        quality_dict: List[Dict[str, Any]] = asyncio.run(self._evaluate_async(merged_papers, batch_size=summary_batch_size))
-        stats["evaluated"] = len(quality_dict)
-        
-        # 🆕 7) 合并质量评估结果
+        # 🆕 6) 合并质量评估结果
         final_papers = self._merge_quality(merged_papers, quality_dict)
         
-        # 🆕 8) 按质量评分重新排序（质量评分优先，相关性次之）
-        final_papers = sorted(
-            final_papers,
-            key=lambda p: (
-                p.get('quality_score', 0) * 0.7 +  # 质量评分权重70%
-                p.get('relevance_score', 0) * 10 * 0.3  # 相关性权重30%
-            ),
-            reverse=True
-        )
+        # 🆕 7) 按质量评分重新排序（质量评分优先，相关性次之）
+        # 先算好每篇的排序分再排序（键只计算一次）；缺失的评分按0计
+        scored = [
+            ((p.get('quality_score') or 0) * 0.7 +  # 质量评分权重70%
+             (p.get('relevance_score') or 0) * 10 * 0.3,  # 相关性权重30%
+             p)
+            for p in final_papers
+        ]
+        scored.sort(key=itemgetter(0), reverse=True)
+        final_papers = [p for _, p in scored]
 
-        # 9) 格式化邮件
+        # 8) 格式化邮件
+        # 论文已按上一步的综合分排好序，主题统计与平均相关性只算一次，HTML与纯文本共用
         formatter = EmailFormatter()
-        html, email_stats = formatter.format_papers_to_html(final_papers)
-        plain = formatter.generate_plain_text_email(final_papers)
+        topic_stats, avg_relevance = formatter.summarize(final_papers)
+        html, email_stats = formatter.format_papers_to_html(final_papers, topic_stats, avg_relevance, now=start)
+        plain = formatter.generate_plain_text_email(final_papers, topic_stats, avg_relevance, now=start)
         stats["email_stats"] = email_stats
 
-        # 10) 发送邮件（可选）
+        # 9) 发送邮件（可选）；HTML文件在线程中同时写出，磁盘写入不阻塞事件循环
+        if not html_out:
+            html_out = os.path.join(self.output_dir, f"daily_{date_tag}.html")
+        html_task = asyncio.create_task(asyncio.to_thread(_write_html, html_out, html))
+
         sent_stats = None
         if send_email:
             email_config = self.cm.get_email_config()
             recipients = email_config.get('recipients', [])
             if recipients and email_config.get('sender_email'):
                 sender = EmailSender(email_config)
-                subject = f"【Arxiv论文日报】{datetime.utcnow().strftime('%Y-%m-%d')}"
+                subject = f"【Arxiv论文日报】{start.strftime('%Y-%m-%d')}"
                 # 🔧 修正：使用正确的方法名 send_batch_emails
-                sent_stats = sender.send_batch_emails(recipients, subject, html, plain)
+                sent_stats = await sender.send_batch_emails_async(recipients, subject, html, plain)
                 stats["send_result"] = sent_stats
                 logger.info(f"邮件发送完成: {sent_stats}")
             else:
                 logger.warning("邮件配置不完整，跳过发送")
 
-        # 11) 落盘
-        if not html_out:
-            html_out = os.path.join(self.output_dir, f"daily_{datetime.utcnow().strftime('%Y%m%d')}.html")
-        with open(html_out, 'w', encoding='utf-8') as f:
-            f.write(html)
+        # 10) 落盘（报告包含发送结果，等发送结束后再写）
+        await html_task
         logger.info(f"HTML已保存: {html_out}")
+        return await self._finalize(stats, date_tag, html_out)
 
-        report_path = os.path.join(self.output_dir, f"report_{datetime.utcnow().strftime('%Y%m%d')}.json")
-        import json
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(stats, f, ensure_ascii=False, indent=2)
+    async def _finalize(self, stats: Dict[str, Any], date_tag: str,
+                        html_out: Optional[str] = None) -> Dict[str, Any]:
+        """写出JSON报告并补充输出路径与结束时间"""
+        report_path = os.path.join(self.output_dir, f"report_{date_tag}.json")
+        await asyncio.to_thread(_write_report, report_path, stats)
         logger.info(f"报告已保存: {report_path}")
 
-        stats["html_out"] = html_out
+        if html_out:
+            stats["html_out"] = html_out
         stats["report_out"] = report_path
-        stats["end_at"] = datetime.utcnow().isoformat()
+        stats["end_at"] = datetime.now(timezone.utc).isoformat()
         
         return stats
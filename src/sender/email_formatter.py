@@ -4,10 +4,11 @@
 """
 
 import logging
-from typing import List, Dict, Any, Tuple
-from datetime import datetime
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timezone
 
-from .email_templates import EmailTemplate
+from .email_templates import EmailTemplate, format_date
 
 logger = logging.getLogger(__name__)
 
@@ -43,101 +44,130 @@ class EmailFormatter:
         Returns:
             主题统计字典
         """
-        stats = {}
+        return dict(Counter(paper.get('topic_category', 'unknown') for paper in papers))
+    
+    @staticmethod
+    def summarize(papers: List[Dict[str, Any]]) -> Tuple[Dict[str, int], float]:
+        """
+        一次遍历同时得到主题统计和平均相关性，供HTML与纯文本共用
+        
+        Args:
+            papers: 论文列表
+        
+        Returns:
+            (主题统计字典, 平均相关性分数)
+        """
+        topic_stats: Dict[str, int] = {}
+        total = 0.0
         for paper in papers:
             topic = paper.get('topic_category', 'unknown')
-            stats[topic] = stats.get(topic, 0) + 1
-        return stats
+            topic_stats[topic] = topic_stats.get(topic, 0) + 1
+            total += paper.get('relevance_score', 0)
+        return topic_stats, (total / len(papers) if papers else 0)
     
-    def format_papers_to_html(self, papers: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    def format_papers_to_html(self, papers: List[Dict[str, Any]],
+                              topic_stats: Optional[Dict[str, int]] = None,
+                              avg_relevance: Optional[float] = None,
+                              now: Optional[datetime] = None) -> Tuple[str, Dict[str, Any]]:
         """
         将论文列表格式化为HTML邮件内容
         
         Args:
-            papers: 论文列表
+            papers: 论文列表（按展示顺序排好，需要按相关性排序时先调用 sort_papers_by_relevance）
+            topic_stats: 预先算好的主题统计，为空时由 summarize 计算
+            avg_relevance: 预先算好的平均相关性
+            now: 生成时间（UTC），为空时取当前时间
         
         Returns:
             (HTML内容, 统计信息)
         """
-        # 按相关性排序
-        sorted_papers = self.sort_papers_by_relevance(papers)
+        if topic_stats is None or avg_relevance is None:
+            topic_stats, avg_relevance = self.summarize(papers)
         
-        # 获取统计信息
-        topic_stats = self.get_topic_statistics(sorted_papers)
+        now = now or datetime.now(timezone.utc)
         
-        logger.info(f"开始格式化 {len(sorted_papers)} 篇论文为HTML邮件")
+        logger.info(f"开始格式化 {len(papers)} 篇论文为HTML邮件")
         
         # 生成HTML
-        html = EmailTemplate.generate_email_html(sorted_papers, topic_stats)
+        html = EmailTemplate.generate_email_html(papers, topic_stats, now)
         
         stats = {
-            'total_papers': len(sorted_papers),
+            'total_papers': len(papers),
             'topic_stats': topic_stats,
-            'avg_relevance_score': sum(p.get('relevance_score', 0) for p in sorted_papers) / len(sorted_papers) if sorted_papers else 0,
-            'generated_at': datetime.utcnow().isoformat()
+            'avg_relevance_score': avg_relevance,
+            'generated_at': now.isoformat()
         }
         
         logger.info(f"HTML邮件生成完成，统计: {stats}")
         
         return html, stats
     
-    def generate_plain_text_email(self, papers: List[Dict[str, Any]]) -> str:
+    def generate_plain_text_email(self, papers: List[Dict[str, Any]],
+                                  topic_stats: Optional[Dict[str, int]] = None,
+                                  avg_relevance: Optional[float] = None,
+                                  now: Optional[datetime] = None) -> str:
         """
         生成纯文本邮件（备选方案）
         
         Args:
-            papers: 论文列表
+            papers: 论文列表（按展示顺序排好）
+            topic_stats: 预先算好的主题统计，为空时由 summarize 计算
+            avg_relevance: 预先算好的平均相关性
+            now: 生成时间（UTC），为空时取当前时间
         
         Returns:
             纯文本邮件内容
         """
-        sorted_papers = self.sort_papers_by_relevance(papers)
+        if topic_stats is None or avg_relevance is None:
+            topic_stats, avg_relevance = self.summarize(papers)
+        now = now or datetime.now(timezone.utc)
         
-        text = f"""
+        # 各段先放入列表，最后一次性拼接，避免逐篇 += 反复复制
+        parts = [f"""
 {'='*80}
                     📚 Arxiv论文日报
-                    {datetime.utcnow().strftime('%Y年%m月%d日')}
+                    {format_date(now.date())}
 {'='*80}
 
 📊 统计信息
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-总论文数: {len(sorted_papers)} 篇
-平均相关性: {sum(p.get('relevance_score', 0) for p in sorted_papers) / len(sorted_papers) if sorted_papers else 0:.1%}
+总论文数: {len(papers)} 篇
+平均相关性: {avg_relevance:.1%}
 
-"""
+"""]
         
         # 主题统计
-        topic_stats = self.get_topic_statistics(sorted_papers)
-        text += "主题分布: " + ", ".join([f"{topic}: {count}篇" for topic, count in sorted(topic_stats.items(), key=lambda x: x[1], reverse=True)]) + "\n\n"
+        parts.append("主题分布: " + ", ".join([f"{topic}: {count}篇" for topic, count in sorted(topic_stats.items(), key=lambda x: x[1], reverse=True)]) + "\n\n")
         
         # 论文列表
-        text += f"{'='*80}\n论文列表\n{'='*80}\n\n"
+        parts.append(f"{'='*80}\n论文列表\n{'='*80}\n\n")
         
-        for i, paper in enumerate(sorted_papers, 1):
-            text += f"""
+        for i, paper in enumerate(papers, 1):
+            get = paper.get
+            parts.append(f"""
 【论文 {i}】
 ────────────────────────────────────────────────────────────────────────────
-标题: {paper.get('title', '未知')}
-作者: {', '.join(paper.get('authors', [])[:3])}
-发布: {paper.get('published', '')[:10]}
-主题: {paper.get('topic_category', 'unknown')}
-相关性: {paper.get('relevance_score', 0):.1%}
+标题: {get('title', '未知')}
+作者: {', '.join(get('authors', [])[:3])}
+发布: {get('published', '')[:10]}
+主题: {get('topic_category', 'unknown')}
+相关性: {get('relevance_score', 0):.1%}
 
 🤖 AI总结:
-{paper.get('ai_summary', '无')}
+{get('ai_summary', '无')}
 
-🔗 链接: {paper.get('arxiv_url', '#')}
+🔗 链接: {get('arxiv_url', '#')}
 
-"""
+""")
         
-        text += f"""
+        parts.append(f"""
 {'='*80}
 此邮件由 Arxiv Mailbot 自动生成
 © 2025 Arxiv Mailbot. 自动化论文推荐系统
 {'='*80}
-"""
+""")
         
-        return text
+        return ''.join(parts)
 
 
 def test_email_formatter():
@@ -167,6 +197,7 @@ def test_email_formatter():
     
     # 测试格式化
     formatter = EmailFormatter()
+    filtered_dict = formatter.sort_papers_by_relevance(filtered_dict)
     html, stats = formatter.format_papers_to_html(filtered_dict)
     
     print("✅ 邮件HTML格式化成功")
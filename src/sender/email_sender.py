@@ -3,16 +3,94 @@
 负责发送邮件到收件人
 """
 
+import asyncio
+import io
 import smtplib
+import socket
 import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.charset import Charset, QP
 from email.header import Header
+from email.generator import BytesGenerator
+import random
 import time
 
+try:
+    import aiosmtplib
+except ImportError:  # 未安装aiosmtplib时异步批量发送退回线程中的同步实现
+    aiosmtplib = None
+
 logger = logging.getLogger(__name__)
 
+# 可重试的临时性错误：连接断开/被重置、连接失败、超时；其余错误（DNS解析失败、证书错误、
+# 收件人被拒等）重试也不会成功，立即返回
+_RETRIABLE = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+_DISCONNECTED = (smtplib.SMTPServerDisconnected,)
+_SMTP_ERRORS = (smtplib.SMTPException,)
+if aiosmtplib is not None:
+    _RETRIABLE += (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError,
+                   aiosmtplib.SMTPTimeoutError)
+    _DISCONNECTED += (aiosmtplib.SMTPServerDisconnected,)
+    _SMTP_ERRORS += (aiosmtplib.SMTPException,)
+
+# 正文的quoted-printable编码：以ASCII为主的内容几乎不膨胀（base64固定膨胀约1/3）
+_UTF8_QP = Charset('utf-8')
+_UTF8_QP.body_encoding = QP
+
+_BACKOFF_BASE = 1.0
+_BACKOFF_CAP = 30.0
+
+
+def _is_retriable(exc: BaseException) -> bool:
+    """判断发送错误是否值得重试（服务器返回的4xx临时错误也重试）"""
+    if isinstance(exc, _RETRIABLE):
+        return True
+    code = getattr(exc, 'smtp_code', None) or getattr(exc, 'code', None)
+    return isinstance(code, int) and 400 <= code < 500
+
+
+def _backoff(attempt: int) -> float:
+    """第attempt次失败后的等待秒数：指数增长、封顶，乘以0.5~1.5的随机抖动"""
+    return min(_BACKOFF_CAP, _BACKOFF_BASE * 2 ** (attempt - 1)) * (0.5 + random.random())
+
+
+def _text_part(content: str, subtype: str) -> MIMEText:
+    """
+    构造正文部分，在base64与quoted-printable中选编码后更短的一种
+
+    英文/HTML标记为主时QP更短；中文较多时每个非ASCII字节在QP中占3字节，base64反而更短
+    """
+    b64 = MIMEText(content, subtype, 'utf-8')
+    qp = MIMEText(content, subtype, _UTF8_QP)
+    return qp if len(qp.get_payload()) < len(b64.get_payload()) else b64
+
+
+def _serialize_message(msg: MIMEMultipart) -> bytes:
+    """与 send_message 相同的方式将消息序列化为CRLF换行的字节串"""
+    buf = io.BytesIO()
+    BytesGenerator(buf).flatten(msg, linesep='\r\n')
+    return buf.getvalue()
+
+
+def _with_recipient(payload: bytes, recipient: str) -> bytes:
+    """在已序列化的消息前加上收件人头"""
+    return b'To: ' + recipient.encode('utf-8') + b'\r\n' + payload
+
+
+def _describe_error(exc: BaseException) -> str:
+    """生成发送失败的说明文字"""
+    if isinstance(exc, _DISCONNECTED):
+        # 某些服务商在DATA后断开，实际已投递。无法准确判断已投递与否，这里按失败处理。
+        return f"SMTP连接断开: {str(exc)}"
+    if isinstance(exc, _SMTP_ERRORS):
+        return f"SMTP错误: {str(exc)}"
+    return f"发送邮件失败: {str(exc)}"
+
 
 class EmailSender:
     """邮件发送器"""
@@ -31,6 +109,9 @@ class EmailSender:
                 - use_ssl: 是否使用SSL（默认当端口为465时开启）
                 - timeout: 连接超时（秒）
                 - max_retries: 默认重试次数（整型，可选，默认=1）
+                - messages_per_connection: 批量发送时每个连接最多发送的邮件数，超过后重新连接（默认100）
+                - pool_size: 批量发送时并发的SMTP连接数（默认3）
+                - local_hostname: EHLO使用的本机名，默认首次连接时解析一次本机FQDN
         """
         self.sender_email = smtp_config.get('sender_email')
         self.sender_password = smtp_config.get('sender_password')
@@ -42,6 +123,13 @@ class EmailSender:
         self.timeout = int(smtp_config.get('timeout', 20))
         # 将默认重试次数改为1（可由配置覆盖）
         self.max_retries = int(smtp_config.get('max_retries', 1))
+        self.messages_per_connection = max(1, int(smtp_config.get('messages_per_connection', 100)))
+        self.pool_size = max(1, int(smtp_config.get('pool_size', 3)))
+        self.local_hostname: Optional[str] = smtp_config.get('local_hostname')
+        
+        # 连接参数只确定一次，每次连接不再重复判断
+        self._server_cls = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        self._login_args = (self.sender_email, self.sender_password)
         
         if not all([self.sender_email, self.sender_password, self.smtp_server]):
             raise ValueError("SMTP配置不完整！请检查sender_email、sender_password和smtp_server")
@@ -52,25 +140,71 @@ class EmailSender:
             f"timeout={self.timeout}s, max_retries={self.max_retries})"
         )
     
-    def _create_message(self, to_email: str, subject: str, html_content: str, 
+    def _create_message(self, to_email: Optional[str], subject: str, html_content: str, 
                        plain_content: Optional[str] = None) -> MIMEMultipart:
         """
         创建邮件消息
+        
+        to_email 为None时不设置收件人，由批量发送逐个填写（正文只编码一次）
         """
         msg = MIMEMultipart('alternative')
-        msg['From'] = Header(f'Arxiv Mailbot <{self.sender_email}>')
-        msg['To'] = to_email
-        msg['Subject'] = Header(subject, 'utf-8')
+        # 头部先编码成字符串：Header对象在每次序列化（每个收件人一次）时都会重新做RFC2047编码
+        msg['From'] = Header(f'Arxiv Mailbot <{self.sender_email}>').encode()
+        if to_email is not None:
+            msg['To'] = to_email
+        msg['Subject'] = Header(subject, 'utf-8').encode()
         
         # 添加纯文本部分（备选）
         if plain_content:
-            msg.attach(MIMEText(plain_content, 'plain', 'utf-8'))
+            msg.attach(_text_part(plain_content, 'plain'))
         
         # 添加HTML部分
-        msg.attach(MIMEText(html_content, 'html', 'utf-8'))
+        msg.attach(_text_part(html_content, 'html'))
         
         return msg
     
+    def _open_connection(self) -> smtplib.SMTP:
+        """
+        建立SMTP连接并完成（STARTTLS和）登录
+        
+        Returns:
+            已登录的SMTP连接，用完后交给 _close_connection 关闭
+        """
+        logger.debug(f"连接SMTP服务器: {self.smtp_server}:{self.smtp_port} (SSL={self.use_ssl})")
+        
+        server = self._server_cls(self.smtp_server, self.smtp_port,
+                                  local_hostname=self._get_local_hostname(), timeout=self.timeout)
+        try:
+            if not self.use_ssl and self.use_tls:
+                server.ehlo()
+                server.starttls()
+                server.ehlo()
+            server.login(*self._login_args)
+        except BaseException:
+            self._close_connection(server)
+            raise
+        return server
+    
+    def _get_local_hostname(self) -> str:
+        """
+        EHLO使用的本机名
+        
+        smtplib未指定时每个连接都会调用 socket.getfqdn()（可能触发一次DNS反查），这里只解析一次
+        """
+        if self.local_hostname is None:
+            self.local_hostname = socket.getfqdn()
+        return self.local_hostname
+    
+    @staticmethod
+    def _close_connection(server: Optional[smtplib.SMTP]):
+        """关闭SMTP连接，连接已断开时忽略错误"""
+        if server is None:
+            return
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+    
     def send_email(self, to_email: str, subject: str, html_content: str, 
                    plain_content: Optional[str] = None, max_retries: Optional[int] = None) -> Tuple[bool, str]:
         """
@@ -93,22 +227,12 @@ class EmailSender:
                 # 创建消息
                 msg = self._create_message(to_email, subject, html_content, plain_content)
                 
-                # 选择 SMTP 客户端类型
-                server_cls = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
-                
-                logger.debug(
-                    f"第{attempt}次尝试连接SMTP服务器: {self.smtp_server}:{self.smtp_port} "
-                    f"(SSL={self.use_ssl})"
-                )
-                
-                with server_cls(self.smtp_server, self.smtp_port, timeout=self.timeout) as server:
-                    if not self.use_ssl and self.use_tls:
-                        server.ehlo()
-                        server.starttls()
-                        server.ehlo()
-                    
-                    server.login(self.sender_email, self.sender_password)
-                    server.send_message(msg)
+                logger.debug(f"第{attempt}次尝试发送: {to_email}")
+                server = self._open_connection()
+                try:
+                    server.send_message(msg, from_addr=self.sender_email, to_addrs=[to_email])
+                finally:
+                    self._close_connection(server)
                 
                 logger.info(f"✅ 邮件发送成功: {to_email}")
                 return True, f"邮件已发送到 {to_email}"
@@ -118,54 +242,42 @@ class EmailSender:
                 logger.error(error_msg)
                 return False, error_msg
             
-            except smtplib.SMTPServerDisconnected as e:
-                # 某些服务商在DATA后断开，实际已投递。无法准确判断已投递与否，这里按失败处理。
-                error_msg = f"SMTP连接断开: {str(e)}"
-                if attempt < attempts:
-                    logger.warning(f"⚠️ {error_msg}，{attempt}秒后重试...")
-                    time.sleep(attempt)
-                else:
-                    logger.error(f"❌ 第{attempts}次尝试后仍失败: {error_msg}")
-                    return False, error_msg
-            
-            except smtplib.SMTPException as e:
-                error_msg = f"SMTP错误: {str(e)}"
-                if attempt < attempts:
-                    logger.warning(f"⚠️ {error_msg}，{attempt}秒后重试...")
-                    time.sleep(attempt)
-                else:
-                    logger.error(f"❌ 第{attempts}次尝试后仍失败: {error_msg}")
-                    return False, error_msg
-            
             except Exception as e:
-                error_msg = f"发送邮件失败: {str(e)}"
-                if attempt < attempts:
-                    logger.warning(f"⚠️ {error_msg}，{attempt}秒后重试...")
-                    time.sleep(attempt)
+                error_msg = _describe_error(e)
+                if attempt < attempts and _is_retriable(e):
+                    delay = _backoff(attempt)
+                    logger.warning(f"⚠️ {error_msg}，{delay:.1f}秒后重试...")
+                    time.sleep(delay)
                 else:
-                    logger.error(f"❌ 第{attempts}次尝试后仍失败: {error_msg}")
+                    logger.error(f"❌ 第{attempt}次尝试后失败: {error_msg}")
                     return False, error_msg
         
         return False, "邮件发送失败"
     
     def send_batch_emails(self, recipients: List[str], subject: str, 
                          html_content: str, plain_content: Optional[str] = None,
-                         delay: float = 1.0, max_retries: Optional[int] = None) -> Dict[str, any]:
+                         delay: float = 0.0, max_retries: Optional[int] = None) -> Dict[str, any]:
         """
         批量发送邮件
         
+        开启 pool_size 个线程，每个线程持有一个已登录的SMTP连接并从队列领取收件人
+        （每 messages_per_connection 封重新连接一次）；SMTP为网络I/O，等待期间释放GIL，
+        一个连接等待服务器应答时其他连接可以继续发送
+        
         Args:
             recipients: 收件人列表
             subject: 邮件主题
             html_content: HTML内容
             plain_content: 纯文本内容
-            delay: 每封邮件间隔（秒）
+            delay: 同一连接上每封邮件的间隔（秒），复用连接时默认不再等待
             max_retries: 覆盖批量发送中每封邮件的重试次数（默认None=使用EmailSender默认）
         
         Returns:
             统计信息字典
         """
-        logger.info(f"开始批量发送邮件给 {len(recipients)} 位收件人...")
+        workers = min(self.pool_size, len(recipients))
+        logger.info(f"开始批量发送邮件给 {len(recipients)} 位收件人（{workers}个连接）...")
+        attempts = int(max_retries) if max_retries is not None else self.max_retries
         
         stats = {
             'total': len(recipients),
@@ -174,24 +286,244 @@ class EmailSender:
             'failed_recipients': [],
             'failed_reasons': {}
         }
+        failures: Dict[str, str] = {}
+        # 所有收件人的正文相同，MIME消息只构造并序列化一次，发送时只在前面加上收件人头
+        payload = _serialize_message(self._create_message(None, subject, html_content, plain_content))
+        pending: queue.SimpleQueue = queue.SimpleQueue()
+        for recipient in recipients:
+            pending.put(recipient)
+        auth_error: List[str] = []
+        lock = threading.Lock()
         
-        for i, recipient in enumerate(recipients, 1):
-            logger.info(f"发送第 {i}/{len(recipients)} 封邮件: {recipient}")
-            
-            success, message = self.send_email(
-                recipient, subject, html_content, plain_content, max_retries=max_retries
+        def worker():
+            server = None
+            sent_on_connection = 0
+            try:
+                while not auth_error:
+                    try:
+                        recipient = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    logger.info(f"发送邮件: {recipient}")
+                    message = _with_recipient(payload, recipient)
+                    
+                    if server is not None and sent_on_connection < self.messages_per_connection:
+                        # 复用前探测连接：空闲断开在发送DATA之前发现，重连后发送不会重复投递
+                        try:
+                            if server.noop()[0] != 250:
+                                raise smtplib.SMTPServerDisconnected("NOOP未返回250")
+                        except (smtplib.SMTPException, OSError):
+                            logger.info(f"复用的SMTP连接已断开，重新连接: {recipient}")
+                            self._close_connection(server)
+                            server = None
+                    
+                    attempt = 1
+                    while True:
+                        try:
+                            if server is None or sent_on_connection >= self.messages_per_connection:
+                                self._close_connection(server)
+                                server = None
+                                server = self._open_connection()
+                                sent_on_connection = 0
+                            server.sendmail(self.sender_email, [recipient], message)
+                            sent_on_connection += 1
+                            logger.info(f"✅ 邮件发送成功: {recipient}")
+                            with lock:
+                                stats['success'] += 1
+                            break
+                        
+                        except smtplib.SMTPAuthenticationError:
+                            # 认证失败对所有收件人都一样，通知其他连接停止
+                            error_msg = "SMTP认证失败：请检查邮箱与授权码（QQ邮箱需启用SMTP并使用授权码）"
+                            with lock:
+                                if not auth_error:
+                                    logger.error(error_msg)
+                                    auth_error.append(error_msg)
+                                failures[recipient] = error_msg
+                            return
+                        
+                        except Exception as e:
+                            error_msg = _describe_error(e)
+                            # 出错后的连接状态不可信，下次重新连接
+                            self._close_connection(server)
+                            server = None
+                            
+                            if attempt < attempts and _is_retriable(e):
+                                wait = _backoff(attempt)
+                                logger.warning(f"⚠️ {error_msg}，{wait:.1f}秒后重试...")
+                                time.sleep(wait)
+                                attempt += 1
+                                continue
+                            logger.error(f"❌ 第{attempt}次尝试后失败: {error_msg}")
+                            with lock:
+                                failures[recipient] = error_msg
+                            break
+                    
+                    if delay:
+                        time.sleep(delay)
+            finally:
+                self._close_connection(server)
+        
+        if workers == 1:
+            worker()
+        elif workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for future in [executor.submit(worker) for _ in range(workers)]:
+                    future.result()
+        
+        if auth_error:
+            while not pending.empty():
+                failures[pending.get_nowait()] = auth_error[0]
+        # 失败列表按收件人原始顺序输出
+        for recipient in recipients:
+            if recipient in failures:
+                stats['failed'] += 1
+                stats['failed_recipients'].append(recipient)
+                stats['failed_reasons'][recipient] = failures[recipient]
+        
+        logger.info(f"批量发送完成: 成功{stats['success']}, 失败{stats['failed']}")
+        
+        return stats
+    
+    async def _open_connection_async(self) -> 'aiosmtplib.SMTP':
+        """建立并登录一个异步SMTP连接"""
+        server = aiosmtplib.SMTP(
+            hostname=self.smtp_server, port=self.smtp_port, timeout=self.timeout,
+            local_hostname=self._get_local_hostname(),
+            use_tls=self.use_ssl, start_tls=self.use_tls and not self.use_ssl
+        )
+        await server.connect()
+        try:
+            await server.login(*self._login_args)
+        except BaseException:
+            server.close()
+            raise
+        return server
+    
+    @staticmethod
+    async def _close_connection_async(server: Optional['aiosmtplib.SMTP']):
+        """关闭异步SMTP连接，连接已断开时忽略错误"""
+        if server is None:
+            return
+        try:
+            await server.quit()
+        except (aiosmtplib.SMTPException, OSError):
+            server.close()
+    
+    async def send_batch_emails_async(self, recipients: List[str], subject: str,
+                                      html_content: str, plain_content: Optional[str] = None,
+                                      max_retries: Optional[int] = None) -> Dict[str, any]:
+        """
+        异步批量发送邮件
+        
+        开启 pool_size 个已登录的连接并发发送，每个连接同样每 messages_per_connection 封重连一次；
+        未安装aiosmtplib时在线程中执行 send_batch_emails
+        
+        Args:
+            recipients: 收件人列表
+            subject: 邮件主题
+            html_content: HTML内容
+            plain_content: 纯文本内容
+            max_retries: 覆盖每封邮件的重试次数（默认None=使用EmailSender默认）
+        
+        Returns:
+            统计信息字典（与 send_batch_emails 相同）
+        """
+        if aiosmtplib is None:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, lambda: self.send_batch_emails(
+                    recipients, subject, html_content, plain_content, max_retries=max_retries)
             )
-            
-            if success:
-                stats['success'] += 1
-            else:
+        
+        logger.info(f"开始异步批量发送邮件给 {len(recipients)} 位收件人（{self.pool_size}个连接）...")
+        attempts = int(max_retries) if max_retries is not None else self.max_retries
+        
+        stats = {
+            'total': len(recipients),
+            'success': 0,
+            'failed': 0,
+            'failed_recipients': [],
+            'failed_reasons': {}
+        }
+        failures: Dict[str, str] = {}
+        payload = _serialize_message(self._create_message(None, subject, html_content, plain_content))
+        queue: asyncio.Queue = asyncio.Queue()
+        for recipient in recipients:
+            queue.put_nowait(recipient)
+        auth_error: List[str] = []
+        
+        async def worker():
+            server = None
+            sent_on_connection = 0
+            try:
+                while not auth_error:
+                    try:
+                        recipient = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    message = _with_recipient(payload, recipient)
+                    
+                    if server is not None and sent_on_connection < self.messages_per_connection:
+                        # 复用前探测连接：空闲断开在发送DATA之前发现，重连后发送不会重复投递
+                        try:
+                            await server.noop()
+                        except (aiosmtplib.SMTPException, OSError):
+                            logger.info(f"复用的SMTP连接已断开，重新连接: {recipient}")
+                            await self._close_connection_async(server)
+                            server = None
+                    
+                    attempt = 1
+                    while True:
+                        try:
+                            if server is None or sent_on_connection >= self.messages_per_connection:
+                                await self._close_connection_async(server)
+                                server = None
+                                server = await self._open_connection_async()
+                                sent_on_connection = 0
+                            await server.sendmail(self.sender_email, [recipient], message)
+                            sent_on_connection += 1
+                            logger.info(f"✅ 邮件发送成功: {recipient}")
+                            stats['success'] += 1
+                            break
+                        
+                        except aiosmtplib.SMTPAuthenticationError:
+                            # 认证失败对所有收件人都一样，通知其他连接停止
+                            error_msg = "SMTP认证失败：请检查邮箱与授权码（QQ邮箱需启用SMTP并使用授权码）"
+                            if not auth_error:
+                                logger.error(error_msg)
+                                auth_error.append(error_msg)
+                            failures[recipient] = error_msg
+                            return
+                        
+                        except Exception as e:
+                            error_msg = _describe_error(e)
+                            # 出错后的连接状态不可信，下次重新连接
+                            await self._close_connection_async(server)
+                            server = None
+                            
+                            if attempt < attempts and _is_retriable(e):
+                                delay = _backoff(attempt)
+                                logger.warning(f"⚠️ {error_msg}，{delay:.1f}秒后重试...")
+                                await asyncio.sleep(delay)
+                                attempt += 1
+                                continue
+                            logger.error(f"❌ 第{attempt}次尝试后失败: {error_msg}")
+                            failures[recipient] = error_msg
+                            break
+            finally:
+                await self._close_connection_async(server)
+        
+        await asyncio.gather(*(worker() for _ in range(min(self.pool_size, len(recipients)))))
+        
+        if auth_error:
+            while not queue.empty():
+                failures[queue.get_nowait()] = auth_error[0]
+        # 失败列表按收件人原始顺序输出
+        for recipient in recipients:
+            if recipient in failures:
                 stats['failed'] += 1
                 stats['failed_recipients'].append(recipient)
-                stats['failed_reasons'][recipient] = message
-            
-            # 避免被识别为垃圾邮件，邮件间隔
-            if i < len(recipients):
-                time.sleep(delay)
+                stats['failed_reasons'][recipient] = failures[recipient]
         
         logger.info(f"批量发送完成: 成功{stats['success']}, 失败{stats['failed']}")
         
@@ -3,109 +3,87 @@
 定义HTML邮件的样式和结构
 """
 
-from datetime import datetime
+import re
+from bisect import bisect_right
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from html import escape
+from itertools import islice
+from operator import itemgetter
+from typing import Iterator
 
 
-class EmailTemplate:
-    """邮件模板类"""
-    
-    @staticmethod
-    def get_header(date_str: str, total_papers: int, topic_stats: dict = None) -> str:
-        """
-        生成邮件头部
-        
-        Args:
-            date_str: 日期字符串
-            total_papers: 论文总数
-            topic_stats: 主题统计字典
-        
-        Returns:
-            HTML头部
-        """
-        topic_html = ""
-        if topic_stats:
-            topic_html = "<tr><td style='padding: 10px 0;'><strong>📊 主题分布：</strong> "
-            for topic, count in sorted(topic_stats.items(), key=lambda x: x[1], reverse=True):
-                topic_html += f"{topic}: {count}篇 | "
-            topic_html = topic_html.rstrip(" | ") + "</td></tr>"
-        
-        return f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>【Arxiv论文日报】{date_str}</title>
-    <style>
-        * {{
+# 邮件样式表是固定内容：源码中保持可读的排版，导入时压缩一次，页头直接引用
+_RAW_CSS = """
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
             line-height: 1.6;
             color: #333;
             background-color: #f5f5f5;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 800px;
             margin: 0 auto;
             background-color: #ffffff;
-        }}
+        }
         
-        .header {{
+        .header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 40px 30px;
             text-align: center;
-        }}
+        }
         
-        .header h1 {{
+        .header h1 {
             font-size: 28px;
             margin-bottom: 10px;
             font-weight: 600;
-        }}
+        }
         
-        .header p {{
+        .header p {
             font-size: 14px;
             opacity: 0.9;
-        }}
+        }
         
-        .info-box {{
+        .info-box {
             background-color: #f0f4ff;
             border-left: 4px solid #667eea;
             padding: 15px 20px;
             margin: 20px 30px;
             font-size: 13px;
             line-height: 1.8;
-        }}
+        }
         
-        .info-box strong {{
+        .info-box strong {
             color: #667eea;
-        }}
+        }
         
-        .content {{
+        .content {
             padding: 0 30px 30px 30px;
-        }}
+        }
         
-        .paper-card {{
+        .paper-card {
             background-color: #fafafa;
             border: 1px solid #e0e0e0;
             border-radius: 8px;
             padding: 20px;
             margin-bottom: 20px;
             transition: all 0.3s ease;
-        }}
+        }
         
-        .paper-card:hover {{
+        .paper-card:hover {
             box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
             border-color: #667eea;
-        }}
+        }
         
-        .paper-number {{
+        .paper-number {
             display: inline-block;
             background-color: #667eea;
             color: white;
@@ -117,52 +95,52 @@ class EmailTemplate:
             font-size: 12px;
             font-weight: bold;
             margin-right: 10px;
-        }}
+        }
         
-        .paper-title {{
+        .paper-title {
             font-size: 16px;
             font-weight: 600;
             color: #1a1a1a;
             margin: 10px 0;
             line-height: 1.4;
-        }}
+        }
         
-        .paper-title a {{
+        .paper-title a {
             color: #667eea;
             text-decoration: none;
-        }}
+        }
         
-        .paper-title a:hover {{
+        .paper-title a:hover {
             text-decoration: underline;
-        }}
+        }
         
-        .paper-meta {{
+        .paper-meta {
             display: flex;
             flex-wrap: wrap;
             gap: 20px;
             font-size: 12px;
             color: #666;
             margin: 10px 0;
-        }}
+        }
         
-        .paper-meta span {{
+        .paper-meta span {
             display: flex;
             align-items: center;
-        }}
+        }
         
-        .paper-meta strong {{
+        .paper-meta strong {
             color: #333;
             margin-right: 5px;
-        }}
+        }
         
-        .paper-authors {{
+        .paper-authors {
             font-size: 13px;
             color: #555;
             margin: 8px 0;
             font-style: italic;
-        }}
+        }
         
-        .paper-topic {{
+        .paper-topic {
             display: inline-block;
             background-color: #e8f0fe;
             color: #667eea;
@@ -171,9 +149,9 @@ class EmailTemplate:
             font-size: 11px;
             font-weight: 600;
             margin: 5px 5px 5px 0;
-        }}
+        }
         
-        .paper-score {{
+        .paper-score {
             display: inline-block;
             background-color: #fff3e0;
             color: #f57c00;
@@ -182,43 +160,43 @@ class EmailTemplate:
             font-size: 11px;
             font-weight: 600;
             margin: 5px 5px 5px 0;
-        }}
+        }
         
-        .quality-badge {{
+        .quality-badge {
             display: inline-block;
             padding: 4px 12px;
             border-radius: 12px;
             font-size: 11px;
             font-weight: 600;
             margin: 5px 5px 5px 0;
-        }}
+        }
         
-        .quality-top {{
+        .quality-top {
             background-color: #fff3e0;
             color: #e65100;
-        }}
+        }
         
-        .quality-excellent {{
+        .quality-excellent {
             background-color: #e8f5e9;
             color: #2e7d32;
-        }}
+        }
         
-        .quality-good {{
+        .quality-good {
             background-color: #e3f2fd;
             color: #1565c0;
-        }}
+        }
         
-        .quality-normal {{
+        .quality-normal {
             background-color: #f3e5f5;
             color: #6a1b9a;
-        }}
+        }
         
-        .quality-weak {{
+        .quality-weak {
             background-color: #fafafa;
             color: #757575;
-        }}
+        }
         
-        .paper-summary {{
+        .paper-summary {
             background-color: #ffffff;
             border-left: 3px solid #667eea;
             padding: 12px 15px;
@@ -226,9 +204,9 @@ class EmailTemplate:
             font-size: 13px;
             line-height: 1.7;
             color: #555;
-        }}
+        }
         
-        .quality-reasoning {{
+        .quality-reasoning {
             background-color: #fffef7;
             border-left: 3px solid #ffa726;
             padding: 10px 15px;
@@ -237,19 +215,19 @@ class EmailTemplate:
             line-height: 1.6;
             color: #666;
             font-style: italic;
-        }}
+        }
         
-        .paper-keywords {{
+        .paper-keywords {
             font-size: 12px;
             color: #999;
             margin: 10px 0;
-        }}
+        }
         
-        .paper-keywords strong {{
+        .paper-keywords strong {
             color: #666;
-        }}
+        }
         
-        .paper-link {{
+        .paper-link {
             display: inline-block;
             background-color: #667eea;
             color: white;
@@ -260,66 +238,147 @@ class EmailTemplate:
             font-weight: 600;
             margin-top: 10px;
             transition: background-color 0.3s;
-        }}
+        }
         
-        .paper-link:hover {{
+        .paper-link:hover {
             background-color: #764ba2;
-        }}
+        }
         
-        .footer {{
+        .footer {
             background-color: #f5f5f5;
             border-top: 1px solid #e0e0e0;
             padding: 20px 30px;
             font-size: 12px;
             color: #999;
             text-align: center;
-        }}
+        }
         
-        .footer a {{
+        .footer a {
             color: #667eea;
             text-decoration: none;
-        }}
+        }
         
-        .divider {{
+        .divider {
             height: 1px;
             background-color: #e0e0e0;
             margin: 20px 0;
-        }}
+        }
         
-        @media only screen and (max-width: 600px) {{
-            .container {{
+        @media only screen and (max-width: 600px) {
+            .container {
                 width: 100%;
-            }}
+            }
             
-            .header {{
+            .header {
                 padding: 30px 20px;
-            }}
+            }
             
-            .header h1 {{
+            .header h1 {
                 font-size: 22px;
-            }}
+            }
             
-            .content {{
+            .content {
                 padding: 0 20px 20px 20px;
-            }}
+            }
             
-            .info-box {{
+            .info-box {
                 margin: 15px 20px;
                 padding: 12px 15px;
                 font-size: 12px;
-            }}
+            }
             
-            .paper-card {{
+            .paper-card {
                 padding: 15px;
                 margin-bottom: 15px;
-            }}
+            }
             
-            .paper-meta {{
+            .paper-meta {
                 gap: 10px;
                 font-size: 11px;
-            }}
-        }}
-    </style>
+            }
+        }
+"""
+
+
+def _minify_css(css: str) -> str:
+    """去掉注释和多余空白（每封邮件都携带整份样式表，压缩后正文更小）"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{}:;,])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+_STYLE = f"    <style>{_minify_css(_RAW_CSS)}</style>"
+
+# 质量徽章分档：评分落在相邻阈值之间时取对应样式（<3, 3~5, 5~7, 7~9, >=9）
+_QUALITY_THRESHOLDS = (3, 5, 7, 9)
+_QUALITY_TIERS = (
+    ("quality-weak", "📄"),
+    ("quality-normal", "📝"),
+    ("quality-good", "✅"),
+    ("quality-excellent", "⭐"),
+    ("quality-top", "🏆"),
+)
+
+
+@lru_cache(maxsize=4)
+def format_date(day: date) -> str:
+    """邮件中显示的日期（如 2024年01月05日），按天缓存"""
+    return f"{day.year}年{day.month:02d}月{day.day:02d}日"
+
+
+class EmailTemplate:
+    """邮件模板类"""
+    
+    # 主题标签配置（扩展新增主题）
+    TOPIC_LABELS = {
+        'image_denoising': '🖼️ 图像去噪',
+        'image_deraining': '🌧️ 图像去雨',
+        'image_generation': '🎨 图像生成',
+        'diffusion_models': '🌊 扩散模型',
+        'large_language_models': '🗣️ 大语言模型',
+        'multimodal_large_models': '🎭 多模态大模型',
+        'model_architecture': '🏗️ 模型架构',
+        'transformer_architecture': '🔶 Transformer',
+        'reinforcement_learning': '🤖 强化学习',
+        'embodied_ai': '🦾 具身智能',
+        'world_models': '🌍 世界模型',
+        '3d_vision': '📐 3D视觉',
+        'video_understanding': '🎬 视频理解',
+        'computer_vision': '👁️ 计算机视觉',
+        'deep_learning': '🧠 深度学习'
+    }
+    
+    @staticmethod
+    def get_header(date_str: str, total_papers: int, topic_stats: dict = None) -> str:
+        """
+        生成邮件头部
+        
+        Args:
+            date_str: 日期字符串
+            total_papers: 论文总数
+            topic_stats: 主题统计字典
+        
+        Returns:
+            HTML头部
+        """
+        topic_html = ""
+        if topic_stats:
+            topic_html = (
+                "<tr><td style='padding: 10px 0;'><strong>📊 主题分布：</strong> "
+                + " | ".join(f"{escape(str(topic))}: {count}篇" for topic, count in
+                             sorted(topic_stats.items(), key=itemgetter(1), reverse=True))
+                + "</td></tr>"
+            )
+        
+        return f"""
+<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>【Arxiv论文日报】{date_str}</title>
+{_STYLE}
 </head>
 <body>
     <div class="container">
@@ -350,15 +409,15 @@ class EmailTemplate:
         Returns:
             HTML卡片
         """
-        # 提取信息
-        title = paper.get('title', '未知标题')
+        # 提取信息（标题、摘要、AI输出等文本可能含 < & 等字符，插入HTML前统一转义）
+        title = escape(paper.get('title', '未知标题'), quote=False)
         authors = paper.get('authors', [])
-        published = paper.get('published', '')[:10]
+        published = escape(paper.get('published', '')[:10], quote=False)
         topic = paper.get('topic_category', 'unknown')
         relevance_score = paper.get('relevance_score', 0)
-        ai_summary = paper.get('ai_summary', paper.get('summary', ''))
-        arxiv_url = paper.get('arxiv_url', '#')
-        paper_id = paper.get('paper_id', '')
+        ai_summary = escape(paper.get('ai_summary', paper.get('summary', '')) or '', quote=False)
+        arxiv_url = escape(paper.get('arxiv_url', '#'))
+        paper_id = escape(paper.get('paper_id', ''), quote=False)
         matched_keywords = paper.get('matched_keywords', [])
         
         # 🆕 提取五维度评分
@@ -374,56 +433,24 @@ class EmailTemplate:
         weaknesses = paper.get('weaknesses', [])
         
         # 格式化作者
-        authors_str = ', '.join(authors[:3])
+        authors_str = escape(', '.join(islice(authors, 3)), quote=False)
         if len(authors) > 3:
             authors_str += f' 等'
         
         # 格式化关键词
-        keywords_str = ', '.join(matched_keywords[:5]) if matched_keywords else '无'
+        keywords_str = escape(', '.join(islice(matched_keywords, 5)), quote=False) if matched_keywords else '无'
         if len(matched_keywords) > 5:
             keywords_str += f' 等'
         
-        # 主题标签配置（扩展新增主题）
-        topic_labels = {
-            'image_denoising': '🖼️ 图像去噪',
-            'image_deraining': '🌧️ 图像去雨',
-            'image_generation': '🎨 图像生成',
-            'diffusion_models': '🌊 扩散模型',
-            'large_language_models': '🗣️ 大语言模型',
-            'multimodal_large_models': '🎭 多模态大模型',
-            'model_architecture': '🏗️ 模型架构',
-            'transformer_architecture': '🔶 Transformer',
-            'reinforcement_learning': '🤖 强化学习',
-            'embodied_ai': '🦾 具身智能',
-            'world_models': '🌍 世界模型',
-            '3d_vision': '📐 3D视觉',
-            'video_understanding': '🎬 视频理解',
-            'computer_vision': '👁️ 计算机视觉',
-            'deep_learning': '🧠 深度学习'
-        }
-        topic_label = topic_labels.get(topic, f'📌 {topic}')
+        topic_label = EmailTemplate.TOPIC_LABELS.get(topic) or f'📌 {escape(str(topic), quote=False)}'
         
         # 🆕 生成质量评估徽章
         quality_badge_html = ""
         if quality_score is not None and quality_level:
-            # 根据评分确定样式
-            if quality_score >= 9:
-                badge_class = "quality-top"
-                emoji = "🏆"
-            elif quality_score >= 7:
-                badge_class = "quality-excellent"
-                emoji = "⭐"
-            elif quality_score >= 5:
-                badge_class = "quality-good"
-                emoji = "✅"
-            elif quality_score >= 3:
-                badge_class = "quality-normal"
-                emoji = "📝"
-            else:
-                badge_class = "quality-weak"
-                emoji = "📄"
+            # 根据评分所在区间确定样式
+            badge_class, emoji = _QUALITY_TIERS[bisect_right(_QUALITY_THRESHOLDS, quality_score)]
             
-            quality_badge_html = f'<span class="quality-badge {badge_class}">{emoji} {quality_level} ({quality_score:.1f}/10)</span>'
+            quality_badge_html = f'<span class="quality-badge {badge_class}">{emoji} {escape(str(quality_level), quote=False)} ({quality_score:.1f}/10)</span>'
         
         # 🆕 生成五维度雷达图（文本版）
         dimensions_html = ""
@@ -466,7 +493,7 @@ class EmailTemplate:
         if quality_reasoning:
             reasoning_html = f"""
                 <div class="quality-reasoning">
-                    <strong>💡 AI评估理由：</strong>{quality_reasoning}
+                    <strong>💡 AI评估理由：</strong>{escape(str(quality_reasoning), quote=False)}
                 </div>
             """
         
@@ -475,7 +502,7 @@ class EmailTemplate:
         if strengths or weaknesses:
             pros_html = ""
             if strengths:
-                pros_items = "".join([f"<li>{s}</li>" for s in strengths[:3]])
+                pros_items = "".join([f"<li>{escape(str(s), quote=False)}</li>" for s in strengths[:3]])
                 pros_html = f"""
                     <div style="margin-bottom: 8px;">
                         <strong style="color: #2e7d32;">✅ 优点：</strong>
@@ -485,7 +512,7 @@ class EmailTemplate:
             
             cons_html = ""
             if weaknesses:
-                cons_items = "".join([f"<li>{w}</li>" for w in weaknesses[:3]])
+                cons_items = "".join([f"<li>{escape(str(w), quote=False)}</li>" for w in weaknesses[:3]])
                 cons_html = f"""
                     <div>
                         <strong style="color: #c62828;">⚠️ 不足：</strong>
@@ -573,24 +600,42 @@ class EmailTemplate:
 """
 
     @classmethod
-    def generate_email_html(cls, papers: list, topic_stats: dict = None) -> str:
+    def iter_email_html(cls, papers: list, topic_stats: dict = None,
+                        now: datetime = None) -> Iterator[str]:
         """
-        生成完整的邮件HTML
+        逐段生成邮件HTML（页头、每篇论文卡片、页尾）
         
         Args:
             papers: 论文列表（已排序）
             topic_stats: 主题统计
+            now: 生成时间（UTC），为空时取当前时间
         
-        Returns:
-            完整的HTML邮件内容
+        Yields:
+            HTML片段
         """
-        date_str = datetime.utcnow().strftime('%Y年%m月%d日')
+        date_str = format_date((now or datetime.now(timezone.utc)).date())
         
-        html = cls.get_header(date_str, len(papers), topic_stats)
+        yield cls.get_header(date_str, len(papers), topic_stats)
         
         for i, paper in enumerate(papers, 1):
-            html += cls.get_paper_card(i, paper)
+            yield cls.get_paper_card(i, paper)
+        
+        yield cls.get_footer()
+    
+    @classmethod
+    def generate_email_html(cls, papers: list, topic_stats: dict = None,
+                            now: datetime = None) -> str:
+        """
+        生成完整的邮件HTML
         
-        html += cls.get_footer()
+        各片段最后一次性拼接，避免逐篇 += 反复复制已生成的内容
         
-        return html
+        Args:
+            papers: 论文列表（已排序）
+            topic_stats: 主题统计
+            now: 生成时间（UTC），为空时取当前时间
+        
+        Returns:
+            完整的HTML邮件内容
+        """
+        return ''.join(cls.iter_email_html(papers, topic_stats, now))
@@ -4,41 +4,48 @@
 从项目根目录运行此脚本
 """
 
+import logging
 import sys
 import os
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from src.crawler import ArxivCrawler
+from src.crawler import ArxivCrawler, cached_fetch_papers
 from src.config import ConfigManager
 
+log = logging.getLogger(__name__)
+
 def main():
     """测试爬虫"""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    # 只显示本脚本的输出，爬虫等模块的日志保持WARNING以上
+    logging.getLogger('src').setLevel(logging.WARNING)
+    
     config_manager = ConfigManager()
     arxiv_config = config_manager.get_arxiv_config()
     
-    print(f"\n📄 arxiv爬虫配置:")
-    print(f"  关键词: {arxiv_config.get('keywords')}")
-    print(f"  分类: {arxiv_config.get('categories')}")
-    print(f"  最大结果数: {arxiv_config.get('max_results')}")
+    log.info("\n📄 arxiv爬虫配置:")
+    log.info("  关键词: %s", arxiv_config.get('keywords'))
+    log.info("  分类: %s", arxiv_config.get('categories'))
+    log.info("  最大结果数: %s", arxiv_config.get('max_results'))
     
     # 创建爬虫实例
-    print("\n🚀 开始爬取论文...")
+    log.info("\n🚀 开始爬取论文...")
     crawler = ArxivCrawler(arxiv_config)
     
     # 获取论文
-    papers = crawler.fetch_papers(days_back=7)
+    papers = cached_fetch_papers(crawler, days_back=7)
     
     # 显示结果
-    print(f"\n✅ 成功获取 {len(papers)} 篇论文\n")
+    log.info("\n✅ 成功获取 %s 篇论文\n", len(papers))
     for i, paper in enumerate(papers[:5], 1):
-        print(f"【论文 {i}】")
-        print(f"标题: {paper.title}")
-        print(f"作者: {', '.join(paper.authors[:3])}...")
-        print(f"发布时间: {paper.published}")
-        print(f"链接: {paper.arxiv_url}")
-        print(f"摘要预览: {paper.summary[:150]}...\n")
+        log.info("【论文 %s】", i)
+        log.info("标题: %s", paper.title)
+        log.info("作者: %s...", ', '.join(paper.authors[:3]))
+        log.info("发布时间: %s", paper.published)
+        log.info("链接: %s", paper.arxiv_url)
+        log.info("摘要预览: %s...\n", paper.summary[:150])
 
 
 if __name__ == '__main__':
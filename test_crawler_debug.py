@@ -3,38 +3,91 @@
 爬虫调试脚本 - 诊断arxiv查询问题
 """
 
+import logging
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import asyncio
+from datetime import datetime, timezone
+
+import aiohttp
 import arxiv
 from src.config import ConfigManager
+from src.crawler import ArxivCrawler
+from src.crawler.arxiv_crawler import ARXIV_REQUEST_INTERVAL
+
+log = logging.getLogger(__name__)
+
+# 各诊断共用一个客户端（复用HTTP会话与连接，请求间隔也统一由它控制）
+_CLIENT = arxiv.Client(page_size=50, delay_seconds=3, num_retries=3)
+
+
+async def _search_all(queries, max_results=10):
+    """
+    依次执行多个独立查询（直接请求arxiv Atom接口）
+    
+    与爬虫的异步路径一样用单槽闸门：同一时刻只有一个请求在途，闸门在间隔结束后才释放，
+    满足arxiv每3秒一个请求的要求；解析与等待间隔重叠
+    
+    Returns:
+        与queries顺序一致的列表，每项为论文列表或查询时抛出的异常
+    """
+    gate = asyncio.Semaphore(1)
+    fetch_time = datetime.now(timezone.utc).isoformat()
+    
+    async def fetch(session, query):
+        params = {
+            'search_query': query,
+            'max_results': max_results,
+            'sortBy': 'submittedDate',
+            'sortOrder': 'descending',
+        }
+        await gate.acquire()
+        try:
+            async with session.get(ArxivCrawler.API_URL, params=params) as response:
+                response.raise_for_status()
+                body = await response.read()
+        finally:
+            asyncio.get_running_loop().call_later(ARXIV_REQUEST_INTERVAL, gate.release)
+        return ArxivCrawler._parse_atom(body, fetch_time)
+    
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        return await asyncio.gather(*[fetch(session, q) for q in queries], return_exceptions=True)
+
+
+def _print_results(label, name, results):
+    log.info("\n%s '%s'", label, name)
+    if isinstance(results, Exception):
+        log.info("   ❌ 搜索失败: %s", results)
+        return
+    log.info("   ✅ 获取到 %s 篇论文", len(results))
+    if results:
+        log.info("   最新论文: %s...", results[0].title[:60])
 
 def test_arxiv_connection():
     """测试arxiv连接"""
-    print("=" * 60)
-    print("1️⃣  测试arxiv连接...")
-    print("=" * 60)
+    log.info("%s", "=" * 60)
+    log.info("1️⃣  测试arxiv连接...")
+    log.info("%s", "=" * 60)
     
     try:
-        client = arxiv.Client()
         # 尝试一个简单的查询
         search = arxiv.Search(query="cat:cs.CV", max_results=5)
-        results = list(client.results(search))
-        print(f"✅ arxiv连接正常，获取到 {len(results)} 篇论文")
+        results = list(_CLIENT.results(search))
+        log.info("✅ arxiv连接正常，获取到 %s 篇论文", len(results))
         return True
     except Exception as e:
-        print(f"❌ arxiv连接失败: {e}")
+        log.info("❌ arxiv连接失败: %s", e)
         return False
 
 
 def test_keyword_search():
     """测试关键词搜索"""
-    print("\n" + "=" * 60)
-    print("2️⃣  测试关键词搜索...")
-    print("=" * 60)
-    
-    client = arxiv.Client(page_size=10, delay_seconds=3, num_retries=3)
+    log.info("\n%s", "=" * 60)
+    log.info("2️⃣  测试关键词搜索...")
+    log.info("%s", "=" * 60)
     
     keywords = [
         "image denoising",
@@ -43,62 +96,35 @@ def test_keyword_search():
         "embodied AI"
     ]
     
-    for keyword in keywords:
-        print(f"\n🔍 搜索关键词: '{keyword}'")
-        try:
-            search = arxiv.Search(
-                query=f"all:{keyword}",
-                max_results=10,
-                sort_by=arxiv.SortCriterion.SubmittedDate,
-                sort_order=arxiv.SortOrder.Descending
-            )
-            results = list(client.results(search))
-            print(f"   ✅ 获取到 {len(results)} 篇论文")
-            if results:
-                print(f"   最新论文: {results[0].title[:60]}...")
-        except Exception as e:
-            print(f"   ❌ 搜索失败: {e}")
+    # 各关键词的查询互不依赖，并发请求，不再逐个等待
+    all_results = asyncio.run(_search_all([f"all:{keyword}" for keyword in keywords]))
+    for keyword, results in zip(keywords, all_results):
+        _print_results("🔍 搜索关键词:", keyword, results)
 
 
 def test_category_search():
     """测试分类搜索"""
-    print("\n" + "=" * 60)
-    print("3️⃣  测试分类搜索...")
-    print("=" * 60)
-    
-    client = arxiv.Client(page_size=10, delay_seconds=3, num_retries=3)
+    log.info("\n%s", "=" * 60)
+    log.info("3️⃣  测试分类搜索...")
+    log.info("%s", "=" * 60)
     
     categories = ["cs.CV", "cs.AI", "cs.LG"]
     
-    for category in categories:
-        print(f"\n📁 搜索分类: '{category}'")
-        try:
-            search = arxiv.Search(
-                query=f"cat:{category}",
-                max_results=10,
-                sort_by=arxiv.SortCriterion.SubmittedDate,
-                sort_order=arxiv.SortOrder.Descending
-            )
-            results = list(client.results(search))
-            print(f"   ✅ 获取到 {len(results)} 篇论文")
-            if results:
-                print(f"   最新论文: {results[0].title[:60]}...")
-        except Exception as e:
-            print(f"   ❌ 搜索失败: {e}")
+    all_results = asyncio.run(_search_all([f"cat:{category}" for category in categories]))
+    for category, results in zip(categories, all_results):
+        _print_results("📁 搜索分类:", category, results)
 
 
 def test_combined_search():
     """测试组合搜索（关键词 OR 关键词）"""
-    print("\n" + "=" * 60)
-    print("4️⃣  测试组合搜索（关键词OR）...")
-    print("=" * 60)
-    
-    client = arxiv.Client(page_size=50, delay_seconds=3, num_retries=3)
+    log.info("\n%s", "=" * 60)
+    log.info("4️⃣  测试组合搜索（关键词OR）...")
+    log.info("%s", "=" * 60)
     
     # 使用 OR 逻辑代替 AND
     query = "(all:image denoising) OR (all:image deraining) OR (all:reinforcement learning) OR (all:embodied AI)"
     
-    print(f"查询语句: {query}\n")
+    log.info("查询语句: %s\n", query)
     
     try:
         search = arxiv.Search(
@@ -107,48 +133,52 @@ def test_combined_search():
             sort_by=arxiv.SortCriterion.SubmittedDate,
             sort_order=arxiv.SortOrder.Descending
         )
-        results = list(client.results(search))
-        print(f"✅ 获取到 {len(results)} 篇论文")
+        results = list(_CLIENT.results(search))
+        log.info("✅ 获取到 %s 篇论文", len(results))
         
         # 显示前5篇
-        print("\n📚 前5篇论文:")
+        log.info("\n📚 前5篇论文:")
         for i, paper in enumerate(results[:5], 1):
-            print(f"\n  {i}. {paper.title[:70]}")
-            print(f"     作者: {', '.join([a.name for a in paper.authors[:2]])}...")
-            print(f"     发布: {paper.published.date()}")
-            print(f"     链接: {paper.entry_id}")
+            log.info("\n  %s. %s", i, paper.title[:70])
+            log.info("     作者: %s...", ', '.join([a.name for a in paper.authors[:2]]))
+            log.info("     发布: %s", paper.published.date())
+            log.info("     链接: %s", paper.entry_id)
     except Exception as e:
-        print(f"❌ 搜索失败: {e}")
+        log.info("❌ 搜索失败: %s", e)
 
 
 def test_config_manager():
     """测试配置管理器"""
-    print("\n" + "=" * 60)
-    print("5️⃣  测试配置管理器...")
-    print("=" * 60)
+    log.info("\n%s", "=" * 60)
+    log.info("5️⃣  测试配置管理器...")
+    log.info("%s", "=" * 60)
     
     config = ConfigManager()
     arxiv_config = config.get_arxiv_config()
     
-    print(f"\n📋 当前arxiv配置:")
-    print(f"  关键词: {arxiv_config.get('keywords')}")
-    print(f"  分类: {arxiv_config.get('categories')}")
-    print(f"  最大结果: {arxiv_config.get('max_results')}")
-    print(f"  排序方式: {arxiv_config.get('sort_by')}")
+    log.info("\n📋 当前arxiv配置:")
+    log.info("  关键词: %s", arxiv_config.get('keywords'))
+    log.info("  分类: %s", arxiv_config.get('categories'))
+    log.info("  最大结果: %s", arxiv_config.get('max_results'))
+    log.info("  排序方式: %s", arxiv_config.get('sort_by'))
 
 
 def main():
     """运行所有诊断"""
-    print("\n" + "🔧" * 30)
-    print("   arxiv爬虫诊断工具")
-    print("🔧" * 30 + "\n")
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    # 只显示本脚本的输出，爬虫等模块的日志保持WARNING以上
+    logging.getLogger('src').setLevel(logging.WARNING)
+    
+    log.info("\n%s", "🔧" * 30)
+    log.info("   arxiv爬虫诊断工具")
+    log.info("%s\n", "🔧" * 30)
     
     # 测试配置
     test_config_manager()
     
     # 测试连接
     if not test_arxiv_connection():
-        print("\n❌ 无法连接到arxiv，请检查网络连接")
+        log.info("\n❌ 无法连接到arxiv，请检查网络连接")
         return
     
     # 测试关键词搜索
@@ -160,9 +190,9 @@ def main():
     # 测试组合搜索
     test_combined_search()
     
-    print("\n" + "✅" * 30)
-    print("   诊断完成！")
-    print("✅" * 30 + "\n")
+    log.info("\n%s", "✅" * 30)
+    log.info("   诊断完成！")
+    log.info("%s\n", "✅" * 30)
 
 
 if __name__ == '__main__':
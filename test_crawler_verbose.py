@@ -1,42 +1,50 @@
 #!/usr/bin/env python3
 """
 详细诊断爬虫
+逐篇论文的明细以DEBUG级别输出，运行时加 -v 显示
 """
 
+import logging
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import arxiv
 from src.crawler import ArxivCrawler
 from src.config import ConfigManager
 from datetime import datetime, timedelta
 
+log = logging.getLogger(__name__)
+
+_SORT_CRITERION_MAP = {
+    'submittedDate': arxiv.SortCriterion.SubmittedDate,
+    'relevance': arxiv.SortCriterion.Relevance,
+    'lastUpdatedDate': arxiv.SortCriterion.LastUpdatedDate,
+}
+
+
 def main():
+    logging.basicConfig(level=logging.DEBUG if '-v' in sys.argv[1:] else logging.INFO,
+                        format='%(message)s')
+    # 只显示本脚本的输出，爬虫等模块的日志保持WARNING以上
+    logging.getLogger('src').setLevel(logging.WARNING)
+    
     config_manager = ConfigManager()
     arxiv_config = config_manager.get_arxiv_config()
     
-    print("\n" + "="*60)
-    print("详细爬虫诊断")
-    print("="*60 + "\n")
+    log.info("\n%s\n详细爬虫诊断\n%s\n", "="*60, "="*60)
     
     # 创建爬虫实例
     crawler = ArxivCrawler(arxiv_config)
     
     # 显示搜索查询
     query = crawler.build_search_query()
-    print(f"📋 搜索查询语句:\n   {query}\n")
+    log.info("📋 搜索查询语句:\n   %s\n", query)
     
     # 手动执行搜索并显示详细信息
-    import arxiv
-    
-    print("🔍 正在查询arxiv...\n")
+    log.info("🔍 正在查询arxiv...\n")
     
-    sort_criterion_map = {
-        'submittedDate': arxiv.SortCriterion.SubmittedDate,
-        'relevance': arxiv.SortCriterion.Relevance,
-        'lastUpdatedDate': arxiv.SortCriterion.LastUpdatedDate,
-    }
-    sort_by = sort_criterion_map.get(crawler.sort_by, arxiv.SortCriterion.SubmittedDate)
+    sort_by = _SORT_CRITERION_MAP.get(crawler.sort_by, arxiv.SortCriterion.SubmittedDate)
     
     search = arxiv.Search(
         query=query,
@@ -49,8 +57,8 @@ def main():
     now = datetime.utcnow()
     cutoff_date = now - timedelta(days=1)
     
-    print(f"⏰ 当前时间(UTC): {now}")
-    print(f"⏰ 截止时间(UTC): {cutoff_date}\n")
+    log.info("⏰ 当前时间(UTC): %s", now)
+    log.info("⏰ 截止时间(UTC): %s\n", cutoff_date)
     
     # 获取并显示所有结果
     count = 0
@@ -63,15 +71,13 @@ def main():
         is_within_range = published_date >= cutoff_date
         status = "✅ PASS" if is_within_range else "❌ FILTERED"
         
-        print(f"论文 #{count}: {status}")
-        print(f"  标题: {entry.title[:60]}")
-        print(f"  发布: {published_date}")
-        print(f"  ID: {entry.entry_id}\n")
+        log.debug("论文 #%d: %s\n  标题: %s\n  发布: %s\n  ID: %s\n",
+                  count, status, entry.title[:60], published_date, entry.entry_id)
         
         if is_within_range:
             passed_count += 1
         else:
-            print("  (发布时间早于截止时间，已被过滤)\n")
+            log.debug("  (发布时间早于截止时间，已被过滤)\n")
             # 停止显示更多已过滤的论文
             if passed_count == 0:
                 break
@@ -80,10 +86,8 @@ def main():
         if count >= 10:
             break
     
-    print(f"\n📊 结果统计:")
-    print(f"  总查询数: {count}")
-    print(f"  通过筛选: {passed_count}")
-    print(f"  被过滤: {count - passed_count}")
+    log.info("\n📊 结果统计:\n  总查询数: %d\n  通过筛选: %d\n  被过滤: %d",
+             count, passed_count, count - passed_count)
 
 
 if __name__ == '__main__':
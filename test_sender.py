@@ -4,145 +4,180 @@
 完整流程：爬取 -> 去重 -> 筛选 -> AI总结 -> 格式化邮件 -> 发送
 """
 
+import argparse
+import logging
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import asyncio
-from datetime import datetime
+from datetime import datetime, timezone
 
-from src.crawler import ArxivCrawler
+from src.crawler import ArxivCrawler, cached_fetch_papers
 from src.config import ConfigManager
 from src.filter import PaperFilter, Deduplicator
 from src.extractor import IdeaExtractor
 from src.sender import EmailFormatter, EmailSender
 
+log = logging.getLogger(__name__)
 
-async def main():
-    """完整测试流程"""
+# 合并进AI总结结果的筛选字段
+META_KEYS = ('topic_category', 'relevance_score', 'matched_keywords')
+
+async def main(assume_yes: bool = False):
+    """
+    完整测试流程
+    
+    Args:
+        assume_yes: 跳过发送前的确认提示（非交互运行）
+    """
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    # 只显示本脚本的输出，爬虫等模块的日志保持WARNING以上
+    logging.getLogger('src').setLevel(logging.WARNING)
     
-    print("\n" + "="*80)
-    print("🚀 完整流程测试：爬取 -> 去重 -> 筛选 -> AI总结 -> 邮件格式化")
-    print("="*80 + "\n")
+    log.info("\n%s", "="*80)
+    log.info("🚀 完整流程测试：爬取 -> 去重 -> 筛选 -> AI总结 -> 邮件格式化")
+    log.info("%s\n", "="*80)
     
     config_manager = ConfigManager()
     
     # ===== 第1步：爬取论文 =====
-    print("📥 第1步：从arxiv爬取论文...")
+    log.info("📥 第1步：从arxiv爬取论文...")
     arxiv_config = config_manager.get_arxiv_config()
     crawler = ArxivCrawler(arxiv_config)
-    papers = crawler.fetch_papers(days_back=3)
+    papers = cached_fetch_papers(crawler, days_back=3)
     papers_dict = [p.to_dict() for p in papers]
-    print(f"✅ 成功爬取 {len(papers_dict)} 篇论文\n")
+    log.info("✅ 成功爬取 %s 篇论文\n", len(papers_dict))
     
     # ===== 第2步：去重 =====
-    print("🔄 第2步：论文去重...")
+    log.info("🔄 第2步：论文去重...")
     deduplicator = Deduplicator()
     unique_papers, _ = deduplicator.deduplicate_papers(papers_dict)
-    print(f"✅ 去重完成: {len(unique_papers)} 篇新论文\n")
+    log.info("✅ 去重完成: %s 篇新论文\n", len(unique_papers))
     
     # ===== 第3步：筛选 =====
-    print("🏷️  第3步：论文筛选与分类...")
+    log.info("🏷️  第3步：论文筛选与分类...")
     filter_obj = PaperFilter()
-    filtered_papers, _ = filter_obj.filter_papers(unique_papers)
-    # 将AI总结篇数从5改为10
-    filtered_dict = [p.to_dict() for p in filtered_papers[:10]]
-    print(f"✅ 筛选完成: {len(filtered_dict)} 篇论文用于AI总结\n")
+    # 将AI总结篇数从5改为10：取相关性最高的10篇（堆选取，不对全部论文排序）
+    filtered_papers, _ = filter_obj.filter_and_rank(unique_papers, sort_by='relevance_score', top_k=10)
+    filtered_dict = [p.to_dict() for p in filtered_papers]
+    log.info("✅ 筛选完成: %s 篇论文用于AI总结\n", len(filtered_dict))
     
     # ===== 第4步：AI总结 =====
-    print("🤖 第4步：AI核心思想提取...")
+    log.info("🤖 第4步：AI核心思想提取...")
     deepseek_config = config_manager.get_deepseek_config()
     extractor = IdeaExtractor(deepseek_config)
-    extracted_ideas, stats = await extractor.extract_batch_papers(filtered_dict, batch_size=2)
+    # 所有论文同时发起请求，实际请求节奏仍由共享限流器按RPM/并发上限控制
+    extracted_ideas, stats = await extractor.extract_batch_papers(
+        filtered_dict, batch_size=len(filtered_dict), close_session=True
+    )
     
     # 转换为字典
     ideas_dict = [idea.to_dict() for idea in extracted_ideas]
-    print(f"✅ AI总结完成: {stats['success']} 成功, {stats['fallback']} 备选\n")
-    print(f"AI总结条目数: {len(ideas_dict)}")
+    log.info("✅ AI总结完成: %s 成功, %s 备选\n", stats['success'], stats['fallback'])
+    log.info("AI总结条目数: %s", len(ideas_dict))
     
     # ===== 合并分类与相关性字段，确保邮件展示主题/分数 =====
+    # 邮件只需要筛选阶段的这几个字段，直接补进AI总结结果字典，不为每篇论文复制整份元数据
     meta_map = {p['paper_id']: p for p in filtered_dict}
-    merged_papers = []
+    get_meta = meta_map.get
     for idea in ideas_dict:
-        pid = idea.get('paper_id')
-        meta = meta_map.get(pid, {})
-        merged = {**meta, **idea}  # meta在前，保留topic_category/relevance_score等
-        merged_papers.append(merged)
-    
-    non_unknown = sum(1 for p in merged_papers if p.get('topic_category') not in (None, 'unknown'))
-    non_zero_rel = sum(1 for p in merged_papers if p.get('relevance_score', 0) > 0)
-    print(f"🔎 合并后：有主题的论文数={non_unknown}，相关性>0的论文数={non_zero_rel}\n")
+        meta = get_meta(idea.get('paper_id'))
+        if meta:
+            for key in META_KEYS:
+                if key in meta:
+                    idea.setdefault(key, meta[key])
+    merged_papers = ideas_dict
+    
+    non_unknown = non_zero_rel = 0
+    for p in merged_papers:
+        if p.get('topic_category') not in (None, 'unknown'):
+            non_unknown += 1
+        if p.get('relevance_score', 0) > 0:
+            non_zero_rel += 1
+    log.info("🔎 合并后：有主题的论文数=%s，相关性>0的论文数=%s\n", non_unknown, non_zero_rel)
     
     # ===== 第5步：邮件格式化 =====
-    print("📧 第5步：邮件格式化...")
+    log.info("📧 第5步：邮件格式化...")
     formatter = EmailFormatter()
-    html_content, email_stats = formatter.format_papers_to_html(merged_papers)
-    plain_content = formatter.generate_plain_text_email(merged_papers)
+    merged_papers = formatter.sort_papers_by_relevance(merged_papers)
+    topic_stats, avg_relevance = formatter.summarize(merged_papers)
+    html_content, email_stats = formatter.format_papers_to_html(merged_papers, topic_stats, avg_relevance)
     
-    print(f"✅ 邮件格式化完成")
-    print(f"   HTML长度: {len(html_content)} 字节")
-    print(f"   纯文本长度: {len(plain_content)} 字节\n")
+    log.info("✅ 邮件格式化完成")
+    log.info("   HTML长度: %s 字节\n", len(html_content))
     
     # ===== 第6步：预览（纯文本） =====
-    print("="*80)
-    print("📧 邮件内容预览（纯文本版本）")
-    print("="*80 + "\n")
-    print(plain_content[:1500])
-    print("\n... (内容过长，已省略) ...\n")
+    # 预览只需开头部分，用前3篇生成；完整纯文本在确认发送后再生成（统计信息仍按全部论文）
+    log.info("%s", "="*80)
+    log.info("📧 邮件内容预览（纯文本版本）")
+    log.info("%s\n", "="*80)
+    preview = formatter.generate_plain_text_email(merged_papers[:3], topic_stats, avg_relevance)
+    log.info("%s", preview[:1500])
+    log.info("\n... (内容过长，已省略) ...\n")
     
     # ===== 第7步：邮件发送 =====
-    print("="*80)
-    print("📬 邮件发送测试")
-    print("="*80 + "\n")
+    log.info("%s", "="*80)
+    log.info("📬 邮件发送测试")
+    log.info("%s\n", "="*80)
     
     email_config = config_manager.get_email_config()
     recipients = email_config.get('recipients', [])
     
     if not recipients or not email_config.get('sender_email'):
-        print("⚠️  邮件配置不完整，跳过实际发送")
-        print(f"   配置的收件人: {recipients}")
-        print(f"   配置的发送者: {email_config.get('sender_email')}")
-        print("\n💡 要启用邮件发送，请在 .env 文件中配置：")
-        print("   - SENDER_EMAIL: 你的邮箱")
-        print("   - SENDER_PASSWORD: 邮箱授权码")
-        print("   - RECIPIENT_EMAILS: 收件人邮箱（用|分隔）")
+        log.info("⚠️  邮件配置不完整，跳过实际发送")
+        log.info("   配置的收件人: %s", recipients)
+        log.info("   配置的发送者: %s", email_config.get('sender_email'))
+        log.info("\n💡 要启用邮件发送，请在 .env 文件中配置：")
+        log.info("   - SENDER_EMAIL: 你的邮箱")
+        log.info("   - SENDER_PASSWORD: 邮箱授权码")
+        log.info("   - RECIPIENT_EMAILS: 收件人邮箱（用|分隔）")
         return
     
     try:
         sender = EmailSender(email_config)
-        print("✅ 邮件发送器初始化成功\n")
+        log.info("✅ 邮件发送器初始化成功\n")
         
-        print("📋 发送配置:")
-        print(f"  发送者: {email_config.get('sender_email')}")
-        print(f"  收件人: {recipients}")
-        print(f"  主题: 【Arxiv论文日报】{datetime.utcnow().strftime('%Y-%m-%d')}")
-        print(f"  方式: HTML + 纯文本")
+        subject = f"【Arxiv论文日报】{datetime.now(timezone.utc).strftime('%Y-%m-%d')}"
         
-        confirm = input("\n是否确认发送？(yes/no): ").strip().lower()
+        log.info("📋 发送配置:")
+        log.info("  发送者: %s", email_config.get('sender_email'))
+        log.info("  收件人: %s", recipients)
+        log.info("  主题: %s", subject)
+        log.info("  方式: HTML + 纯文本")
+        
+        if assume_yes:
+            confirm = 'yes'
+        else:
+            # 在线程中等待输入，不阻塞事件循环
+            confirm = (await asyncio.to_thread(input, "\n是否确认发送？(yes/no): ")).strip().lower()
         
         if confirm == 'yes':
-            subject = f"【Arxiv论文日报】{datetime.utcnow().strftime('%Y-%m-%d')}"
+            plain_content = formatter.generate_plain_text_email(merged_papers, topic_stats, avg_relevance)
             # 关键变更：将批量发送的重试次数设置为1
-            stats = sender.send_batch_emails(
+            stats = await sender.send_batch_emails_async(
                 recipients, subject, html_content, plain_content, max_retries=1
             )
             
-            print(f"\n📊 发送统计:")
-            print(f"  总数: {stats['total']}")
-            print(f"  成功: {stats['success']}")
-            print(f"  失败: {stats['failed']}")
+            log.info("\n📊 发送统计:")
+            log.info("  总数: %s", stats['total'])
+            log.info("  成功: %s", stats['success'])
+            log.info("  失败: %s", stats['failed'])
             
             if stats['failed_recipients']:
-                print(f"\n  失败的收件人:")
+                log.info("\n  失败的收件人:")
                 for recipient, reason in stats['failed_reasons'].items():
-                    print(f"    - {recipient}: {reason}")
+                    log.info("    - %s: %s", recipient, reason)
         else:
-            print("❌ 已取消发送")
+            log.info("❌ 已取消发送")
     
     except Exception as e:
-        print(f"❌ 邮件发送器初始化失败: {e}")
-        print("\n💡 请检查 .env 文件中的邮件配置")
+        log.info("❌ 邮件发送器初始化失败: %s", e)
+        log.info("\n💡 请检查 .env 文件中的邮件配置")
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="邮件模块完整流程测试")
+    parser.add_argument("--yes", action="store_true", help="不询问确认，直接发送邮件")
+    args = parser.parse_args()
+    asyncio.run(main(assume_yes=args.yes))
@@ -0,0 +1,55 @@
+"""去重器近似匹配的回归测试"""
+
+import os
+import tempfile
+import unittest
+
+from src.filter.deduplicator import Deduplicator
+
+
+class NearDuplicateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dedup = Deduplicator(cache_file=os.path.join(self.tmp.name, 'processed.jsonl'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_series_with_shared_author_is_not_duplicate(self):
+        self.dedup.mark_as_processed({
+            'paper_id': 'a',
+            'title': 'Llama 2: Open Foundation and Fine-Tuned Chat Models',
+            'authors': ['Hugo Touvron', 'Louis Martin'],
+        }, idea={'ai_summary': 'llama 2 summary'})
+        llama3 = {
+            'paper_id': 'b',
+            'title': 'Llama 3: Open Foundation and Fine-Tuned Chat Models',
+            'authors': ['Hugo Touvron', 'X'],
+        }
+        self.assertEqual(self.dedup.is_duplicate(llama3), (False, ''))
+        self.assertIsNone(self.dedup.get_cached_idea(llama3))
+
+    def test_numbered_titles_by_same_author_are_unique(self):
+        papers = [{'paper_id': str(i), 'title': f'Paper number {i}: Deep Things', 'authors': ['Bob']}
+                  for i in range(50)]
+        unique, duplicates = self.dedup.deduplicate_papers(papers)
+        self.assertEqual(len(unique), 50)
+        self.assertEqual(duplicates, [])
+
+    def test_revised_title_with_same_authors_is_duplicate(self):
+        self.dedup.mark_as_processed({
+            'paper_id': 'a',
+            'title': 'A Comprehensive Survey of Retrieval-Augmented Generation for Large Language Models',
+            'authors': ['Alice', 'Bob'],
+        })
+        revised = {
+            'paper_id': 'b',
+            'title': 'A Comprehensive Survey on Retrieval-Augmented Generation for Large Language Models',
+            'authors': ['Alice', 'Bob'],
+        }
+        self.assertEqual(self.dedup.is_duplicate(revised), (True, 'a'))
+
+
+if __name__ == '__main__':
+    unittest.main()